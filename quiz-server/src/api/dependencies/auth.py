@@ -2,6 +2,7 @@ from fastapi import Header, HTTPException, Depends, status
 from starlette.concurrency import run_in_threadpool
 from typing import Optional, Dict, Any
 from src.api.schemas.auth_schema import FirebaseUser
+from src.core.token_cache import token_cache
 from src.services.user_service import UserService
 from .common import get_user_service
 from firebase_admin import auth
@@ -9,10 +10,18 @@ from firebase_admin import auth
 # Note: The Firebase Admin SDK is initialized in src/core/firebase_config.py
 # which is imported in main.py, ensuring its ready.
 
+async def _verify_id_token(token_str: str) -> Dict[str, Any]:
+    """
+    Firebase Admin SDK's verify_id_token is a synchronous call (RSA signature check, certificate fetch when cold)
+    Must wrap it in run_in_threadpool to not block the event loop
+    """
+    return await run_in_threadpool(auth.verify_id_token, token_str)
+
 async def verify_firebase_token(id_token: str = Header(alias="Authorization")) -> FirebaseUser:
     """
     Verifies a Firebase ID token sent in the Authorization header.
     Returns the authenticated user's details if valid
+    Verified tokens are cached until their exp (see core/token_cache.py), so repeat requests skip the crypto
     """
     if not id_token:
         raise HTTPException(
@@ -29,10 +38,7 @@ async def verify_firebase_token(id_token: str = Header(alias="Authorization")) -
         )
 
     try:
-        # Firebase Admin SDK's verify_id_token is a synchronous call
-        # Must wrap it in run_in_threadpool to not block the event loop
-        decoded_token = await run_in_threadpool(auth.verify_id_token, token_str)
-        print(decoded_token)
+        decoded_token = await token_cache.get_or_verify(token_str, _verify_id_token)
         uid = decoded_token.get("uid")
         email = decoded_token.get("email")
 
@@ -65,5 +71,4 @@ async def validate_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User not found in database"
         )
-    print(db_user)
     return db_user
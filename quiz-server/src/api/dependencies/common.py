@@ -2,11 +2,13 @@
     File handles all the common repos and services necessary for the routers
 """
 
-from sqlalchemy.orm import Session # Import Session for synchronous context
-from fastapi import Depends
-from typing import AsyncGenerator, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Request
+from typing import AsyncGenerator, Any, Optional
+import hashlib
 
-from src.core.database import get_db # Import your get_db dependency
+from src.core.database import get_db, replica_router # Import your get_db dependency
+from src.repositories.base_repository import PRIMARY_WRITE_KEY
 
 from src.repositories.user_repository import UserRepository
 from src.repositories.question_repository import QuestionRepository
@@ -17,6 +19,8 @@ from src.repositories.log_repository import LogRepository
 from src.repositories.qoptions_repository import QOptionsRepository
 from src.repositories.topics_repository import TopicsRepository
 from src.repositories.schools_repository import SchoolRepository
+from src.repositories.unit_of_work import UnitOfWork
+from src.repositories.engagement_repository import EngagementRepository
 
 # from src.repositories.data_repository import DataRepository # Adjust this if it expects AsyncSession
 from src.services.user_service import UserService
@@ -29,45 +33,77 @@ from src.services.qoption_service import QOPtionService
 from src.services.topic_service import TopicService
 from src.services.school_service import SchoolService
 
-# from src.ml_core.model_manager import ModelManager # Adjusted path for clarity
+from src.ml_core.model_manager import ModelManager, model_manager
 from src.services.ml_service import MLService
-
-# Database dependency (now yields a synchronous Session)
-async def get_db_session() -> AsyncGenerator[Session, Any]: # Correct type hint for async generator
-    """Dependency to get a synchronous database session within an async context."""
+from src.services.export_service import ExportService
+from src.workers.job_queue import JobQueue, job_queue
+
+def client_key(request: Request) -> Optional[str]:
+    """Identifies the caller for read-your-writes: its bearer token (hashed) or else its address"""
+    authorization = request.headers.get("Authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    return request.client.host if request.client else None
+
+# Database dependency (yields an AsyncSession)
+async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, Any]: # Correct type hint for async generator
+    """Dependency to get an asynchronous database session on the primary, repositories write through it"""
     async with get_db() as db: # Use async with to enter the async context manager
+        try:
+            yield db
+        finally:
+            # the client's next reads stay on the primary until replication has caught up
+            if db.info.get(PRIMARY_WRITE_KEY):
+                replica_router.record_write(client_key(request))
+
+async def get_read_db_session(request: Request, db: AsyncSession = Depends(get_db_session)) -> AsyncGenerator[AsyncSession, Any]:
+    """
+    Dependency to get the session repositories read through: a replica picked by the ReplicaRouter,
+    or the primary session itself when there is no healthy replica or the client wrote recently
+    """
+    engine = replica_router.engine_for_read(client_key(request))
+    if engine is replica_router.primary:
         yield db
+        return
+    async with replica_router.session(engine) as read_db:
+        yield read_db
+
+# Repository dependencies - all repositories share the request's primary and read sessions
+def get_user_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> UserRepository:
+    return UserRepository(db, read_db)
 
-# Repository dependencies - ensure they are correctly typed for the synchronous Session
-def get_user_repository(db: Session = Depends(get_db_session)) -> UserRepository:
-    return UserRepository(db)
+def get_question_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> QuestionRepository:
+    return QuestionRepository(db, read_db)
 
-def get_question_repository(db: Session = Depends(get_db_session)) -> QuestionRepository:
-    return QuestionRepository(db)
+def get_quiz_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> QuizRepository:
+    return QuizRepository(db, read_db)
 
-def get_quiz_repository(db: Session = Depends(get_db_session)) -> QuizRepository:
-    return QuizRepository(db)
+def get_answer_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> AnswerRepository:
+    return AnswerRepository(db, read_db)
 
-def get_answer_repository(db: Session = Depends(get_db_session)) -> AnswerRepository:
-    return AnswerRepository(db)
+def get_analysis_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> AnalysisRepository:
+    return AnalysisRepository(db, read_db)
 
-def get_analysis_repository(db: Session = Depends(get_db_session)) -> AnalysisRepository:
-    return AnalysisRepository(db)
+def get_log_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> LogRepository:
+    return LogRepository(db, read_db)
 
-def get_log_repository(db: Session = Depends(get_db_session)) -> LogRepository:
-    return LogRepository(db)
+def get_topics_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> TopicsRepository:
+    return TopicsRepository(db, read_db)
 
-def get_topics_repository(db: Session = Depends(get_db_session)) -> TopicsRepository:
-    return TopicsRepository(db)
+def get_school_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> SchoolRepository:
+    return SchoolRepository(db, read_db)
 
-def get_school_repository(db: Session = Depends(get_db_session)) -> SchoolRepository:
-    return SchoolRepository(db)
+def get_qoptions_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> QOptionsRepository:
+    return QOptionsRepository(db, read_db)
 
-def get_qoptions_repository(db: Session = Depends(get_db_session)) -> QOptionsRepository:
-    return QOptionsRepository(db)
+def get_engagement_repository(db: AsyncSession = Depends(get_db_session), read_db: AsyncSession = Depends(get_read_db_session)) -> EngagementRepository:
+    return EngagementRepository(db, read_db)
 
+def get_unit_of_work(db: AsyncSession = Depends(get_db_session)) -> UnitOfWork:
+    return UnitOfWork(db)
 
-""" def get_data_repository(db: Session = Depends(get_db_session)) -> DataRepository:
+
+""" def get_data_repository(db: AsyncSession = Depends(get_db_session)) -> DataRepository:
     # If DataRepository needs a database session, it should also expect Session
     # You'll need to update DataRepository's __init__ and methods similar to UserRepository
     return DataRepository(db) """
@@ -84,15 +120,17 @@ def get_question_service(
     return QuestionService(question_repo)
 
 def get_quiz_service(
-        quiz_repo: QuizRepository = Depends(get_quiz_repository)
+        quiz_repo: QuizRepository = Depends(get_quiz_repository),
+        question_repo: QuestionRepository = Depends(get_question_repository)
 ) -> QuizService:
-    return QuizService(quiz_repo)
+    return QuizService(quiz_repo, question_repo)
 
 def get_answer_service(
         answer_repo: AnswerRepository = Depends(get_answer_repository),
-        log_repo: LogRepository = Depends(get_log_repository)
+        log_repo: LogRepository = Depends(get_log_repository),
+        uow: UnitOfWork = Depends(get_unit_of_work)
 ) -> AnswerService:
-    return AnswerService(answer_repo, log_repo)
+    return AnswerService(answer_repo, log_repo, uow)
 
 def get_analysis_service(
         analysis_repo: AnalysisRepository = Depends(get_analysis_repository)
@@ -103,8 +141,10 @@ def get_log_service(
         log_repo: LogRepository = Depends(get_log_repository)
 ) -> LogService:
     return LogService(log_repo)
-""" def get_model_manager() -> ModelManager:
-    return ModelManager() """
+
+def get_model_manager() -> ModelManager:
+    """The process's model registry (its warm-up models are loaded by the app's lifespan)"""
+    return model_manager
 
 def get_qoption_service(
     qopt_repo: QOptionsRepository = Depends(get_qoptions_repository)
@@ -128,6 +168,16 @@ def get_ml_service(
     log_repo: LogRepository = Depends(get_log_repository),
     question_repo: QuestionRepository = Depends(get_question_repository),
     user_repo: UserRepository = Depends(get_user_repository),
-    quiz_repo: QuizRepository = Depends(get_quiz_repository)
+    quiz_repo: QuizRepository = Depends(get_quiz_repository),
+    engagement_repo: EngagementRepository = Depends(get_engagement_repository)
 ) -> MLService:
-    return MLService(analysis_repo, answer_repo, log_repo, question_repo, user_repo, quiz_repo)
+    return MLService(analysis_repo, answer_repo, log_repo, question_repo, user_repo, quiz_repo, engagement_repo=engagement_repo)
+
+def get_job_queue() -> JobQueue:
+    """The process's background job queue (started by the app's lifespan)"""
+    return job_queue
+
+def get_export_service(request: Request) -> ExportService:
+    """Exports stream after the request's sessions close, so they open their own session on a replica (or the primary)"""
+    key = client_key(request)
+    return ExportService(lambda: replica_router.read_session(key))
@@ -0,0 +1,19 @@
+"""
+    Custom exceptions raised below the routers and mapped to HTTP responses in main.py
+"""
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded or belongs to a different listing"""
+    pass
+
+class UnknownJobKindError(ValueError):
+    """Raised when a job is submitted (or recovered) with a kind no handler is registered for"""
+    pass
+
+class TaskTimeoutError(TimeoutError):
+    """Raised when work sent to the process pool doesn't finish within its timeout"""
+    pass
+
+class ModelNotFoundError(LookupError):
+    """Raised when a model, or the version of it asked for, isn't in the model registry"""
+    pass
@@ -3,13 +3,15 @@
     
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Dict, Any, Optional
 
 # import pydantic schemas, service, dependency
 from src.api.schemas.analysis_schema import AnalysisCreate, AnalysisResponse
 from src.services.analysis_service import AnalysisService
 from src.api.dependencies.common import get_analysis_service
+from src.utils.pagination import set_next_cursor, ID_KEYSET
+from src.utils.serialization import json_response
 
 router = APIRouter(prefix="/analyses", tags=["Analyses"])
 
@@ -40,12 +42,15 @@ async def get_analysis_by_id(
 @router.get("/user/{id}", response_model=List[AnalysisResponse], status_code=status.HTTP_200_OK)
 async def get_analyses_by_user_id(
     id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     analysis_service: AnalysisService = Depends(get_analysis_service)
-) -> List[AnalysisResponse]:
+) -> Response:
     """Retrieves all analyses for a user"""
-    analyses_list_dict = await analysis_service.get_analyses_by_user_id(id=id, skip=skip, limit=limit)
+    analyses_list_dict = await analysis_service.get_analyses_by_user_id(id=id, skip=skip, limit=limit, cursor=cursor)
     if analyses_list_dict == None:
         raise HTTPException(status_code=400, detail="Analyses for user could not be found")
-    return [AnalysisResponse.model_validate(analysis_dict) for analysis_dict in analyses_list_dict]
\ No newline at end of file
+    set_next_cursor(response, analyses_list_dict, ID_KEYSET, limit)
+    return json_response(List[AnalysisResponse], analyses_list_dict, response)
\ No newline at end of file
@@ -1,19 +1,25 @@
 """
     File handles all the routes for Answers table
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from typing import List, Dict, Any, Optional
 
 # import pydantic schemes
-from src.api.schemas.answer_schema import AnswerCreate, AnswerResponse, AnswerUpdate
+from src.api.schemas.answer_schema import AnswerCreate, AnswerResponse, AnswerUpdate, AnswerSubmission, AnswerBatchResult, RegradeResponse
 from src.api.schemas.log_schema import LogCreate
 # import AnswerService
 from src.services.answer_service import AnswerService
 #import dependency to inject the AnswerService
 from src.api.dependencies.common import get_answer_service
+from src.utils.pagination import set_next_cursor, ID_KEYSET
+from src.utils.serialization import json_response, negotiated_response
+from src.utils.content_negotiation import compressible
 
 router = APIRouter(prefix="/answers", tags=["Answers"])
 
+# upper bound on a single batch upload, comfortably above the longest quiz
+MAX_BATCH_SIZE = 200
+
 @router.post("/", response_model=AnswerResponse, status_code=status.HTTP_201_CREATED)
 async def create_answer_route(
     answer_data: AnswerCreate,
@@ -29,15 +35,34 @@ async def create_answer_route(
         raise HTTPException(status_code=400, detail="Could not send answer")
     return AnswerResponse.model_validate(answer_dict)
 
-@router.get("/all", response_model=List[AnswerResponse])
+@router.post("/batch", response_model=List[AnswerBatchResult], status_code=status.HTTP_201_CREATED)
+async def create_answers_batch_route(
+    submissions: List[AnswerSubmission],
+    answer_service: AnswerService = Depends(get_answer_service)
+) -> List[AnswerBatchResult]:
+    """Create all the answers (and their logs) of one quiz attempt at once
+        Valid items are written in a single transaction, each item reports its answer or an error
+    """
+    if len(submissions) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"A batch can hold at most {MAX_BATCH_SIZE} answers")
+    results = await answer_service.create_answers_batch(submissions)
+    if results == None:
+        raise HTTPException(status_code=400, detail="All answers in a batch must belong to the same user and quiz")
+    return [AnswerBatchResult.model_validate(result) for result in results]
+
+@router.get("/all", response_model=List[AnswerResponse], dependencies=[Depends(compressible)])
 async def get_all_answers(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     answer_service: AnswerService = Depends(get_answer_service)
-) -> List[AnswerResponse]:
+) -> Response:
     """Retrieve all answers"""
-    answer_list_dict = await answer_service.get_answers_with_questions(skip, limit)
-    return [AnswerResponse.model_validate(answer_dict) for answer_dict in answer_list_dict]
+    answer_list_dict = await answer_service.get_answers_with_questions(skip, limit, cursor)
+    set_next_cursor(response, answer_list_dict, ID_KEYSET, limit)
+    return negotiated_response(List[AnswerResponse], answer_list_dict, request, response)
 
 @router.get("/user/{id}", response_model=List[AnswerResponse])
 async def get_all_answers_by_user(
@@ -45,10 +70,10 @@ async def get_all_answers_by_user(
     skip: int = 0,
     limit: int = 10,
     answer_service: AnswerService = Depends(get_answer_service)
-) -> List[AnswerResponse]:
+) -> Response:
     """Retrieves all answers by users"""
     answers_list_dict = await answer_service.get_answers_by_user_id(id=id, skip=skip, limit=limit)
-    return [AnswerResponse.model_validate(answer_dict) for answer_dict in answers_list_dict]
+    return json_response(List[AnswerResponse], answers_list_dict)
 
 @router.get("/user/{user_id}/quiz/{quiz_id}", response_model=List[AnswerResponse])
 async def get_all_answers_by_user_and_quiz_id(
@@ -57,21 +82,33 @@ async def get_all_answers_by_user_and_quiz_id(
     skip: int = 0,
     limit: int = 10,
     answer_service: AnswerService = Depends(get_answer_service)
-) -> List[AnswerResponse]:
+) -> Response:
     """Retrieves all answers by users"""
     answers_list_dict = await answer_service.get_answers_by_user_id_and_quiz_id(user_id=user_id, quiz_id=quiz_id, skip=skip, limit=limit)
-    return [AnswerResponse.model_validate(answer_dict) for answer_dict in answers_list_dict]
+    return json_response(List[AnswerResponse], answers_list_dict)
 
-@router.get("/quiz/{id}", response_model=List[AnswerResponse])
+@router.get("/quiz/{id}", response_model=List[AnswerResponse], dependencies=[Depends(compressible)])
 async def get_all_answers_by_quiz_id(
     id: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     answer_service: AnswerService = Depends(get_answer_service)
-) -> List[AnswerResponse]:
+) -> Response:
     """Retrieves all answers by quiz id"""
-    answer_list_dict = await answer_service.get_answers_by_quiz_id(id=id, skip=skip, limit=limit)
-    return [AnswerResponse.model_validate(answer_dict) for answer_dict in answer_list_dict]
+    answer_list_dict = await answer_service.get_answers_by_quiz_id(id=id, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, answer_list_dict, ID_KEYSET, limit)
+    return negotiated_response(List[AnswerResponse], answer_list_dict, request, response)
+
+@router.post("/quiz/{quiz_id}/regrade", response_model=RegradeResponse)
+async def regrade_quiz(
+    quiz_id: int,
+    answer_service: AnswerService = Depends(get_answer_service)
+) -> RegradeResponse:
+    """Grades every multiple-choice and true/false answer to a quiz again against its questions' correct answers"""
+    return RegradeResponse.model_validate(await answer_service.regrade_quiz(quiz_id))
 
 @router.get("/{id}", response_model=AnswerResponse)
 async def get_answer_by_id(
@@ -0,0 +1,53 @@
+"""
+    File handles the export routes, which stream a term's answers and logs as NDJSON or CSV
+"""
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import datetime
+
+from src.api.schemas.export_schema import ExportFilters, ExportFormat
+from src.services.export_service import ExportService, MEDIA_TYPES
+from src.api.dependencies.common import get_export_service
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+def get_export_filters(
+    quiz_id: Optional[int] = Query(None, description="Only this quiz"),
+    school_id: Optional[int] = Query(None, description="Only students of this school"),
+    start: Optional[datetime] = Query(None, description="From this time (inclusive)"),
+    end: Optional[datetime] = Query(None, description="Until this time (exclusive)")
+) -> ExportFilters:
+    return ExportFilters(quiz_id=quiz_id, school_id=school_id, start=start, end=end)
+
+@router.get("/answers", response_class=StreamingResponse)
+async def export_answers(
+    format: ExportFormat = Query("ndjson"),
+    filters: ExportFilters = Depends(get_export_filters),
+    export_service: ExportService = Depends(get_export_service)
+) -> StreamingResponse:
+    """
+        Streams every answer matching the filters in id order, with the student's school
+        The date range applies to when the answer was submitted
+    """
+    return StreamingResponse(
+        export_service.export_answers(filters, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="answers.{format}"'}
+    )
+
+@router.get("/logs", response_class=StreamingResponse)
+async def export_logs(
+    format: ExportFormat = Query("ndjson"),
+    filters: ExportFilters = Depends(get_export_filters),
+    export_service: ExportService = Depends(get_export_service)
+) -> StreamingResponse:
+    """
+        Streams every log event matching the filters in id order, with the question's quiz and the student's school
+    """
+    return StreamingResponse(
+        export_service.export_logs(filters, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="logs.{format}"'}
+    )
@@ -0,0 +1,97 @@
+"""
+    File handles the internal routes that report the server's runtime state, e.g. cache counters
+"""
+
+from fastapi import APIRouter, status
+from typing import Dict, Any
+
+from src.core.token_cache import token_cache
+from src.core.user_cache import user_cache
+from src.core.quiz_content_cache import quiz_content_cache
+from src.core.resource_versions import resource_versions
+from src.core.database import async_engine, replica_router
+from src.core.pool import pool_stats
+from src.utils.content_negotiation import encoding_stats
+from src.workers.job_queue import job_queue
+from src.core.process_pool import process_pool
+from src.ml_core.model_manager import model_manager
+from src.ml_core.micro_batcher import micro_batcher
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+@router.get("/token-cache", status_code=status.HTTP_200_OK)
+async def get_token_cache_stats() -> Dict[str, Any]:
+    """
+        Hit/miss counters of the verified ID token cache
+    """
+    return token_cache.stats()
+
+@router.get("/user-cache", status_code=status.HTTP_200_OK)
+async def get_user_cache_stats() -> Dict[str, Any]:
+    """
+        Hit rate of the authenticated user cache (request_hits counts lookups answered by a request's own memo)
+    """
+    return user_cache.stats()
+
+@router.get("/quiz-cache", status_code=status.HTTP_200_OK)
+async def get_quiz_cache_stats() -> Dict[str, Any]:
+    """
+        Hit/miss/eviction counters of the quiz content cache (coalesced counts misses that waited on another request's load)
+    """
+    return quiz_content_cache.stats()
+
+@router.get("/http-cache", status_code=status.HTTP_200_OK)
+async def get_http_cache_stats() -> Dict[str, Any]:
+    """
+        Conditional requests: current resource versions and how many requests were answered with a 304
+    """
+    return resource_versions.stats()
+
+@router.get("/encoding", status_code=status.HTTP_200_OK)
+async def get_encoding_stats() -> Dict[str, Any]:
+    """
+        Bulk response encoding: MessagePack and gzip responses, and the bytes gzip saved
+    """
+    return encoding_stats.stats()
+
+@router.get("/pool", status_code=status.HTTP_200_OK)
+async def get_pool_stats() -> Dict[str, Any]:
+    """
+        Connection pool state: checked out and overflow connections, and checkout wait times
+    """
+    return pool_stats(async_engine)
+
+@router.get("/replicas", status_code=status.HTTP_200_OK)
+async def get_replica_stats() -> Dict[str, Any]:
+    """
+        Read routing: reads served by the primary and each replica, replica health and sticky (read-your-writes) reads
+    """
+    return replica_router.stats()
+
+@router.get("/jobs", status_code=status.HTTP_200_OK)
+async def get_job_stats() -> Dict[str, Any]:
+    """
+        Background job queue: workers, jobs waiting and running, and jobs completed and failed since startup
+    """
+    return job_queue.stats()
+
+@router.get("/process-pool", status_code=status.HTTP_200_OK)
+async def get_process_pool_stats() -> Dict[str, Any]:
+    """
+        CPU-bound ML work sent to the worker processes: tasks in flight, completed, failed, timed out and cancelled
+    """
+    return process_pool.stats()
+
+@router.get("/models", status_code=status.HTTP_200_OK)
+async def get_model_stats() -> Dict[str, Any]:
+    """
+        Loaded ML models: version, load time, resident memory (and how much of it is shared memory-mapped pages) and swaps
+    """
+    return model_manager.stats()
+
+@router.get("/batcher", status_code=status.HTTP_200_OK)
+async def get_batcher_stats() -> Dict[str, Any]:
+    """
+        Prediction micro-batching: requests, batches and their mean and largest size, and what flushed them
+    """
+    return micro_batcher.stats()
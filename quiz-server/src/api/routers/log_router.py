@@ -1,13 +1,16 @@
 """
     File handles all the routes for Logs table
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from typing import List, Dict, Any, Optional
 
 # import Pydantic schemas
 from src.api.schemas.log_schema import LogCreate, LogResponse
 from src.services.log_service import LogService
 from src.api.dependencies.common import get_log_service
+from src.utils.pagination import set_next_cursor, ID_KEYSET, TIME_ID_KEYSET
+from src.utils.serialization import json_response, negotiated_response
+from src.utils.content_negotiation import compressible
 
 router = APIRouter(prefix="/logs", tags=["Logs"])
 
@@ -23,17 +26,21 @@ async def create_log_route(
         raise HTTPException(status_code=400, detail="Log failed to be created")
     return LogResponse.model_validate(log_dict)
 
-@router.get("/all", response_model=List[LogResponse], status_code=status.HTTP_200_OK)
+@router.get("/all", response_model=List[LogResponse], status_code=status.HTTP_200_OK, dependencies=[Depends(compressible)])
 async def get_all_logs(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     log_service: LogService = Depends(get_log_service)
-) -> List[LogResponse]:
+) -> Response:
     """Retrieves all logs"""
-    log_list_dict = await log_service.get_logs(skip, limit)
+    log_list_dict = await log_service.get_logs(skip, limit, cursor)
     if log_list_dict == None:
         raise HTTPException(status_code=400, detail="No logs found")
-    return [LogResponse.model_validate(log_dict) for log_dict in log_list_dict]
+    set_next_cursor(response, log_list_dict, ID_KEYSET, limit)
+    return negotiated_response(List[LogResponse], log_list_dict, request, response)
 
 @router.get("/{id}", response_model=LogResponse, status_code=status.HTTP_200_OK)
 async def get_log_by_id(
@@ -47,17 +54,21 @@ async def get_log_by_id(
         raise HTTPException(status_code=404, detail="No log found")
     return LogResponse.model_validate(log_dict)
 
-@router.get("/user/{id}", response_model=List[LogResponse], status_code=status.HTTP_200_OK)
+@router.get("/user/{id}", response_model=List[LogResponse], status_code=status.HTTP_200_OK, dependencies=[Depends(compressible)])
 async def get_all_logs_by_user_id(
     id: int,
+    request: Request,
+    response: Response,
     question_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     log_service: LogService = Depends(get_log_service)
-) -> List[LogResponse]:
-    """Retrieve all logs by user"""
-    logs_list_dict = await log_service.get_logs_by_user_id(id=id, question_id=question_id, skip=skip, limit=limit)
+) -> Response:
+    """Retrieve all logs by user, in time order"""
+    logs_list_dict = await log_service.get_logs_by_user_id(id=id, question_id=question_id, skip=skip, limit=limit, cursor=cursor)
     if logs_list_dict == None:
         raise HTTPException(status_code=400, detail="No logs found for user")
-    return [LogResponse.model_validate(log_dict) for log_dict in logs_list_dict]
+    set_next_cursor(response, logs_list_dict, TIME_ID_KEYSET, limit)
+    return negotiated_response(List[LogResponse], logs_list_dict, request, response)
 
@@ -2,29 +2,135 @@
     File handles all the routes that will access all the ML model's functions, e.g. classification, trend analysis
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from typing import List, Dict, Any, Optional
 from pandas import DataFrame
 
 from src.services.ml_service import MLService
-from src.api.schemas.ml_schema import MLResponse
-from src.api.dependencies.common import get_ml_service
+from src.api.schemas.ml_schema import MLResponse, QuestionEngagementResponse, QuizEngagementResponse, ModelResponse, ModelActivate, PredictRequest, PredictResponse
+from src.api.schemas.job_schema import AnalysisJobCreate, JobResponse
+from src.api.dependencies.common import get_ml_service, get_job_queue, get_model_manager
+from src.api.dependencies.auth import validate_current_user
+from src.workers.job_queue import JobQueue
+from src.workers.ml_jobs import ANALYSE_JOB
+from src.ml_core.model_manager import ModelManager
+from src.utils.serialization import negotiated_response
+from src.utils.content_negotiation import compressible
 
 router = APIRouter(prefix="/ml", tags=["ML"])
 
-@router.get("/df/{id}", response_model=None, status_code=status.HTTP_200_OK)
+@router.get("/df/{id}", response_model=None, status_code=status.HTTP_200_OK, dependencies=[Depends(compressible)])
 async def get_df(
+    request: Request,
     quiz_id: int,
     skip: int = 0,
     limit: int = 10,
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     ml_service: MLService = Depends(get_ml_service)
-) -> List[Dict[str, Any]]:
+) -> Response:
     """
         Create and return a DataFrame, using the quiz id and a user id as a filter
     """
     dfs = await ml_service.analyse(id=quiz_id, skip=skip, limit=limit, user_id=user_id)
     if dfs == None:
         raise HTTPException(status_code=500, detail="Something went wrong")
-    print(dfs)
-    return dfs
\ No newline at end of file
+    return negotiated_response(List[Dict[str, Any]], dfs, request)
+
+@router.get("/engagement/{quiz_id}", response_model=List[QuestionEngagementResponse], status_code=status.HTTP_200_OK, dependencies=[Depends(compressible)])
+async def get_question_engagement(
+    request: Request,
+    quiz_id: int,
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    ml_service: MLService = Depends(get_ml_service)
+):
+    """
+        Time on task per user and question for a quiz: active and idle time, pauses and completion latency
+    """
+    engagement = await ml_service.get_question_engagement(quiz_id, user_id=user_id)
+    return negotiated_response(List[QuestionEngagementResponse], engagement, request)
+
+@router.get("/engagement/{quiz_id}/summary", response_model=QuizEngagementResponse, status_code=status.HTTP_200_OK)
+async def get_quiz_engagement(
+    quiz_id: int,
+    ml_service: MLService = Depends(get_ml_service)
+):
+    """
+        Time on task summary for a quiz across every student and question
+    """
+    summary = await ml_service.get_quiz_engagement(quiz_id)
+    if summary == None:
+        raise HTTPException(status_code=404, detail="No log events for this quiz")
+    return summary
+
+@router.post("/predict", response_model=PredictResponse, status_code=status.HTTP_200_OK)
+async def predict(
+    predict_data: PredictRequest,
+    ml_service: MLService = Depends(get_ml_service)
+):
+    """
+        Predictions of a model's active version, one per row of features. Requests arriving together are
+        predicted in one batch, each waits at most ML_BATCH_MAX_LATENCY_MS for the others
+    """
+    try:
+        return await ml_service.predict(predict_data.model, predict_data.features)
+    except ValueError as e:
+        # rows of different lengths, or not the number of features the model was trained on
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_analysis_job(
+    job_data: AnalysisJobCreate,
+    queue: JobQueue = Depends(get_job_queue)
+):
+    """
+        Queues the analysis of a whole quiz (or one user's answers) to run in the background, the analyses are
+        stored with the other analyses. Poll GET /ml/jobs/{id} for its status and result
+    """
+    job = await queue.submit(ANALYSE_JOB, {"quiz_id": job_data.quiz_id, "user_id": job_data.user_id}, job_data.priority)
+    if job == None:
+        raise HTTPException(status_code=500, detail="Failed to queue the job")
+    return job
+
+@router.get("/jobs/{id}", response_model=JobResponse, status_code=status.HTTP_200_OK)
+async def get_job(
+    id: int,
+    queue: JobQueue = Depends(get_job_queue)
+):
+    """
+        A job's status, with its result once completed (or its error once failed)
+    """
+    job = await queue.get_job(id)
+    if job == None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/models", response_model=List[ModelResponse], status_code=status.HTTP_200_OK)
+async def get_models(
+    manager: ModelManager = Depends(get_model_manager)
+):
+    """
+        The models in the registry with their saved versions and the version served
+    """
+    return [
+        {"name": name, "versions": manager.versions(name), "active": manager.active_version(name)}
+        for name in manager.names() if manager.versions(name)
+    ]
+
+@router.put("/models/{name}/active", response_model=ModelResponse, status_code=status.HTTP_200_OK)
+async def activate_model(
+    name: str,
+    model_data: ModelActivate,
+    current_user: Optional[Dict[str, Any]] = Depends(validate_current_user),
+    manager: ModelManager = Depends(get_model_manager)
+):
+    """
+        Serves another saved version of a model (a new one or a rollback). The version is loaded before it replaces
+        the current one, requests already running finish on the version they started with. Admins only
+    """
+    if not current_user or current_user['type'].value != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource"
+        )
+    await manager.activate(name, model_data.version)
+    return {"name": name, "versions": manager.versions(name), "active": manager.active_version(name)}
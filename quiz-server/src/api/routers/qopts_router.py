@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from typing import List, Dict, Any
 
 from src.api.schemas.qoptions_schema import QOptionsCreate, QOptionsResponse, QOptionsUpdate
 from src.services.qoption_service import QOPtionService
 
 from src.api.dependencies.common import get_qoption_service
+from src.utils.http_cache import conditional_get, CONTENT_CACHE_CONTROL
+from src.utils.serialization import json_response
 
 router = APIRouter(prefix="/qoptions", tags=["QOptions"])
 
@@ -25,12 +27,12 @@ async def get_all_qoptions(
     skip: int = 0,
     limit: int = 10,
     qoption_service: QOPtionService = Depends(get_qoption_service)
-) -> List[QOptionsResponse]:
+) -> Response:
     """Retrieve all question options"""
     qoption_list_dict = await qoption_service.get_qopts_by_question(q_id, skip, limit)
-    return [QOptionsResponse.model_validate(qoption_dict) for qoption_dict in qoption_list_dict]
+    return json_response(List[QOptionsResponse], qoption_list_dict)
 
-@router.get("/{id}", response_model=QOptionsResponse)
+@router.get("/{id}", response_model=QOptionsResponse, dependencies=[Depends(conditional_get("qoptions", CONTENT_CACHE_CONTROL))])
 async def get_qoption(
     id: int,
     qoption_service: QOPtionService = Depends(get_qoption_service)
@@ -1,14 +1,17 @@
 """
     File handles all the routes for Question table
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Dict, Any, Optional
 
 from src.api.schemas.question_schema import QuestionCreate, QuestionResponse
 
 from src.services.question_service import QuestionService
 
 from src.api.dependencies.common import get_question_service
+from src.utils.pagination import set_next_cursor, ID_KEYSET
+from src.utils.http_cache import conditional_get, CONTENT_CACHE_CONTROL
+from src.utils.serialization import json_response
 
 router = APIRouter(prefix="/questions", tags=["Questions"])
 
@@ -29,17 +32,20 @@ async def create_question_route(
 
 @router.get("/all", response_model=List[QuestionResponse])
 async def get_all_questions_route(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     question_service: QuestionService = Depends(get_question_service)
-) -> List[QuestionResponse]:
+) -> Response:
     """
         Retrieves a list of all questions
     """
-    questions_list_dict = await question_service.get_questions(skip=skip, limit=limit)
-    return [QuestionResponse.model_validate(question_dict) for question_dict in questions_list_dict]
+    questions_list_dict = await question_service.get_questions(skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, questions_list_dict, ID_KEYSET, limit)
+    return json_response(List[QuestionResponse], questions_list_dict, response)
 
-@router.get("/{id}", response_model=QuestionResponse)
+@router.get("/{id}", response_model=QuestionResponse, dependencies=[Depends(conditional_get("questions", CONTENT_CACHE_CONTROL))])
 async def get_question_route(
     id: int,
     question_service: QuestionService = Depends(get_question_service)
@@ -58,9 +64,9 @@ async def get_all_questions_by_quiz_id_route(
     skip: int = 0,
     limit: int = 10,
     question_service: QuestionService = Depends(get_question_service)
-) -> List[QuestionResponse]:
+) -> Response:
     """
         Retrieves a list of all questions
     """
     questions_list_dict = await question_service.get_questions_by_quiz_id(id=id, skip=skip, limit=limit)
-    return [QuestionResponse.model_validate(question_dict) for question_dict in questions_list_dict]
\ No newline at end of file
+    return json_response(List[QuestionResponse], questions_list_dict)
\ No newline at end of file
@@ -2,12 +2,15 @@
     File handles all the routes for Quiz router
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from typing import List, Dict, Any, Optional
 
-from src.api.schemas.quiz_schema import QuizCreate, QuizResponse, QuizUpdate
+from src.api.schemas.quiz_schema import QuizCreate, QuizResponse, QuizUpdate, QuizFullResponse
 from src.services.quiz_service import QuizService
 from src.api.dependencies.common import get_quiz_service
+from src.utils.pagination import set_next_cursor, ID_KEYSET
+from src.utils.http_cache import matches_etag, not_modified, conditional_get, CONTENT_CACHE_CONTROL
+from src.utils.serialization import json_response
 
 router = APIRouter(prefix="/quizzes", tags=["Quizzes"])
 
@@ -25,15 +28,18 @@ async def create_quiz_route(
 
 @router.get("/all", response_model=List[QuizResponse])
 async def get_all_quizzes_route(
+        response: Response,
         skip: int = 0,
         limit: int = 10,
+        cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
         quiz_service: QuizService = Depends(get_quiz_service)
-) -> List[QuizResponse]:
+) -> Response:
     """Retrieve list of all quizzes"""
-    quiz_list_dict = await quiz_service.get_quizzes(skip=skip, limit=limit)
-    return [QuizResponse.model_validate(quiz_dict) for quiz_dict in quiz_list_dict]
+    quiz_list_dict = await quiz_service.get_quizzes(skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, quiz_list_dict, ID_KEYSET, limit)
+    return json_response(List[QuizResponse], quiz_list_dict, response)
 
-@router.get("/{id}", response_model=QuizResponse, status_code=status.HTTP_200_OK)
+@router.get("/{id}", response_model=QuizResponse, status_code=status.HTTP_200_OK, dependencies=[Depends(conditional_get("quizzes", CONTENT_CACHE_CONTROL))])
 async def get_quiz_by_id(
     id: int,
     quiz_service: QuizService = Depends(get_quiz_service)
@@ -43,3 +49,21 @@ async def get_quiz_by_id(
     if not quiz_dict:
         raise HTTPException(status_code=404, detail="Quiz not found")
     return QuizResponse.model_validate(quiz_dict)
+
+@router.get("/{id}/full", response_model=QuizFullResponse, status_code=status.HTTP_200_OK)
+async def get_full_quiz(
+    id: int,
+    request: Request,
+    quiz_service: QuizService = Depends(get_quiz_service)
+) -> Response:
+    """
+        Retrieves a quiz with all its questions and their options in one response,
+        answers 304 when If-None-Match holds the current ETag
+    """
+    full_quiz = await quiz_service.get_full_quiz(id)
+    if full_quiz is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    body, etag = full_quiz
+    if matches_etag(request, etag):
+        return not_modified(etag, CONTENT_CACHE_CONTROL)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag, "Cache-Control": CONTENT_CACHE_CONTROL})
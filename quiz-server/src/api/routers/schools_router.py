@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Optional
 
 from src.api.schemas.schools_schema import SchoolCreate, SchoolResponse, SchoolUpdate
 
 from src.services.school_service import SchoolService
 
 from src.api.dependencies.common import get_school_service
+from src.utils.pagination import set_next_cursor, ID_KEYSET
+from src.utils.http_cache import conditional_get, REFERENCE_CACHE_CONTROL
+from src.utils.serialization import json_response
 
 router = APIRouter(prefix="/schools", tags=["Schools"])
 
@@ -20,17 +23,20 @@ async def create_school_route(
         raise HTTPException(status_code=400, detail="Could not create school")
     return SchoolResponse.model_validate(school_dict)
 
-@router.get("/all", response_model=List[SchoolResponse])
+@router.get("/all", response_model=List[SchoolResponse], dependencies=[Depends(conditional_get("schools", REFERENCE_CACHE_CONTROL))])
 async def get_all_schools(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     school_service: SchoolService = Depends(get_school_service)
-) -> List[SchoolResponse]:
+) -> Response:
     """Retrieve all schools"""
-    school_list_dict = await school_service.get_schools(skip, limit)
-    return [SchoolResponse.model_validate(school_dict) for school_dict in school_list_dict]
+    school_list_dict = await school_service.get_schools(skip, limit, cursor)
+    set_next_cursor(response, school_list_dict, ID_KEYSET, limit)
+    return json_response(List[SchoolResponse], school_list_dict, response)
 
-@router.get("/{id}", response_model=SchoolResponse)
+@router.get("/{id}", response_model=SchoolResponse, dependencies=[Depends(conditional_get("schools", REFERENCE_CACHE_CONTROL))])
 async def get_school(
     id: int,
     school_service: SchoolService = Depends(get_school_service)
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Optional
 
 from src.api.schemas.topics_schema import TopicCreate, TopicResponse, TopicUpdate
 from src.services.topic_service import TopicService
 
 from src.api.dependencies.common import get_topic_service
+from src.utils.pagination import set_next_cursor, ID_KEYSET
+from src.utils.http_cache import conditional_get, REFERENCE_CACHE_CONTROL
+from src.utils.serialization import json_response
 
 router = APIRouter(prefix="/topics", tags=["Topics"])
 
@@ -19,17 +22,20 @@ async def create_topic_route(
         raise HTTPException(status_code=400, detail="Could not create topic")
     return TopicResponse.model_validate(topic_dict)
 
-@router.get("/all", response_model=List[TopicResponse])
+@router.get("/all", response_model=List[TopicResponse], dependencies=[Depends(conditional_get("topics", REFERENCE_CACHE_CONTROL))])
 async def get_all_topics(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     topic_service: TopicService = Depends(get_topic_service)
-) -> List[TopicResponse]:
+) -> Response:
     """Retrieve all topics"""
-    topic_list_dict = await topic_service.get_all_topics(skip, limit)
-    return [TopicResponse.model_validate(topic_dict) for topic_dict in topic_list_dict]
+    topic_list_dict = await topic_service.get_all_topics(skip, limit, cursor)
+    set_next_cursor(response, topic_list_dict, ID_KEYSET, limit)
+    return json_response(List[TopicResponse], topic_list_dict, response)
 
-@router.get("/{id}", response_model=TopicResponse)
+@router.get("/{id}", response_model=TopicResponse, dependencies=[Depends(conditional_get("topics", REFERENCE_CACHE_CONTROL))])
 async def get_topic(
     id: int,
     topic_service: TopicService = Depends(get_topic_service)
@@ -2,7 +2,7 @@
     File handles all the routes for the User table
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from typing import List, Dict, Any, Optional
 
 # Import Pydantic schemas for request and response data
@@ -13,6 +13,8 @@ from src.services.user_service import UserService
 from src.api.dependencies.common import get_user_service
 from src.api.dependencies.auth import verify_firebase_token, validate_current_user
 from src.api.schemas.auth_schema import FirebaseUser
+from src.utils.pagination import set_next_cursor, ID_KEYSET
+from src.utils.serialization import json_response
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -34,11 +36,13 @@ async def create_user_route(
 
 @router.get("/all", response_model=List[UserResponse])
 async def get_all_users_route(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page, replaces skip"),
     current_user: Optional[Dict[str, Any]] = Depends(validate_current_user),
     user_service: UserService = Depends(get_user_service)
-) -> List[UserResponse]:
+) -> Response:
     """
     Retrieve a list of all users with pagination.
     """
@@ -47,10 +51,10 @@ async def get_all_users_route(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this resource"
         )
-    users_list_dict = await user_service.get_all_users(skip=skip, limit=limit)
-    print(f"Users list dict: {users_list_dict}")
+    users_list_dict = await user_service.get_all_users(skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, users_list_dict, ID_KEYSET, limit)
     # Convert each user dictionary in the list to a UserResponse Pydantic model
-    return [UserResponse.model_validate(user_dict) for user_dict in users_list_dict]
+    return json_response(List[UserResponse], users_list_dict, response)
 
 @router.get("/user/email", response_model=UserResponse)
 async def get_user_by_email_route(
@@ -66,7 +70,6 @@ async def get_user_by_email_route(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You do not have permission to access this resource"
         )
-    print(firebase_user)
     user_dict = await user_service.get_user_by_email(firebase_user.email)
     if not user_dict:
         raise HTTPException(status_code=404, detail="User not found.")
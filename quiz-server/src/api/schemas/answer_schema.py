@@ -4,6 +4,7 @@
 
 from pydantic import BaseModel
 from typing import Optional
+from src.api.schemas.log_schema import LogCreate
 
 # Base schema
 class AnswerBase(BaseModel):
@@ -26,10 +27,27 @@ class AnswerUpdate(AnswerBase):
 class AnswerResponse(AnswerBase):
     id: int
     marks: int
-    marksAchieved: int
+    marksAchieved: Optional[int] = None
     question: str
     correctAnswer: str
     type: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# one answer with its log event, as submitted by a client for one question
+class AnswerSubmission(BaseModel):
+    answer: AnswerCreate
+    log: LogCreate
+
+# per-item result of a batch submission, either the created answer or why it was rejected
+class AnswerBatchResult(BaseModel):
+    index: int
+    answer: Optional[AnswerResponse] = None
+    error: Optional[str] = None
+
+# outcome of regrading a quiz's multiple-choice and true/false answers
+class RegradeResponse(BaseModel):
+    quiz_id: int
+    graded: int
+    updated: int
@@ -0,0 +1,16 @@
+"""
+    Export router Pydantic schema
+"""
+
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal, Optional
+
+ExportFormat = Literal["ndjson", "csv"]
+
+# filters shared by the answer and log exports, the range is [start, end)
+class ExportFilters(BaseModel):
+    quiz_id: Optional[int] = None
+    school_id: Optional[int] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
@@ -0,0 +1,30 @@
+"""
+    Job Pydantic schema
+"""
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Optional
+
+from src.models.jobs_model import JobStatus
+
+class AnalysisJobCreate(BaseModel):
+    quiz_id: int
+    user_id: Optional[int] = None
+    # higher runs first
+    priority: int = Field(0, ge=0, le=9)
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    params: dict
+    priority: int
+    status: JobStatus
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -2,8 +2,8 @@
     ML router Pydantic schema
 """
 
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Any
 from pandas import DataFrame
 
 class MLBase(BaseModel):
@@ -15,4 +15,46 @@ class MLResponse(MLBase):
     user_id: Optional[int] = None
     input_data: str
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class QuestionEngagementResponse(BaseModel):
+    user_id: int
+    question_id: int
+    quiz_id: int
+    events: int
+    active_seconds: float
+    idle_seconds: float
+    pause_count: int
+    completed: bool
+    completion_seconds: Optional[float] = None
+
+class QuizEngagementResponse(BaseModel):
+    quiz_id: int
+    students: int
+    attempts: int
+    events: int
+    completion_rate: float
+    total_active_seconds: float
+    mean_active_seconds: float
+    mean_idle_seconds: float
+    pause_count: int
+    median_completion_seconds: Optional[float] = None
+
+class ModelResponse(BaseModel):
+    name: str
+    # oldest first
+    versions: List[str]
+    active: str
+
+class ModelActivate(BaseModel):
+    version: str = Field(..., min_length=1)
+
+class PredictRequest(BaseModel):
+    model: str
+    # one row of features per prediction
+    features: List[List[float]] = Field(..., min_length=1)
+
+class PredictResponse(BaseModel):
+    model: str
+    version: str
+    predictions: List[Any]
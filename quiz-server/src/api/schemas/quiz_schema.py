@@ -3,7 +3,10 @@
 """
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
+
+from src.api.schemas.question_schema import QuestionResponse
+from src.api.schemas.qoptions_schema import QOptionsResponse
 
 class QuizBase(BaseModel):
     title: str
@@ -26,4 +29,11 @@ class QuizResponse(QuizBase):
     # pydantic config to allow ORM mode
     # allows PyDantic to read attributes directly from SQLAlchemy Core Row objects (or ORM instances)
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class QuestionWithOptionsResponse(QuestionResponse):
+    options: List[QOptionsResponse] = []
+
+# a quiz with everything needed to render it (GET /quizzes/{id}/full)
+class QuizFullResponse(QuizResponse):
+    questions: List[QuestionWithOptionsResponse] = []
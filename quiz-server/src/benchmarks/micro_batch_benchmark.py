@@ -0,0 +1,90 @@
+"""
+    Benchmark for prediction micro-batching
+    Saves a model to a temporary registry, then has N concurrent clients each send one-row prediction requests
+    back to back, first unbatched (one predict per request) and then through the MicroBatcher, and reports the
+    throughput and the latency percentiles each client saw
+
+    Run from quiz-server: python -m src.benchmarks.micro_batch_benchmark --clients 1 16 64 --latency-ms 2 5
+"""
+
+import os
+import asyncio
+import argparse
+import tempfile
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("FIREBASE_SERVICE_ACCOUNT", "{}")
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from src.ml_core.model_manager import ModelManager
+from src.ml_core.micro_batcher import MicroBatcher
+
+MODEL = "bench"
+FEATURES = 20
+
+def train(kind: str) -> Any:
+    rng = np.random.default_rng(0)
+    X = rng.random((5000, FEATURES))
+    y = (X[:, 0] + X[:, 1] > 1).astype(int)
+    if kind == "forest":
+        return RandomForestClassifier(n_estimators=50, max_depth=10, random_state=0).fit(X, y)
+    return LogisticRegression().fit(X, y)
+
+async def measure(batcher: MicroBatcher, clients: int, duration: float, label: str) -> Dict[str, Any]:
+    rng = np.random.default_rng(1)
+    rows = rng.random((1000, FEATURES)).tolist()
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def client(i: int) -> None:
+        n = i
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await batcher.predict(MODEL, [rows[n % len(rows)]])
+            latencies.append(time.perf_counter() - started)
+            n += clients
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client(i) for i in range(clients)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    stats = batcher.stats()
+    return {
+        "method": label,
+        "requests_per_second": round(len(latencies) / elapsed),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "mean_batch_rows": stats["mean_batch_rows"]
+    }
+
+async def run(kind: str, clients: int, latencies_ms: List[float], max_batch_size: int, duration: float) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as directory:
+        models = ModelManager(directory)
+        models.save(MODEL, "1", train(kind))
+        await models.warm_up([MODEL])
+        results = [await measure(MicroBatcher(models, max_batch_size, 0), clients, duration, "unbatched")]
+        for latency_ms in latencies_ms:
+            batcher = MicroBatcher(models, max_batch_size, latency_ms / 1000)
+            results.append(await measure(batcher, clients, duration, f"batched {latency_ms:g}ms"))
+        return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", choices=["forest", "logistic"], default="forest")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[5])
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    print(f"{'clients':>8} {'method':<14} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'rows/batch':>11}")
+    for clients in args.clients:
+        for row in asyncio.run(run(args.model, clients, args.latency_ms, args.max_batch_size, args.seconds)):
+            print(f"{clients:>8} {row['method']:<14} {row['requests_per_second']:>8} {row['p50_ms']:>8} {row['p99_ms']:>8} {row['mean_batch_rows']:>11}")
+
+if __name__ == "__main__":
+    main()
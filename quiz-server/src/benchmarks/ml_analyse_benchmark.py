@@ -0,0 +1,113 @@
+"""
+    Benchmark for MLService.analyse
+    Seeds a SQLite database with one quiz answered by N students, then compares the old per-user,
+    per-answer query loop with the set-based analyse on round trips and latency
+
+    Run from quiz-server: python -m src.benchmarks.ml_analyse_benchmark --students 1000 10000
+"""
+
+import os
+import asyncio
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("FIREBASE_SERVICE_ACCOUNT", "{}")
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from src.core.migrations import run_migrations
+from src.models.user_model import users_table
+from src.models.question_model import questions_table
+from src.models.answers_model import answers_table
+from src.models.logs_model import logs_table
+from src.repositories.analysis_repository import AnalysisRepository
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.quiz_repository import QuizRepository
+from src.services.ml_service import MLService
+
+QUIZ_ID = 1
+QUESTIONS_PER_QUIZ = 10
+LOGS_PER_ANSWER = 2
+
+async def seed(session: AsyncSession, students: int) -> None:
+    """One quiz of QUESTIONS_PER_QUIZ questions, every student answers each one and logs a start and a completion"""
+    start = datetime(2025, 1, 1, 9)
+    await session.execute(insert(questions_table), [
+        {"id": q, "quiz_id": QUIZ_ID, "question": f"Question {q}", "marks": 1, "level": "low", "correctAnswer": "a", "type": "mc"}
+        for q in range(1, QUESTIONS_PER_QUIZ + 1)
+    ])
+    await session.execute(insert(users_table), [
+        {"id": u, "email": f"student{u}@example.com", "password": "x", "name": "Student", "surname": str(u), "type": "student"}
+        for u in range(1, students + 1)
+    ])
+    await session.execute(insert(answers_table), [
+        {"user_id": u, "question_id": q, "quiz_id": QUIZ_ID, "answer": "a"}
+        for u in range(1, students + 1) for q in range(1, QUESTIONS_PER_QUIZ + 1)
+    ])
+    await session.execute(insert(logs_table), [
+        {"user_id": u, "question_id": q, "action": action, "time": start + timedelta(minutes=q, seconds=n * 30)}
+        for u in range(1, students + 1) for q in range(1, QUESTIONS_PER_QUIZ + 1)
+        for n, action in enumerate(["started", "completed"][:LOGS_PER_ANSWER])
+    ])
+    await session.commit()
+
+async def per_user_loop(answer_repo: AnswerRepository, log_repo: LogRepository, user_ids: List[int]) -> int:
+    """The query pattern analyse used before: one query per student, then one per answer"""
+    records = 0
+    for user_id in user_ids:
+        answers = await answer_repo.get_answers_by_user_and_quiz_id(user_id, QUIZ_ID, limit=QUESTIONS_PER_QUIZ)
+        for answer in answers:
+            logs = await log_repo.get_logs_by_user_id(user_id, question_id=answer["question_id"])
+            if len(logs) > 0:
+                records += 1
+    return records
+
+async def measure(session: AsyncSession, statements: List[str], label: str, work: Any) -> Dict[str, Any]:
+    statements.clear()
+    started = time.perf_counter()
+    records = await work()
+    elapsed = time.perf_counter() - started
+    return {"method": label, "round_trips": len(statements), "seconds": round(elapsed, 3), "records": records}
+
+async def run(students: int) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        statements: List[str] = []
+        try:
+            await run_migrations(engine)
+            event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+            async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+                await seed(session, students)
+                answer_repo, log_repo = AnswerRepository(session), LogRepository(session)
+                service = MLService(AnalysisRepository(session), answer_repo, log_repo, QuestionRepository(session), UserRepository(session), QuizRepository(session))
+                user_ids = list((await session.execute(select(users_table.c.id))).scalars())
+
+                async def set_based() -> int:
+                    return len(await service.analyse(QUIZ_ID))
+
+                return [
+                    await measure(session, statements, "per-user loop", lambda: per_user_loop(answer_repo, log_repo, user_ids)),
+                    await measure(session, statements, "set-based", set_based)
+                ]
+        finally:
+            await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+    print(f"{'students':>9} {'method':<14} {'round trips':>11} {'seconds':>8} {'records':>8}")
+    for students in args.students:
+        for row in asyncio.run(run(students)):
+            print(f"{students:>9} {row['method']:<14} {row['round_trips']:>11} {row['seconds']:>8} {row['records']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+    Benchmark for the DataPrepocessor event frame
+    Seeds a SQLite database so one quiz has the requested number of log events, then reports how long
+    the typed per-event frame takes to build and how much memory it holds per 100k events, next to
+    the same join built from untyped (object) columns
+
+    Run from quiz-server: python -m src.benchmarks.preprocessor_benchmark --events 100000 1000000
+"""
+
+import os
+import asyncio
+import argparse
+import tempfile
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("FIREBASE_SERVICE_ACCOUNT", "{}")
+
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from src.core.migrations import run_migrations
+from src.ml_core.data_processing import DataPrepocessor
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.benchmarks.ml_analyse_benchmark import seed, QUIZ_ID, QUESTIONS_PER_QUIZ, LOGS_PER_ANSWER
+
+async def run(events: int) -> List[Dict[str, Any]]:
+    students = max(1, events // (QUESTIONS_PER_QUIZ * LOGS_PER_ANSWER))
+    preprocessor = DataPrepocessor()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        try:
+            await run_migrations(engine)
+            async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+                await seed(session, students)
+                answers = await AnswerRepository(session).get_quiz_answers_with_questions(QUIZ_ID)
+                logs = await LogRepository(session).get_logs_by_quiz_id(QUIZ_ID)
+        finally:
+            await engine.dispose()
+
+    results = []
+    started = time.perf_counter()
+    typed = preprocessor.build_event_frame(answers, logs)
+    results.append(("typed", typed, time.perf_counter() - started))
+
+    started = time.perf_counter()
+    untyped = pd.DataFrame(answers).merge(pd.DataFrame(logs), on=["user_id", "question_id"])
+    results.append(("object columns", untyped, time.perf_counter() - started))
+
+    return [{
+        "frame": label,
+        "events": len(frame),
+        "seconds": round(elapsed, 3),
+        "mb_per_100k": round(preprocessor.memory_usage(frame) / len(frame) * 100_000 / 2**20, 2)
+    } for label, frame, elapsed in results]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, nargs="+", default=[100_000])
+    args = parser.parse_args()
+    print(f"{'events':>9} {'frame':<15} {'seconds':>8} {'MB/100k events':>15}")
+    for events in args.events:
+        for row in asyncio.run(run(events)):
+            print(f"{row['events']:>9} {row['frame']:<15} {row['seconds']:>8} {row['mb_per_100k']:>15}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+    Benchmark for the process pool
+    Seeds a SQLite database with one quiz answered by N students, then runs MLService.analyse inline (on the
+    event loop) and in the process pool while a ticker coroutine measures how late the event loop wakes it up,
+    i.e. how long every other request would have been kept waiting
+
+    Run from quiz-server: python -m src.benchmarks.process_pool_benchmark --students 10000 50000
+"""
+
+import os
+import asyncio
+import argparse
+import tempfile
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("FIREBASE_SERVICE_ACCOUNT", "{}")
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from src.core.migrations import run_migrations
+from src.core.process_pool import ProcessPool
+from src.benchmarks.ml_analyse_benchmark import seed, QUIZ_ID
+from src.repositories.analysis_repository import AnalysisRepository
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.quiz_repository import QuizRepository
+from src.services.ml_service import MLService
+
+# how often the ticker asks to be woken up
+TICK_SECONDS = 0.005
+
+async def measure(service: MLService, label: str) -> Dict[str, Any]:
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            expected = time.perf_counter() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    ticking = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    records = await service.analyse(QUIZ_ID)
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticking
+    lags.sort()
+    return {
+        "method": label,
+        "seconds": round(elapsed, 3),
+        "records": len(records),
+        "p99_lag_ms": round(lags[int(len(lags) * 0.99)] * 1000, 1) if lags else 0.0,
+        "max_lag_ms": round(lags[-1] * 1000, 1) if lags else 0.0
+    }
+
+async def run(students: int, workers: int) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        pool = ProcessPool(workers)
+        try:
+            await run_migrations(engine)
+            await pool.start()
+            async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+                await seed(session, students)
+                repos = (
+                    AnalysisRepository(session), AnswerRepository(session), LogRepository(session),
+                    QuestionRepository(session), UserRepository(session), QuizRepository(session)
+                )
+                return [
+                    await measure(MLService(*repos, pool=ProcessPool(0)), "inline"),
+                    await measure(MLService(*repos, pool=pool), "process pool")
+                ]
+        finally:
+            await pool.stop()
+            await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, nargs="+", default=[10000])
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    print(f"{'students':>9} {'method':<13} {'seconds':>8} {'records':>8} {'p99 lag ms':>11} {'max lag ms':>11}")
+    for students in args.students:
+        for row in asyncio.run(run(students, args.workers)):
+            print(f"{students:>9} {row['method']:<13} {row['seconds']:>8} {row['records']:>8} {row['p99_lag_ms']:>11} {row['max_lag_ms']:>11}")
+
+if __name__ == "__main__":
+    main()
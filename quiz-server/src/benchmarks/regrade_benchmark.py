@@ -0,0 +1,80 @@
+"""
+    Benchmark for regrading a quiz
+    Seeds a SQLite database with one quiz answered by N students (QUESTIONS_PER_QUIZ answers each), then regrades it
+    answer by answer (grade_answer and one UPDATE per answer, as allocating marks by hand does) and with
+    AnswerService.regrade_quiz (one read, one vectorized pass, one UPDATE per marks value)
+
+    Run from quiz-server: python -m src.benchmarks.regrade_benchmark --students 1000 10000
+"""
+
+import os
+import asyncio
+import argparse
+import tempfile
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("FIREBASE_SERVICE_ACCOUNT", "{}")
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+from src.core.migrations import run_migrations
+from src.models.answers_model import answers_table
+from src.benchmarks.ml_analyse_benchmark import seed, QUIZ_ID
+from src.ml_core.grading import grade_answer
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.unit_of_work import UnitOfWork
+from src.services.answer_service import AnswerService
+
+async def per_answer(answers: AnswerRepository) -> int:
+    columns = await answers.get_quiz_answers_for_grading(QUIZ_ID)
+    for answer_id, answer, correct_answer, question_type, marks in zip(
+        columns["answer_id"], columns["answer"], columns["correct_answer"], columns["type"], columns["marks"]
+    ):
+        await answers.allocate_marks_to_answer(answer_id, grade_answer(answer, correct_answer, question_type, marks))
+    return len(columns["answer_id"])
+
+async def run(students: int, skip_per_answer: bool) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        try:
+            await run_migrations(engine)
+            async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+                await seed(session, students)
+                answers = AnswerRepository(session)
+                service = AnswerService(answers, LogRepository(session), UnitOfWork(session))
+                results = []
+
+                async def measure(label: str, work: Any) -> None:
+                    # every answer starts ungraded, so each method writes every answer's marks
+                    await session.execute(update(answers_table).values(marksAchieved=None))
+                    await session.commit()
+                    started = time.perf_counter()
+                    graded = await work()
+                    results.append({"method": label, "answers": graded, "seconds": round(time.perf_counter() - started, 3)})
+
+                if not skip_per_answer:
+                    await measure("per answer", lambda: per_answer(answers))
+
+                async def vectorized() -> int:
+                    return (await service.regrade_quiz(QUIZ_ID))["graded"]
+                await measure("vectorized", vectorized)
+                return results
+        finally:
+            await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--skip-per-answer", action="store_true", help="only time the vectorized regrade")
+    args = parser.parse_args()
+    print(f"{'students':>9} {'method':<11} {'answers':>8} {'seconds':>8}")
+    for students in args.students:
+        for row in asyncio.run(run(students, args.skip_per_answer)):
+            print(f"{students:>9} {row['method']:<11} {row['answers']:>8} {row['seconds']:>8}")
+
+if __name__ == "__main__":
+    main()
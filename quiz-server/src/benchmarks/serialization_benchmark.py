@@ -0,0 +1,91 @@
+"""
+    Benchmark for list response serialization
+    For each response schema, encodes a page of rows the way the routes used to (model_validate per row,
+    then FastAPI's response_model validation and jsonable_encoder) and with the shared fast path
+    (one cached TypeAdapter pass straight to JSON bytes), and reports the cost per item
+
+    Run from quiz-server: python -m src.benchmarks.serialization_benchmark --rows 100 1000
+"""
+
+import os
+import asyncio
+import argparse
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("FIREBASE_SERVICE_ACCOUNT", "{}")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from src.api.schemas.answer_schema import AnswerResponse
+from src.api.schemas.analysis_schema import AnalysisResponse
+from src.api.schemas.log_schema import LogResponse
+from src.api.schemas.question_schema import QuestionResponse
+from src.api.schemas.quiz_schema import QuizResponse
+from src.api.schemas.user_schema import UserResponse
+from src.models.logs_model import Actions
+from src.models.question_model import Levels, Type as QuestionType
+from src.models.user_model import Type as UserType
+from src.utils.serialization import serialize
+
+# one row per schema, shaped like the repositories return them (enum columns as enums)
+ROWS: Dict[Any, Callable[[int], Dict[str, Any]]] = {
+    AnswerResponse: lambda i: {"id": i, "question_id": i % 10, "user_id": i, "quiz_id": 1, "answer": "4", "marks": 2,
+                               "marksAchieved": None, "question": "What is 2 + 2?", "correctAnswer": "4", "type": QuestionType.mc},
+    UserResponse: lambda i: {"id": i, "email": f"student{i}@example.com", "name": "Ada", "surname": "Lovelace",
+                             "school_id": 1, "type": UserType.student, "grade": 7},
+    LogResponse: lambda i: {"id": i, "action": Actions.started, "time": datetime(2025, 1, 1, 8, 0, i % 60), "user_id": i, "question_id": i % 10},
+    QuestionResponse: lambda i: {"id": i, "question": "What is 2 + 2?", "marks": 2, "level": Levels.low,
+                                 "correctAnswer": "4", "quiz_id": 1, "type": QuestionType.mc},
+    QuizResponse: lambda i: {"id": i, "title": "Sums", "duration": 30, "grade": 7, "topic_id": 1, "school_id": None},
+    AnalysisResponse: lambda i: {"id": i, "user_id": i, "question_id": i % 10, "analysis": "Answered after one pause"},
+}
+
+def timed(encode: Callable[[], bytes], repeat: int) -> float:
+    """Best of repeat runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encode()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def run(rows: int, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for schema, row in ROWS.items():
+        data = [row(i) for i in range(rows)]
+        field = APIRoute("/", endpoint=lambda: None, response_model=List[schema]).response_field
+
+        def before() -> bytes:
+            models = [schema.model_validate(d) for d in data]
+            content = asyncio.run(serialize_response(field=field, response_content=models, is_coroutine=True))
+            return JSONResponse(content).body
+
+        def after() -> bytes:
+            return serialize(List[schema], data)
+
+        assert len(before()) > 0 and len(after()) > 0
+        old, new = timed(before, repeat), timed(after, repeat)
+        results.append({
+            "schema": schema.__name__,
+            "before_us": old / rows * 1e6,
+            "after_us": new / rows * 1e6,
+            "speedup": old / new
+        })
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'rows':>6} {'schema':<18} {'before us/item':>15} {'after us/item':>14} {'speedup':>8}")
+    for rows in args.rows:
+        for row in run(rows, args.repeat):
+            print(f"{rows:>6} {row['schema']:<18} {row['before_us']:>15.2f} {row['after_us']:>14.2f} {row['speedup']:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
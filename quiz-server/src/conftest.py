@@ -0,0 +1,80 @@
+"""
+    Shared setup for the tests in src: the settings every test imports with, and fresh SQLite databases
+    migrated to the latest schema that count the statements sent to them
+"""
+
+import os
+import sys
+import types
+import asyncio
+from typing import Optional
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("FIREBASE_SERVICE_ACCOUNT", "{}")
+
+try:
+    import firebase_admin
+except ImportError:
+    # the routers import the auth dependencies, whose tokens the tests never verify (they override
+    # validate_current_user), so a stand-in is enough to import them without the Firebase SDK
+    firebase_admin = types.ModuleType("firebase_admin")
+    firebase_admin.auth = types.ModuleType("firebase_admin.auth")
+    sys.modules.update({"firebase_admin": firebase_admin, "firebase_admin.auth": firebase_admin.auth})
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.pool import NullPool
+
+from src.core.migrations import run_migrations
+
+class Database:
+    """
+        A test database and the statements sent to it since it was migrated (clear() them to count from a point)
+    """
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.statements = []
+        self._sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: self.statements.append(args[2]))
+
+    def session(self) -> AsyncSession:
+        return self._sessions()
+
+    def run(self, test) -> None:
+        """
+            Runs await test(session) on a new session, on an event loop of its own
+        """
+        async def _run():
+            async with self.session() as session:
+                await test(session)
+        asyncio.run(_run())
+
+@pytest.fixture
+def make_database(tmp_path):
+    """
+        make_database() is an in-memory database, make_database(name) a file in tmp_path for tests whose app runs
+        on the TestClient's event loop (NullPool: no connection is shared between loops). migrate=False leaves it empty
+    """
+    engines = []
+
+    def make(name: Optional[str] = None, migrate: bool = True) -> Database:
+        if name == None:
+            engine = create_async_engine("sqlite+aiosqlite://")
+        else:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db", poolclass=NullPool)
+        engines.append(engine)
+        if migrate:
+            asyncio.run(run_migrations(engine))
+        return Database(engine)
+
+    yield make
+    for engine in engines:
+        asyncio.run(engine.dispose())
+
+@pytest.fixture
+def database(make_database) -> Database:
+    """
+        A fresh in-memory database
+    """
+    return make_database()
@@ -0,0 +1,60 @@
+"""
+    Tests for MessagePack negotiation and gzip on the routes that opt in
+"""
+
+from typing import List
+
+import msgpack
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from src.api.schemas.topics_schema import TopicResponse
+from src.utils.content_negotiation import CompressionMiddleware, compressible, encoding_stats, preferred_media_type, accepts_encoding
+from src.utils.serialization import negotiated_response
+
+TOPICS = [{"id": i, "name": "Algebra", "details": "Linear equations"} for i in range(200)]
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/bulk", dependencies=[Depends(compressible)])
+    async def bulk(request: Request, response: Response, rows: int = 200) -> Response:
+        response.headers["ETag"] = '"v1"'
+        return negotiated_response(List[TopicResponse], TOPICS[:rows], request, response)
+
+    @app.get("/plain")
+    async def plain() -> List[dict]:
+        return TOPICS
+
+    return app
+
+def test_bulk_routes_negotiate_msgpack_and_gzip():
+    client = TestClient(make_app())
+    saved = encoding_stats.stats()["bytes_saved"]
+
+    json_response = client.get("/bulk", headers={"Accept-Encoding": "identity"})
+    assert json_response.headers["content-type"] == "application/json"
+    assert "content-encoding" not in json_response.headers and json_response.json() == TOPICS
+
+    packed = client.get("/bulk", headers={"Accept": "application/msgpack, application/json;q=0.5", "Accept-Encoding": "identity"})
+    assert packed.headers["content-type"] == "application/msgpack" and "Accept" in packed.headers["vary"]
+    assert msgpack.unpackb(packed.content) == TOPICS and len(packed.content) < len(json_response.content)
+
+    gzipped = client.get("/bulk", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.json() == TOPICS
+    assert gzipped.headers["etag"] == 'W/"v1"' and "Accept-Encoding" in gzipped.headers["vary"]
+    assert encoding_stats.stats()["bytes_saved"] > saved
+
+    # small bodies and routes that didn't opt in go out as they are
+    assert "content-encoding" not in client.get("/bulk?rows=1", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/plain", headers={"Accept-Encoding": "gzip"}).headers
+
+def test_accept_headers_are_ranked_by_quality():
+    assert preferred_media_type(None) == "application/json"
+    assert preferred_media_type("*/*") == "application/json"
+    assert preferred_media_type("application/x-msgpack") == "application/msgpack"
+    assert preferred_media_type("application/json;q=0.1, application/*;q=0.9") == "application/msgpack"
+    assert preferred_media_type("text/html") == "application/json"
+    assert accepts_encoding("gzip, br", "gzip") and not accepts_encoding("gzip;q=0", "gzip")
+    assert accepts_encoding("*", "gzip") and not accepts_encoding(None, "gzip")
@@ -3,7 +3,7 @@
 """
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Optional, Literal
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
 
@@ -19,6 +19,62 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     FIREBASE_SERVICE_ACCOUNT: str
 
+    # engine and connection pool (sizing is ignored for an in-memory SQLite database)
+    DB_ECHO: bool = False # logs every statement, keep it off outside local debugging
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30 # seconds a checkout waits for a connection before failing
+    DB_POOL_RECYCLE: int = 1800 # seconds, keep it under MySQL's wait_timeout
+    # always: ping on every checkout, idle: only connections idle longer than DB_PRE_PING_IDLE_SECONDS, never
+    DB_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_PRE_PING_IDLE_SECONDS: int = 300
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None # MySQL max_execution_time for SELECTs
+    DB_POOL_WARMUP: int = 5 # connections opened at startup
+
+    # read replicas, comma separated async URLs (empty: every read goes to the primary)
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: int = 10
+    DB_READ_YOUR_WRITES_SECONDS: int = 5 # a client's reads stay on the primary this long after it writes
+
+    # verified ID tokens kept in memory (entries also expire at the token's exp)
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    # authenticated users' rows kept in memory, dropped on update/delete
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    # quizzes' questions and options kept in memory, dropped on question/option writes in the same process,
+    # the TTL bounds how long another worker's writes go unseen
+    QUIZ_CACHE_SIZE: int = 500
+    QUIZ_CACHE_TTL_SECONDS: int = 5
+    # longest a version ETag stays valid, bounds how long a worker can miss another worker's write
+    HTTP_ETAG_TTL_SECONDS: int = 60
+    # gzip for the routes that opt in: smallest body worth compressing, and the zlib level (1 fastest - 9 smallest)
+    GZIP_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    # where the snapshot job writes the Parquet analytics snapshots (src/workers/snapshot_job.py)
+    SNAPSHOT_DIR: str = "snapshots"
+    # ids below the watermark each snapshot refresh re-reads, for rows committed after higher ids
+    SNAPSHOT_RESCAN_IDS: int = 1000
+    # background jobs (POST /ml/jobs) run at most this many at a time per process
+    JOB_WORKERS: int = 2
+    JOB_STALE_SECONDS: int = 3600 # a job still running after this is taken as abandoned by a stopped process
+    # log events folded into the engagement metrics are re-read this many ids below the highest one folded in,
+    # so an event committed after higher ids (concurrent inserts) is still counted, once
+    ENGAGEMENT_RESCAN_IDS: int = 1000
+    # how often each process folds new log events into the engagement metrics, the engagement routes lag by up to this
+    ENGAGEMENT_REFRESH_SECONDS: float = 10
+    # worker processes for CPU-bound ML work (0 runs it on the event loop), and how long a request waits for it
+    ML_PROCESS_WORKERS: int = 2
+    ML_TASK_TIMEOUT_SECONDS: Optional[float] = 60
+    # trained models, one directory of joblib versions per model (src/ml_core/model_manager.py)
+    MODEL_DIR: str = "ml_models"
+    MODEL_MMAP_MODE: Optional[Literal["r", "c"]] = "r" # None reads each model into the process's own memory
+    MODEL_WARMUP: str = "" # comma separated models loaded at startup, the others load on first use
+    MODEL_REFRESH_SECONDS: int = 10 # how soon a worker serves a version another worker activated
+    # prediction requests for the same model are batched until this many rows wait, or the first has waited this long
+    ML_BATCH_MAX_SIZE: int = 64
+    ML_BATCH_MAX_LATENCY_MS: float = 5 # 0 predicts every request on its own
+
     # this setting helps pydantic_settings find the variables
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8')
 
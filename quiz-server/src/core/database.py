@@ -4,19 +4,33 @@
 from sqlalchemy import MetaData, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from contextlib import asynccontextmanager
+import logging
 from .config import settings
+from .pool import engine_options, install_pool_events
+from .replicas import ReplicaRouter
+
+logger = logging.getLogger(__name__)
 
 # The DATABASE_URL is defined in your .env and loaded via config.py
 # Make sure your URL uses an async dialect, like 'mysql+asyncmy'
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 # Create the asynchronous engine
-# pool_pre_ping=True helps maintain connections for long-running apps
+# echo, pool sizing, recycling and the pre-ping strategy come from the DB_* settings (see core/pool.py)
 async_engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    echo=True,
-    pool_pre_ping=True
+    **engine_options(settings)
 )
+install_pool_events(async_engine, settings)
+
+# replica engines take the same pool settings, the router picks one per request for reads
+replica_engines = [
+    create_async_engine(url.strip(), **engine_options(settings, url.strip()))
+    for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()
+]
+for replica_engine in replica_engines:
+    install_pool_events(replica_engine, settings)
+replica_router = ReplicaRouter(async_engine, replica_engines, settings.DB_READ_YOUR_WRITES_SECONDS)
 
 # Create an asynchronous sessionmaker
 AsyncSessionLocal = async_sessionmaker(
@@ -39,18 +53,19 @@ async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
-# --- IMPORTANT: Initialize DB (create tables) during startup ---
+# --- IMPORTANT: Initialize DB (run schema migrations) during startup ---
 async def init_db():
-    """Initializes the database: creates tables if they don't exist.
-    This runs blocking SQLAlchemy Core operations (create_all) in an async context.
+    """Initializes the database: applies any pending versioned migrations (see core/migrations.py).
+    The first migration creates the tables, later ones evolve them (e.g. indexes).
     """
-    print("Attempting to initialize database tables (SQLAlchemy Core)...")
+    # imported here so importing the database doesn't load every migration's DDL
+    from .migrations import run_migrations
+
+    logger.info("Applying database migrations")
 
-    async with async_engine.begin() as conn:
-        # run_sync is the correct method to run a synchronous operation in an async context
-        await conn.run_sync(metadata.create_all)
+    applied = await run_migrations(async_engine)
 
-    print("Database tables created/checked.")
+    logger.info(f"Database migrations applied: {applied if applied else 'none pending'}")
 
     # Optional: Basic connection test
     try:
@@ -3,6 +3,9 @@ from src.core.config import settings
 import firebase_admin
 from firebase_admin import credentials, auth
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Get the Firebase service account json from env variables
 service_account_str = settings.FIREBASE_SERVICE_ACCOUNT
@@ -18,4 +21,35 @@ try:
     firebase_admin.initialize_app(cred)
     print("Firebase Admin SDK initialized successfully")
 except Exception as e:
-    raise RuntimeError(f"Failed to initialize Firebase Admin SDK: {e}")
\ No newline at end of file
+    raise RuntimeError(f"Failed to initialize Firebase Admin SDK: {e}")
+
+def prefetch_signing_keys() -> bool:
+    """
+    Fetches Google's ID token signing certificates ahead of the first request
+    verify_id_token downloads them through an HTTP-caching session (kept for the certificates' max-age),
+    so warming that same session at startup means no request pays for the fetch
+    Blocking, call it on the threadpool. Returns False if the keys couldn't be fetched (verification still works)
+    """
+    try:
+        request, cert_url = _token_verifier_request()
+    except AttributeError as e:
+        logger.warning(
+            f"Not prefetching the Firebase signing keys, firebase_admin {firebase_admin.__version__} moved its token verifier "
+            f"({e}). The first token verification fetches them instead"
+        )
+        return False
+    try:
+        request(cert_url, method="GET")
+        return True
+    except Exception as e:
+        logger.warning(f"Could not prefetch the Firebase signing keys: {e}")
+        return False
+
+def _token_verifier_request():
+    """
+    The HTTP-caching session verify_id_token fetches the certificates through, and their URL
+    firebase_admin has no public API for either, so this reads its internals (as of the pinned firebase_admin==7.1.0)
+    Kept on its own so an SDK upgrade that moves them only costs the prefetch: the AttributeError is logged
+    """
+    verifier = auth._get_client(None)._token_verifier
+    return verifier.request, verifier.id_token_verifier.cert_url
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+    Versioned schema migrations, run once at startup by init_db
+    Each migration runs once per database and is recorded in the schema_migrations table
+    To change the schema, append a new Migration to MIGRATIONS with its own DDL (never edit one that has shipped),
+    then change src/models to match: query_plans_test checks the migrated schema against the models
+"""
+
+from typing import Callable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from datetime import datetime, timezone
+import logging
+from sqlalchemy import (
+    Table, Column, Index, ForeignKey, Integer, String, Text, Double, JSON, Enum, DateTime, TIMESTAMP, MetaData,
+    Connection, inspect, select, insert, text
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# how long a starting process waits for another one's migrations before giving up
+MIGRATION_LOCK_TIMEOUT_SECONDS = 60
+
+# kept out of the application metadata
+migrations_metadata = MetaData()
+
+schema_migrations_table = Table(
+    "schema_migrations",
+    migrations_metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+# Each migration's DDL is written out as it was when the migration shipped, never read from src/models: a model
+# that changes later must not change what an old migration does. Enums are frozen as their values
+
+# migration 1: the tables as the app created them before migrations existed
+baseline_metadata = MetaData()
+
+Table(
+    "schools",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(255), nullable=False),
+    Column("province", String(100), nullable=False),
+    Column("area", Enum("urban", "rural", "township", "suburban", name="area"), nullable=False),
+    Column("type", Enum("public", "private", name="type"), nullable=False)
+)
+Table(
+    "topics",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False),
+    Column("details", String(100), nullable=False)
+)
+Table(
+    "users",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True, unique=True),
+    Column("email", String(100), unique=True, nullable=False),
+    Column("password", String(100), nullable=False),
+    Column("name", String(100), nullable=False),
+    Column("surname", String(100), nullable=False),
+    Column("school_id", Integer, ForeignKey("schools.id"), nullable=True),
+    Column("type", Enum("student", "teacher", "admin", name="type"), nullable=False),
+    Column("grade", Integer, nullable=True)
+)
+Table(
+    "quizzes",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(255), nullable=False),
+    Column("duration", Integer, nullable=False),
+    Column("grade", Integer, nullable=False),
+    Column("school_id", Integer, ForeignKey("schools.id"), nullable=True),
+    Column("topic_id", Integer, ForeignKey("topics.id"), nullable=False)
+)
+Table(
+    "questions",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True, unique=True),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("question", Text, nullable=False),
+    Column("marks", Integer, nullable=False),
+    Column("level", Enum("low", "medium", "high", name="levels"), nullable=False),
+    Column("correctAnswer", String(255), nullable=False),
+    Column("type", Enum("text", "mc", "tf", name="type"), nullable=False)
+)
+Table(
+    "qoptions",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("option", String(100), nullable=False),
+    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False)
+)
+Table(
+    "answers",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True, unique=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("answer", Text, nullable=True),
+    Column("marksAchieved", Integer, nullable=True)
+)
+Table(
+    "logs",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("action", Enum("paused", "resumed", "started", "completed", name="actions"), nullable=False),
+    Column("time", TIMESTAMP, nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False)
+)
+Table(
+    "analyses",
+    baseline_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False),
+    Column("analysis", Text, nullable=False)
+)
+
+# migration 5
+jobs_metadata = MetaData()
+
+Table(
+    "jobs",
+    jobs_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("kind", String(50), nullable=False),
+    Column("params", JSON, nullable=False),
+    Column("priority", Integer, nullable=False),
+    Column("status", Enum("queued", "running", "completed", "failed", name="jobstatus"), nullable=False),
+    Column("result", JSON, nullable=True),
+    Column("error", Text, nullable=True),
+    Column("created_at", TIMESTAMP, nullable=False),
+    Column("started_at", TIMESTAMP, nullable=True),
+    Column("finished_at", TIMESTAMP, nullable=True),
+    Index("ix_jobs_status", "status", "id")
+)
+
+# migration 6 (referenced tables are stubs, create_all only creates the two new ones)
+engagement_metadata = MetaData()
+
+for name in ("users", "questions", "quizzes"):
+    Table(name, engagement_metadata, Column("id", Integer, primary_key=True))
+Table(
+    "engagement",
+    engagement_metadata,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True, autoincrement=False),
+    Column("question_id", Integer, ForeignKey("questions.id"), primary_key=True, autoincrement=False),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("events", Integer, nullable=False),
+    Column("active_seconds", Double, nullable=False),
+    Column("idle_seconds", Double, nullable=False),
+    Column("pause_count", Integer, nullable=False),
+    Column("started_at", TIMESTAMP, nullable=True),
+    Column("completed_at", TIMESTAMP, nullable=True),
+    Column("last_action", Enum("paused", "resumed", "started", "completed", name="actions"), nullable=False),
+    Column("last_time", TIMESTAMP, nullable=False),
+    Index("ix_engagement_quiz", "quiz_id", "user_id", "question_id")
+)
+Table(
+    "engagement_applied_logs",
+    engagement_metadata,
+    Column("log_id", Integer, primary_key=True, autoincrement=False)
+)
+
+def _create_tables(conn: Connection, frozen: MetaData, names: Sequence[str]) -> None:
+    """Creates the named tables of a migration's metadata that don't exist yet"""
+    frozen.create_all(conn, tables=[frozen.tables[name] for name in names], checkfirst=True)
+
+def _create_indexes(conn: Connection, indexes: Sequence[Tuple[str, str, Sequence[str]]]) -> None:
+    """
+        Creates (name, table, columns) indexes that don't exist yet
+        A table that doesn't exist yet is skipped, the migration creating it later brings its indexes
+    """
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    for name, table_name, columns in indexes:
+        if table_name not in tables or name in {index["name"] for index in inspector.get_indexes(table_name)}:
+            continue
+        logger.info(f"Creating index {name} on {table_name}")
+        table = Table(table_name, MetaData(), *[Column(column, Integer) for column in columns])
+        Index(name, *[table.c[column] for column in columns]).create(conn)
+
+def _create_baseline_tables(conn: Connection) -> None:
+    """Creates the tables the app had before migrations existed (databases from then already have them)"""
+    _create_tables(conn, baseline_metadata, list(baseline_metadata.tables))
+
+def _create_hot_path_indexes(conn: Connection) -> None:
+    """Adds the composite indexes for the repositories' hot filters"""
+    _create_indexes(conn, [
+        ("ix_answers_user_quiz", "answers", ["user_id", "quiz_id", "question_id"]),
+        ("ix_answers_quiz", "answers", ["quiz_id", "id"]),
+        ("ix_logs_user_question_time", "logs", ["user_id", "question_id", "time"]),
+        ("ix_logs_user_time", "logs", ["user_id", "time", "id"]),
+        ("ix_questions_quiz", "questions", ["quiz_id", "id"]),
+        ("ix_qoptions_question", "qoptions", ["question_id", "id"]),
+        ("ix_analyses_user", "analyses", ["user_id", "id"])
+    ])
+
+def _create_logs_question_index(conn: Connection) -> None:
+    """Adds ix_logs_question_time (every event for a question, across users)"""
+    _create_indexes(conn, [("ix_logs_question_time", "logs", ["question_id", "time"])])
+
+def _add_answers_created_at(conn: Connection) -> None:
+    """Adds answers.created_at to tables created before it existed, earlier answers keep a null"""
+    columns = {column["name"] for column in inspect(conn).get_columns("answers")}
+    if "created_at" not in columns:
+        logger.info("Adding column created_at to answers")
+        conn.execute(text("ALTER TABLE answers ADD COLUMN created_at TIMESTAMP NULL"))
+
+def _create_jobs_table(conn: Connection) -> None:
+    _create_tables(conn, jobs_metadata, ["jobs"])
+
+def _create_engagement_tables(conn: Connection) -> None:
+    _create_tables(conn, engagement_metadata, ["engagement", "engagement_applied_logs"])
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline_tables", _create_baseline_tables),
+    Migration(2, "hot_path_indexes", _create_hot_path_indexes),
+    Migration(3, "logs_question_index", _create_logs_question_index),
+    Migration(4, "answers_created_at", _add_answers_created_at),
+    Migration(5, "jobs_table", _create_jobs_table),
+    Migration(6, "engagement_tables", _create_engagement_tables),
+]
+
+def _applied_versions(conn: Connection) -> Set[int]:
+    migrations_metadata.create_all(conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations_table.c.version)).scalars())
+
+async def run_migrations(engine: AsyncEngine, target: Optional[int] = None) -> List[int]:
+    """
+        Applies every pending migration in version order (up to target, if given), each in its own transaction
+        On MySQL a named lock stops several workers starting at once from racing each other
+        Returns the versions that were applied by this call
+    """
+    applied_now: List[int] = []
+    async with engine.connect() as conn:
+        is_mysql = conn.dialect.name == "mysql"
+        if is_mysql:
+            # 1 once the lock is held, 0 if another process held it for the whole timeout, NULL on an error
+            locked = (await conn.execute(text(f"SELECT GET_LOCK('schema_migrations', {MIGRATION_LOCK_TIMEOUT_SECONDS})"))).scalar()
+            await conn.commit() # named locks are session scoped, end the implicit transaction
+            if locked != 1:
+                raise RuntimeError(f"Could not take the schema_migrations lock within {MIGRATION_LOCK_TIMEOUT_SECONDS}s, another process is still migrating")
+        try:
+            async with conn.begin():
+                applied = await conn.run_sync(_applied_versions)
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+                logger.info(f"Applying migration {migration.version}: {migration.name}")
+                async with conn.begin():
+                    await conn.run_sync(migration.upgrade)
+                    await conn.execute(insert(schema_migrations_table).values(
+                        version=migration.version,
+                        name=migration.name,
+                        applied_at=datetime.now(timezone.utc).replace(tzinfo=None)
+                    ))
+                applied_now.append(migration.version)
+        finally:
+            if is_mysql:
+                await conn.execute(text("SELECT RELEASE_LOCK('schema_migrations')"))
+    return applied_now
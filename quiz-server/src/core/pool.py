@@ -0,0 +1,135 @@
+"""
+    Connection pool tuning and telemetry
+    Builds the engine's pool options from the settings, times every checkout, and warms the pool at startup
+"""
+
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import time
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, ConnectionPoolEntry
+
+from .config import Settings
+
+logger = logging.getLogger(__name__)
+
+# connection_record.info key holding when the connection went back to the pool
+CHECKED_IN_AT_KEY = "checked_in_at"
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited for a connection"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+def engine_options(settings: Settings, database_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+        Keyword arguments for create_async_engine from the DB_* settings, for DATABASE_URL or a replica's URL
+        Pool sizing only applies to queue pools, an in-memory SQLite database gets a StaticPool and no sizing
+    """
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    url = make_url(database_url or settings.DATABASE_URL)
+    pool_class = url.get_dialect(_is_async=True).get_pool_class(url)
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            poolclass=InstrumentedAsyncPool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE
+        )
+    options["pool_pre_ping"] = settings.DB_PRE_PING == "always"
+    return options
+
+def install_pool_events(engine: AsyncEngine, settings: Settings) -> None:
+    """
+        Connection events for the settings that have no create_async_engine argument:
+        'idle' pre-ping (only ping connections that sat in the pool longer than DB_PRE_PING_IDLE_SECONDS)
+        and the MySQL statement timeout
+    """
+    sync_engine = engine.sync_engine
+
+    if settings.DB_PRE_PING == "idle":
+        @event.listens_for(sync_engine, "checkin")
+        def _mark_checked_in(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+            connection_record.info[CHECKED_IN_AT_KEY] = time.monotonic()
+
+        @event.listens_for(sync_engine, "checkout")
+        def _ping_idle(dbapi_connection: Any, connection_record: ConnectionPoolEntry, connection_proxy: Any) -> None:
+            checked_in_at = connection_record.info.get(CHECKED_IN_AT_KEY)
+            if checked_in_at is None or time.monotonic() - checked_in_at < settings.DB_PRE_PING_IDLE_SECONDS:
+                return
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            except Exception as e:
+                # the pool discards this connection and retries the checkout with a fresh one
+                raise exc.DisconnectionError(f"Idle connection failed its ping: {e}")
+            finally:
+                cursor.close()
+
+    if settings.DB_STATEMENT_TIMEOUT_MS and sync_engine.dialect.name == "mysql":
+        @event.listens_for(sync_engine, "connect")
+        def _set_statement_timeout(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+            # MySQL only enforces max_execution_time on SELECT statements
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET SESSION max_execution_time = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+            cursor.close()
+
+async def warm_pool(engine: AsyncEngine, connections: int) -> int:
+    """
+        Opens connections concurrently at startup so the first requests don't pay for the handshakes
+        Returns how many were opened, capped at the pool size
+    """
+    pool = engine.sync_engine.pool
+    if isinstance(pool, QueuePool):
+        connections = min(connections, pool.size())
+    else:
+        connections = min(connections, 1)
+
+    async def _open() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*[_open() for _ in range(connections)])
+    return connections
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """Live pool state plus the checkout wait times recorded by InstrumentedAsyncPool"""
+    pool = engine.sync_engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow()
+        )
+    if isinstance(pool, InstrumentedAsyncPool):
+        stats.update(
+            checkouts=pool.checkouts,
+            timeouts=pool.timeouts,
+            mean_wait_ms=pool.total_wait / pool.checkouts * 1000 if pool.checkouts else 0.0,
+            max_wait_ms=pool.max_wait * 1000
+        )
+    return stats
@@ -0,0 +1,124 @@
+"""
+    Process pool for CPU-bound ML and pandas work
+    Joins, sorts and model calls hold the GIL, so run on the event loop (or in its threads) they stall every other
+    request for as long as they take. ProcessPool sends them to worker processes instead: the arguments go over as
+    pickled NumPy buffers (raw bytes, not one Python object per row), and pickling and unpickling happen on the
+    executor's own threads, so the event loop only awaits a future
+    Started and stopped by the app's lifespan. Until it is started (tests, scripts) work runs inline
+"""
+
+from typing import Any, Callable, Dict, Optional, TypeVar
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import time
+
+from .config import settings
+from ..api.exceptions.custom_exceptions import TaskTimeoutError
+
+T = TypeVar("T")
+
+def _ready() -> bool:
+    return True
+
+class ProcessPool:
+    def __init__(self, workers: int, timeout: Optional[float] = None) -> None:
+        """
+            workers is the number of worker processes (0 keeps every task inline)
+            timeout is the default seconds a caller waits for a task, None waits as long as it takes
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # one slot per worker process: tasks wait here, not in the executor's call queue, where they can't be cancelled
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.in_flight = 0
+        self.task_seconds = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    async def start(self) -> None:
+        """
+            Starts the worker processes and waits for each to be up, so the first request doesn't pay for
+            spawning them and importing pandas. Workers are spawned (not forked) so they never inherit the
+            event loop, open connections or threads of this process
+        """
+        if self.workers <= 0 or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._slots = asyncio.Semaphore(self.workers)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self._executor, _ready) for _ in range(self.workers)])
+
+    async def stop(self) -> None:
+        """Cancels the tasks still waiting and waits for the running ones, off the event loop"""
+        executor, self._executor, self._slots = self._executor, None, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None) -> T:
+        """
+            Runs fn(*args) in a worker process and returns its result, fn must be a module level function
+            Raises TaskTimeoutError after timeout seconds (default: the pool's timeout), waiting for a free worker included
+            On a timeout, or if the caller is cancelled (e.g. the client went away), a task still waiting for a worker
+            is dropped. One that has started can't be interrupted in its process, it finishes (holding its worker)
+            and its result is discarded
+        """
+        if self._executor is None:
+            return fn(*args)
+        timeout = self.timeout if timeout is None else timeout
+        self.submitted += 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._submit(fn, *args), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TaskTimeoutError(f"{fn.__name__} took longer than {timeout} seconds")
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.task_seconds += time.perf_counter() - started
+        self.completed += 1
+        return result
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        assert self._executor is not None and self._slots is not None
+        slots = self._slots
+        await slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # the worker is free again once the task is done, whether or not anyone still waits for it
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers if self.started else 0,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "task_seconds": round(self.task_seconds, 3)
+        }
+
+# shared by every request in the process, started and stopped by the app's lifespan
+process_pool = ProcessPool(settings.ML_PROCESS_WORKERS, settings.ML_TASK_TIMEOUT_SECONDS)
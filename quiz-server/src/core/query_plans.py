@@ -0,0 +1,23 @@
+"""
+    Query plan checks
+    Runs EXPLAIN on a statement and reports any table it would read with a full scan
+"""
+
+from typing import Any, List, Sequence
+from sqlalchemy import Connection
+
+def find_full_scans(conn: Connection, statement: str, parameters: Sequence[Any] | dict[str, Any] = ()) -> List[str]:
+    """
+        EXPLAINs a compiled statement (as sent to the driver) and returns the plan lines that are full table scans
+        SQLite: EXPLAIN QUERY PLAN lines starting with 'SCAN <table>'
+        MySQL: EXPLAIN rows with access type ALL
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall() # type: ignore[arg-type]
+        details = [row[-1] for row in plan]
+        return [detail for detail in details if detail.startswith("SCAN ") and "CONSTANT ROW" not in detail]
+    if dialect == "mysql":
+        plan = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().fetchall() # type: ignore[arg-type]
+        return [f"{row['table']}: type=ALL" for row in plan if row["type"] == "ALL"]
+    raise NotImplementedError(f"No query plan check for the {dialect} dialect")
@@ -0,0 +1,97 @@
+"""
+    Cache for quiz content
+    Holds each quiz with its questions and their options, keyed by quiz id, so opening a quiz or a question
+    doesn't query the database while the content is unchanged
+    Entries are dropped by the question and option writes in this process. Another worker's writes aren't seen
+    here, so the TTL is kept to seconds (QUIZ_CACHE_TTL_SECONDS): that bounds how long a changed question, e.g. a
+    fixed correctAnswer, can be served stale. Grading never reads through this cache, it reads the questions
+    from the primary
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import time
+
+from .config import settings
+from .ttl_cache import TTLCache
+from ..utils.http_cache import etag_for
+
+class QuizContentCache(TTLCache[int, Dict[str, Any]]):
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+            Each entry is {"quiz": quiz row or None, "questions": [question rows in id order], "options": {question_id: [option rows in id order]}}
+            Question and option ids are indexed back to their quiz, so writes by id can invalidate it, for as long
+            as the quiz is cached (the index entries go with it when it expires or is evicted)
+        """
+        super().__init__(maxsize, ttl, clock)
+        self._quiz_by_question: Dict[int, int] = {}
+        self._question_by_option: Dict[int, int] = {}
+
+    async def get_quiz(self, quiz_id: int, load: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Returns a quiz's content, loading it once on a miss (concurrent misses share the load)"""
+        return await self.get_or_load(quiz_id, load)
+
+    def _stored(self, quiz_id: int, content: Dict[str, Any]) -> None:
+        for question in content["questions"]:
+            self._quiz_by_question[question["id"]] = quiz_id
+        for question_id, options in content["options"].items():
+            for option in options:
+                self._question_by_option[option["id"]] = question_id
+
+    def _dropped(self, quiz_id: int, content: Dict[str, Any]) -> None:
+        # only the index entries still pointing at this quiz, a question may have moved to a quiz cached since
+        for question in content["questions"]:
+            if self._quiz_by_question.get(question["id"]) == quiz_id:
+                del self._quiz_by_question[question["id"]]
+        for question_id, options in content["options"].items():
+            for option in options:
+                if self._question_by_option.get(option["id"]) == question_id:
+                    del self._question_by_option[option["id"]]
+
+    def cached_options(self, question_id: int) -> Optional[List[Dict[str, Any]]]:
+        """
+            Returns a question's options if its quiz is cached, without loading anything
+            Return:
+                List[Dict[str, Any]]: The question's option rows
+                None: Return null if the question's quiz isn't cached
+        """
+        quiz_id = self._quiz_by_question.get(question_id)
+        if quiz_id is None:
+            return None
+        content = self.get(quiz_id)
+        if content is None:
+            return None
+        return content["options"].get(question_id)
+
+    def rendered(self, content: Dict[str, Any], render: Callable[[Dict[str, Any]], bytes]) -> Tuple[bytes, str]:
+        """
+            Returns a cached quiz's serialized body and its strong ETag, rendering it once per load
+            (the body is kept on the entry, so it goes away with it)
+        """
+        payload = content.get("rendered")
+        if payload is None:
+            body = render(content)
+            payload = content["rendered"] = (body, etag_for(body))
+        return payload
+
+    def invalidate_quiz(self, quiz_id: int) -> None:
+        self.invalidate(quiz_id)
+
+    def invalidate_question(self, question_id: int) -> None:
+        """Drops the cached quiz a question belongs to"""
+        quiz_id = self._quiz_by_question.pop(question_id, None)
+        if quiz_id is not None:
+            self.invalidate(quiz_id)
+
+    def invalidate_option(self, option_id: int) -> None:
+        """Drops the cached quiz an option belongs to"""
+        question_id = self._question_by_option.pop(option_id, None)
+        if question_id is not None:
+            self.invalidate_question(question_id)
+
+    def clear(self) -> None:
+        super().clear()
+        self._quiz_by_question.clear()
+        self._question_by_option.clear()
+
+# shared by every request in the process
+quiz_content_cache = QuizContentCache(settings.QUIZ_CACHE_SIZE, settings.QUIZ_CACHE_TTL_SECONDS)
@@ -0,0 +1,106 @@
+"""
+    Read/write splitting
+    Routes each request's reads to a healthy replica (round-robin) and keeps writes on the primary.
+    A client that just wrote reads from the primary for a short window, so it sees its own writes
+    despite replication lag
+"""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+import itertools
+import logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+class ReplicaRouter:
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine], sticky_seconds: float, health_timeout: float = 2.0) -> None:
+        """
+            primary takes every write, replicas serve reads while healthy
+            sticky_seconds is how long a client's reads stay on the primary after it wrote
+        """
+        self.primary = primary
+        self.replicas = replicas
+        self.health_timeout = health_timeout
+        self.healthy: Dict[AsyncEngine, bool] = {replica: True for replica in replicas}
+        self.reads: Dict[AsyncEngine, int] = {engine: 0 for engine in [primary, *replicas]}
+        self.sticky_reads = 0
+        self._round_robin = itertools.count()
+        self._recent_writers: TTLCache[str, bool] = TTLCache(maxsize=100000, ttl=sticky_seconds)
+        # same session options as AsyncSessionLocal
+        self._sessionmakers = {
+            engine: async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for engine in [primary, *replicas]
+        }
+
+    def record_write(self, client_key: Optional[str]) -> None:
+        """Pins a client's reads to the primary for the sticky window"""
+        if client_key is not None and self.replicas:
+            self._recent_writers.put(client_key, True)
+
+    def engine_for_read(self, client_key: Optional[str] = None) -> AsyncEngine:
+        """
+            Picks the engine for a request's reads
+            Return:
+                AsyncEngine: The primary if the client wrote recently or no replica is healthy, otherwise the next healthy replica
+        """
+        if client_key is not None and self.replicas and self._recent_writers.get(client_key):
+            self.sticky_reads += 1
+            engine = self.primary
+        else:
+            healthy = [replica for replica in self.replicas if self.healthy[replica]]
+            engine = healthy[next(self._round_robin) % len(healthy)] if healthy else self.primary
+        self.reads[engine] += 1
+        return engine
+
+    def session(self, engine: AsyncEngine) -> AsyncSession:
+        """A new session on the primary or a replica engine"""
+        return self._sessionmakers[engine]()
+
+    def read_session(self, client_key: Optional[str] = None) -> AsyncSession:
+        """A new session for reads outside a request's own sessions, e.g. a streamed export"""
+        return self.session(self.engine_for_read(client_key))
+
+    async def check_health(self) -> Dict[str, bool]:
+        """Pings every replica, a replica that fails or times out gets no reads until it passes again"""
+        async def _ping(replica: AsyncEngine) -> bool:
+            try:
+                async with replica.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=self.health_timeout)
+                return True
+            except Exception as e:
+                logger.warning(f"Replica {_name(replica)} failed its health check: {e}")
+                return False
+
+        results = await asyncio.gather(*[_ping(replica) for replica in self.replicas])
+        for replica, healthy in zip(self.replicas, results):
+            if healthy and not self.healthy[replica]:
+                logger.info(f"Replica {_name(replica)} is healthy again")
+            self.healthy[replica] = healthy
+        return {_name(replica): healthy for replica, healthy in zip(self.replicas, results)}
+
+    async def run_health_checks(self, interval: float) -> None:
+        """Background task started in lifespan, checks the replicas every interval seconds until cancelled"""
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "primary": {"name": _name(self.primary), "reads": self.reads[self.primary]},
+            "replicas": [
+                {"name": _name(replica), "healthy": self.healthy[replica], "reads": self.reads[replica]}
+                for replica in self.replicas
+            ],
+            "sticky_reads": self.sticky_reads
+        }
+
+def _name(engine: AsyncEngine) -> str:
+    return engine.url.render_as_string(hide_password=True)
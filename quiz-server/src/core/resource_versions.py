@@ -0,0 +1,41 @@
+"""
+    Version counters for HTTP conditional requests
+    Every write to a kind of reference data (topics, schools, quizzes, questions, qoptions) bumps its counter,
+    so a route can tell whether a client's ETag is still current without reading the database.
+    Counters live in the process: the ETag carries a boot epoch so another worker (or a restart) never
+    validates it, and a time window so a worker that missed another worker's write stops answering 304
+    once HTTP_ETAG_TTL_SECONDS pass
+"""
+
+from typing import Any, Callable, Dict
+import secrets
+import time
+
+from .config import settings
+
+class ResourceVersions:
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.time) -> None:
+        """ttl is the longest an ETag stays valid in seconds, even without writes"""
+        self.ttl = ttl
+        self.clock = clock
+        self.epoch = secrets.token_hex(4)
+        self._versions: Dict[str, int] = {}
+        self.not_modified = 0
+
+    def bump(self, resource: str) -> None:
+        """Called once a write to the resource is committed, every ETag issued for it stops matching"""
+        self._versions[resource] = self._versions.get(resource, 0) + 1
+
+    def etag(self, resource: str) -> str:
+        """
+            Strong ETag for the current version of a resource
+            Take it before reading the data: a write landing in between then only makes the ETag older than the body
+        """
+        window = int(self.clock() // self.ttl)
+        return f'"{resource}.{self.epoch}.{self._versions.get(resource, 0)}.{window}"'
+
+    def stats(self) -> Dict[str, Any]:
+        return {"epoch": self.epoch, "versions": dict(self._versions), "not_modified": self.not_modified}
+
+# shared by every request in the process
+resource_versions = ResourceVersions(settings.HTTP_ETAG_TTL_SECONDS)
@@ -0,0 +1,53 @@
+"""
+    Cache for verified Firebase ID tokens
+    A bounded LRU of decoded claims keyed by a hash of the token, each entry living for at most the
+    configured TTL and never past the token's own exp, so repeat requests skip the signature check
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import hashlib
+import time
+
+from .config import settings
+from .ttl_cache import TTLCache
+
+class TokenCache(TTLCache[str, Dict[str, Any]]):
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.time) -> None:
+        """
+            maxsize bounds the number of tokens held (least recently used go first)
+            ttl is the longest an entry lives in seconds, clock is wall time as the token's exp is epoch seconds
+        """
+        super().__init__(maxsize, ttl, clock)
+
+    @staticmethod
+    def key(token: str) -> str:
+        """The raw token is never kept in memory as a key, only its hash"""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+            Returns the cached claims of a token
+            Return:
+                Dict[str, Any]: The decoded claims
+                None: Return null if the token isn't cached or its entry expired
+        """
+        return super().get(self.key(token))
+
+    def put(self, token: str, claims: Dict[str, Any], expires_at: Optional[float] = None) -> None:
+        """Caches verified claims until min(now + ttl, exp), tokens already past exp are not cached"""
+        if expires_at is None:
+            expires_at = _token_exp(claims)
+        super().put(self.key(token), claims, expires_at)
+
+    async def get_or_verify(self, token: str, verify: Callable[[str], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+            Returns the cached claims of a token, or verifies it once and caches the result until its exp
+            Concurrent requests with the same token share one verification, failures are never cached
+        """
+        return await self.get_or_load(self.key(token), lambda: verify(token), expires_at=_token_exp)
+
+def _token_exp(claims: Dict[str, Any]) -> Optional[float]:
+    return float(claims["exp"]) if "exp" in claims else None
+
+# shared by every request in the process
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL_SECONDS)
@@ -0,0 +1,149 @@
+"""
+    In-process LRU cache with a time to live per entry
+    Shared by the caches that keep hot lookups (verified tokens, authenticated users) out of the threadpool and the database
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+from collections import OrderedDict
+import asyncio
+import time
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class TTLCache(Generic[K, V]):
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+            maxsize bounds the number of entries (least recently used go first)
+            ttl is the longest an entry lives, in the clock's seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        # one load per key at a time, concurrent misses for the same key wait for it (see get_or_load)
+        self._in_flight: Dict[K, "asyncio.Future[V]"] = {}
+        # bumped by invalidate, a load that started before an invalidation doesn't cache its result
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loads = 0
+        self.coalesced = 0
+
+    def get(self, key: K) -> Optional[V]:
+        """
+            Returns a cached value and counts the lookup as a hit or a miss
+            Return:
+                V: The cached value
+                None: Return null if the key isn't cached or its entry expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= self.clock():
+            del self._entries[key]
+            self._dropped(key, entry[0])
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: K, value: V, expires_at: Optional[float] = None) -> None:
+        """Caches a value until min(now + ttl, expires_at), values that would already be expired are not cached"""
+        now = self.clock()
+        deadline = now + self.ttl if expires_at is None else min(now + self.ttl, expires_at)
+        if deadline <= now:
+            return
+        replaced = self._entries.get(key)
+        self._entries[key] = (value, deadline)
+        self._entries.move_to_end(key)
+        if replaced is not None:
+            self._dropped(key, replaced[0])
+        self._stored(key, value)
+        while len(self._entries) > self.maxsize:
+            evicted_key, (evicted, _) = self._entries.popitem(last=False)
+            self._dropped(evicted_key, evicted)
+            self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        """Drops an entry, returns its value if it was cached"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._dropped(key, entry[0])
+        return entry[0]
+
+    def _stored(self, key: K, value: V) -> None:
+        """Called once a value is cached, for subclasses that index their entries"""
+
+    def _dropped(self, key: K, value: V) -> None:
+        """Called once a value leaves the cache (expired, evicted, replaced or popped), see _stored"""
+
+    def invalidate(self, key: K) -> None:
+        """Drops an entry after its source changed, loads already in flight won't cache their (stale) result"""
+        self._generation += 1
+        self.pop(key)
+
+    async def get_or_load(self, key: K, load: Callable[[], Awaitable[V]], expires_at: Optional[Callable[[V], Optional[float]]] = None) -> V:
+        """
+            Returns the cached value, or runs load once and caches its result (until expires_at(value) if given)
+            Concurrent misses for the same key share one load instead of stampeding the source,
+            failed loads are never cached and every waiter gets the same exception
+        """
+        value = TTLCache.get(self, key)
+        if value is not None:
+            return value
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                # only carry on if it was the first caller that got cancelled, not this one
+                if not in_flight.cancelled():
+                    raise
+
+        future: "asyncio.Future[V]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        generation = self._generation
+        self.loads += 1
+        try:
+            value = await load()
+            if generation == self._generation:
+                TTLCache.put(self, key, value, expires_at(value) if expires_at is not None else None)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # mark it retrieved, nobody may be waiting on it
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,54 @@
+"""
+    Cache for authenticated users
+    Maps the email in a verified Firebase token to the user's database row across requests,
+    so resolving the current user costs no query in steady state
+"""
+
+from typing import Any, Callable, Dict, Optional
+import time
+
+from .config import settings
+from .ttl_cache import TTLCache
+
+class UserCache(TTLCache[str, Dict[str, Any]]):
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+            Entries are keyed by email, with an index from user id so writes by id can invalidate them
+            (kept in step with the entries: it loses a user when their entry expires or is evicted)
+            Invalidation is per process, the TTL bounds how stale another worker's copy can be
+        """
+        super().__init__(maxsize, ttl, clock)
+        self._emails_by_id: Dict[int, str] = {}
+        # lookups answered by a request's own memo, before this cache is consulted
+        self.request_hits = 0
+
+    def put_user(self, user: Dict[str, Any]) -> None:
+        self.put(user["email"], user)
+
+    def invalidate_user(self, id: int, email: Optional[str] = None) -> None:
+        """Drops a user's entry by id (and by email, e.g. the new one after an update)"""
+        cached_email = self._emails_by_id.get(id)
+        if cached_email is not None:
+            self.pop(cached_email)
+        if email is not None:
+            self.pop(email)
+
+    def _stored(self, email: str, user: Dict[str, Any]) -> None:
+        self._emails_by_id[user["id"]] = email
+
+    def _dropped(self, email: str, user: Dict[str, Any]) -> None:
+        # only if the id still points here, the user may be cached under a new email since
+        if self._emails_by_id.get(user["id"]) == email:
+            del self._emails_by_id[user["id"]]
+
+    def clear(self) -> None:
+        super().clear()
+        self._emails_by_id.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["request_hits"] = self.request_hits
+        return stats
+
+# shared by every request in the process
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
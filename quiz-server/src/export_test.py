@@ -0,0 +1,73 @@
+"""
+    Tests for streaming answer and log exports
+"""
+
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from src.models.user_model import users_table
+from src.api.routers import export_router
+from src.api.dependencies.common import get_export_service
+from src.api.schemas.export_schema import ExportFilters
+from src.services import export_service
+from src.services.export_service import ExportService
+from src.benchmarks.ml_analyse_benchmark import seed, QUESTIONS_PER_QUIZ
+
+STUDENTS = 30
+
+@pytest.fixture
+def service(make_database) -> ExportService:
+    """An export service over a seeded database file, the test client runs the app on its own event loop"""
+    database = make_database("quiz")
+
+    async def _seed(session):
+        await seed(session, STUDENTS)
+        await session.execute(update(users_table).where(users_table.c.id <= 10).values(school_id=1))
+        await session.commit()
+    database.run(_seed)
+    return ExportService(database.session)
+
+def test_exports_stream_filtered_ndjson_and_csv(service: ExportService):
+    app = FastAPI()
+    app.include_router(export_router.router)
+    app.dependency_overrides[get_export_service] = lambda: service
+    client = TestClient(app)
+
+    answers = client.get("/export/answers", params={"school_id": 1})
+    assert answers.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in answers.text.splitlines()]
+    assert len(rows) == 10 * QUESTIONS_PER_QUIZ and {row["school_id"] for row in rows} == {1}
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+
+    logs = client.get("/export/logs", params={"format": "csv", "start": "2025-01-01T09:05:00", "end": "2025-01-01T09:06:00"})
+    assert logs.headers["content-type"].startswith("text/csv")
+    table = list(csv.DictReader(io.StringIO(logs.text)))
+    # question 5's start and completion, for every student
+    assert len(table) == STUDENTS * 2 and {row["question_id"] for row in table} == {"5"}
+    assert {row["action"] for row in table} == {"started", "completed"} and table[0]["quiz_id"] == "1"
+
+def test_exports_are_sent_one_batch_at_a_time(service: ExportService, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 100)
+
+    async def _chunks():
+        return [chunk async for chunk in service.export_answers(ExportFilters(), "csv")]
+    chunks = asyncio.run(_chunks())
+    assert len(chunks) == STUDENTS * QUESTIONS_PER_QUIZ // 100
+    assert chunks[0].startswith(b"id,user_id,school_id,quiz_id,question_id,answer,marksAchieved,created_at")
+    assert all(not chunk.startswith(b"id,") for chunk in chunks[1:])
+    # answers stored by the seed have created_at set on insert, inside an unbounded range
+    assert asyncio.run(_count(service, ExportFilters(start=datetime(2000, 1, 1)))) == STUDENTS * QUESTIONS_PER_QUIZ
+
+async def _count(service: ExportService, filters: ExportFilters) -> int:
+    lines = 0
+    async for chunk in service.export_answers(filters, "ndjson"):
+        lines += chunk.count(b"\n")
+    return lines
@@ -0,0 +1,52 @@
+"""
+    Tests for prefetching the Firebase ID token signing keys at startup
+"""
+
+import sys
+import types
+import logging
+import importlib
+
+import pytest
+import firebase_admin
+from firebase_admin import auth
+
+@pytest.fixture
+def firebase_config(monkeypatch):
+    """
+        src.core.firebase_config imported fresh, with the SDK's initialization mocked out
+    """
+    monkeypatch.setattr(firebase_admin, "credentials", types.SimpleNamespace(Certificate=lambda info: info), raising=False)
+    monkeypatch.setattr(firebase_admin, "initialize_app", lambda cred: None, raising=False)
+    monkeypatch.setattr(firebase_admin, "__version__", "7.1.0", raising=False)
+    monkeypatch.delitem(sys.modules, "src.core.firebase_config", raising=False)
+    return importlib.import_module("src.core.firebase_config")
+
+def test_keys_are_fetched_through_the_verifiers_session(firebase_config, monkeypatch):
+    fetched = []
+    verifier = types.SimpleNamespace(
+        request=lambda url, method: fetched.append((method, url)),
+        id_token_verifier=types.SimpleNamespace(cert_url="https://certs.example/keys"),
+    )
+    monkeypatch.setattr(auth, "_get_client", lambda app: types.SimpleNamespace(_token_verifier=verifier), raising=False)
+
+    assert firebase_config.prefetch_signing_keys()
+    assert fetched == [("GET", "https://certs.example/keys")]
+
+def test_a_moved_token_verifier_falls_back_to_lazy_fetching(firebase_config, monkeypatch, caplog):
+    # an SDK upgrade that drops the private client the prefetch reads
+    monkeypatch.setattr(auth, "_get_client", lambda app: types.SimpleNamespace(), raising=False)
+
+    with caplog.at_level(logging.WARNING, logger="src.core.firebase_config"):
+        assert not firebase_config.prefetch_signing_keys()
+    assert "first token verification fetches them instead" in caplog.text
+
+def test_a_failed_fetch_is_logged_not_raised(firebase_config, monkeypatch, caplog):
+    def unreachable(url, method):
+        raise OSError("network unreachable")
+    verifier = types.SimpleNamespace(request=unreachable, id_token_verifier=types.SimpleNamespace(cert_url="https://certs.example/keys"))
+    monkeypatch.setattr(auth, "_get_client", lambda app: types.SimpleNamespace(_token_verifier=verifier), raising=False)
+
+    with caplog.at_level(logging.WARNING, logger="src.core.firebase_config"):
+        assert not firebase_config.prefetch_signing_keys()
+    assert "network unreachable" in caplog.text
@@ -0,0 +1,48 @@
+"""
+    Tests for conditional GETs on the reference data routes
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.resource_versions import ResourceVersions
+from src.api.routers import topics_router
+from src.api.dependencies.common import get_db_session, get_read_db_session
+
+def test_unchanged_topics_are_answered_with_304_without_queries(make_database):
+    # a file: the test client runs the app on its own event loop
+    database = make_database("quiz")
+
+    async def session():
+        async with database.session() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(topics_router.router)
+    app.dependency_overrides[get_db_session] = session
+    app.dependency_overrides[get_read_db_session] = session
+    with TestClient(app) as client:
+        client.post("/topics/", json={"name": "Algebra", "details": "x"})
+        first = client.get("/topics/all")
+        etag = first.headers["ETag"]
+        assert first.status_code == 200 and first.headers["Cache-Control"] == "public, max-age=300"
+
+        database.statements.clear()
+        cached = client.get("/topics/all", headers={"If-None-Match": etag})
+        assert cached.status_code == 304 and cached.content == b"" and cached.headers["ETag"] == etag
+        assert database.statements == []
+
+        # any write to topics makes every ETag issued for them stale
+        client.put(f"/topics/{first.json()[0]['id']}", json={"name": "Geometry", "details": "x"})
+        changed = client.get("/topics/all", headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["ETag"] != etag
+        assert changed.json()[0]["name"] == "Geometry"
+
+def test_version_etags_expire_and_change_across_restarts():
+    now = [0.0]
+    versions = ResourceVersions(ttl=60, clock=lambda: now[0])
+    etag = versions.etag("topics")
+    assert versions.etag("topics") == etag and versions.etag("schools") != etag
+    now[0] = 60.0
+    assert versions.etag("topics") != etag
+    assert ResourceVersions(ttl=60, clock=lambda: now[0]).etag("topics") != versions.etag("topics")
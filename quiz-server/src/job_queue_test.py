@@ -0,0 +1,108 @@
+"""
+    Tests for the background job queue and the ML job routes
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.analyses_model import analyses_table
+from src.models.jobs_model import jobs_table
+from src.api.routers import ml_route
+from src.api.dependencies.common import get_job_queue
+from src.benchmarks.ml_analyse_benchmark import seed, QUIZ_ID, QUESTIONS_PER_QUIZ
+from src.workers.job_queue import JobQueue
+from src.workers.ml_jobs import ANALYSE_JOB, register_ml_jobs
+
+STUDENTS = 5
+
+@pytest.fixture
+def database(make_database):
+    """A seeded database file: every job opens its own session, and the routes run on the test client's loop"""
+    database = make_database("quiz")
+    database.run(lambda session: seed(session, STUDENTS))
+    return database
+
+@pytest.fixture
+def queue(database) -> JobQueue:
+    queue = JobQueue(database.session, workers=1)
+    register_ml_jobs(queue)
+    return queue
+
+def test_jobs_run_by_priority_and_store_their_analyses(queue: JobQueue, database):
+    ran: List[int] = []
+
+    async def record(db: AsyncSession, params: Dict[str, Any]) -> Dict[str, Any]:
+        ran.append(params["n"])
+        return {"n": params["n"]}
+
+    async def fail(db: AsyncSession, params: Dict[str, Any]) -> None:
+        raise RuntimeError("no model")
+
+    async def _run():
+        queue.register("record", record)
+        queue.register("fail", fail)
+        # submitted before the workers start, so they all wait on the queue together
+        low = await queue.submit("record", {"n": 1}, priority=0)
+        high = await queue.submit("record", {"n": 2}, priority=9)
+        failing = await queue.submit("fail", {}, priority=5)
+        analysis = await queue.submit(ANALYSE_JOB, {"quiz_id": QUIZ_ID, "user_id": None}, priority=1)
+        # left running by a process that stopped mid-job long ago
+        async with database.engine.begin() as conn:
+            await conn.execute(insert(jobs_table).values(
+                kind="record", params={"n": 3}, priority=0, status="running",
+                created_at=datetime(2025, 1, 1), started_at=datetime(2025, 1, 1)
+            ))
+
+        assert await queue.start() == 5
+        await queue.join()
+        await queue.stop()
+
+        # the first four jobs were also on the queue from submit, they only ran once
+        assert ran == [2, 1, 3]
+        assert (await queue.get_job(high["id"]))["result"] == {"n": 2}
+        failed = await queue.get_job(failing["id"])
+        assert failed["status"].value == "failed" and failed["error"] == "RuntimeError: no model"
+        done = await queue.get_job(analysis["id"])
+        assert done["status"].value == "completed" and done["started_at"] <= done["finished_at"]
+        assert done["result"] == {"quiz_id": QUIZ_ID, "user_id": None, "analyses": STUDENTS * QUESTIONS_PER_QUIZ}
+        assert queue.stats()["completed"] == 4 and queue.stats()["failed"] == 1
+
+        async with database.engine.connect() as conn:
+            assert (await conn.execute(select(func.count()).select_from(analyses_table))).scalar_one() == STUDENTS * QUESTIONS_PER_QUIZ
+            row = (await conn.execute(select(analyses_table).order_by(analyses_table.c.id))).first()
+        assert (row.user_id, row.question_id) == (1, 1)
+        assert json.loads(row.analysis)["log_action"] == "completed"
+
+        # running the analysis again replaces its analyses instead of adding to them
+        again = await queue.submit(ANALYSE_JOB, {"quiz_id": QUIZ_ID, "user_id": None})
+        await queue.start()
+        await queue.join()
+        await queue.stop()
+        assert (await queue.get_job(again["id"]))["status"].value == "completed"
+        async with database.engine.connect() as conn:
+            assert (await conn.execute(select(func.count()).select_from(analyses_table))).scalar_one() == STUDENTS * QUESTIONS_PER_QUIZ
+    asyncio.run(_run())
+
+def test_job_routes_queue_and_report_jobs(queue: JobQueue):
+    app = FastAPI()
+    app.include_router(ml_route.router)
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    client = TestClient(app)
+
+    created = client.post("/ml/jobs", json={"quiz_id": QUIZ_ID, "priority": 3})
+    assert created.status_code == 202
+    job = created.json()
+    assert (job["kind"], job["status"], job["priority"]) == (ANALYSE_JOB, "queued", 3)
+    assert job["params"] == {"quiz_id": QUIZ_ID, "user_id": None}
+
+    assert client.get(f"/ml/jobs/{job['id']}").json()["status"] == "queued"
+    assert client.get("/ml/jobs/999").status_code == 404
+    assert client.post("/ml/jobs", json={"quiz_id": QUIZ_ID, "priority": 10}).status_code == 422
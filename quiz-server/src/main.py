@@ -5,11 +5,14 @@
 
 from typing import Union, Dict, Any
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 import os
+import asyncio
 
 import sys
 import logging
@@ -33,13 +36,24 @@ from src.api.routers import topics_router
 from src.api.routers import schools_router
 from src.api.routers import qopts_router
 from src.api.routers import ml_route
+from src.api.routers import internal_router
+from src.api.routers import export_router
 
 # import db initialization function and metadata object
-from src.core.database import init_db
+from src.core.database import init_db, async_engine, replica_router
+from src.core.config import settings
+from src.core.pool import warm_pool
+from src.workers.job_queue import job_queue
+from src.workers.engagement_refresh import run_engagement_refresh
+from src.core.process_pool import process_pool
+from src.ml_core.model_manager import model_manager
 
 # firebase intialization
 from src.core import firebase_config
 
+from src.api.exceptions.custom_exceptions import InvalidCursorError, TaskTimeoutError, ModelNotFoundError
+from src.utils.content_negotiation import CompressionMiddleware
+
 app_state: Dict[str, Any] = {}
 
 @asynccontextmanager
@@ -52,10 +66,36 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.info("Database initialization complete.")
 
-        # 2. Load ML models on startup using the ModelManager Singleton
-        # model_manager = ModelManager()
-        # app_state["model_manager"] = model_manager # Store it if needed, though Singleton provides access
-        logger.info("ML models loaded (or initialized via ModelManager).")
+        # open pooled connections now so the first requests don't wait on handshakes
+        warmed = await warm_pool(async_engine, settings.DB_POOL_WARMUP)
+        logger.info(f"Connection pool warmed with {warmed} connections.")
+
+        # route reads to the healthy replicas, if any are configured
+        if replica_router.replicas:
+            app_state["replica_health"] = asyncio.create_task(
+                replica_router.run_health_checks(settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS)
+            )
+            logger.info(f"Routing reads to {len(replica_router.replicas)} replicas.")
+
+        # worker processes for the CPU-bound ML work, spawned now so the first analysis doesn't wait on them
+        await process_pool.start()
+        logger.info(f"Process pool started with {process_pool.stats()['workers']} workers.")
+
+        # background jobs, including those a previous process left unfinished
+        recovered = await job_queue.start()
+        logger.info(f"Job queue started with {job_queue.workers} workers, {recovered} queued jobs picked up.")
+
+        # fold new log events into the engagement metrics in the background, the engagement routes only read them
+        app_state["engagement_refresh"] = asyncio.create_task(run_engagement_refresh(settings.ENGAGEMENT_REFRESH_SECONDS))
+
+        # 2. Load the chosen ML models now, the others are loaded by the ModelManager on first use
+        warm_models = [name.strip() for name in settings.MODEL_WARMUP.split(",") if name.strip()]
+        loaded = await model_manager.warm_up(warm_models)
+        logger.info(f"ML models warmed up: {loaded} of {len(warm_models)}.")
+
+        # 3. Fetch the ID token signing keys now so the first authenticated request doesn't
+        if await run_in_threadpool(firebase_config.prefetch_signing_keys):
+            logger.info("Firebase signing keys prefetched.")
 
     except Exception as e:
         logger.error(f"Error during application startup: {e}", exc_info=True)
@@ -69,7 +109,15 @@ async def lifespan(app: FastAPI):
     logger.info("Application shutting down...")
     # Add any specific cleanup logic here if necessary for global resources
     # (e.g., explicitly clearing model_manager if it held external resources not managed by its own lifecycle)
-    # Most cleanup for DB sessions is handled by get_db dependency.
+    # Most cleanup for DB sessions is handled by get_db dependency, the pool's connections are closed here
+    for name in ("engagement_refresh", "replica_health"):
+        task = app_state.pop(name, None)
+        if task is not None:
+            task.cancel()
+    await job_queue.stop()
+    await process_pool.stop()
+    await replica_router.dispose()
+    await async_engine.dispose()
     logger.info("Application shutdown complete.")
 
 app = FastAPI(
@@ -87,8 +135,27 @@ app.add_middleware(
     allow_origins=origin,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"]
 )
+
+# gzip for the bulk routes that opt in (Depends(compressible)), once the body is big enough to benefit
+app.add_middleware(CompressionMiddleware, minimum_size=settings.GZIP_MIN_SIZE, level=settings.GZIP_LEVEL)
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError) -> JSONResponse:
+    """A bad pagination cursor is a client error, not a server one"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(TaskTimeoutError)
+async def task_timeout_handler(request: Request, exc: TaskTimeoutError) -> JSONResponse:
+    """CPU-bound work that overran its timeout, the background jobs (POST /ml/jobs) have no such limit"""
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.exception_handler(ModelNotFoundError)
+async def model_not_found_handler(request: Request, exc: ModelNotFoundError) -> JSONResponse:
+    """A model or version missing from the registry"""
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
 # include routers
 app.include_router(user_router.router)
 app.include_router(question_router.router)
@@ -100,6 +167,8 @@ app.include_router(topics_router.router)
 app.include_router(schools_router.router)
 app.include_router(qopts_router.router)
 app.include_router(ml_route.router)
+app.include_router(internal_router.router)
+app.include_router(export_router.router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,73 @@
+"""
+    Tests for prediction micro-batching and the predict route
+"""
+
+import asyncio
+from typing import Any
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+
+from src.api.routers import ml_route
+from src.api.dependencies.common import get_ml_service
+from src.ml_core.model_manager import ModelManager
+from src.ml_core.micro_batcher import MicroBatcher
+from src.services.ml_service import MLService
+
+X = np.array([[0.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 1.0]])
+
+class CountingModel:
+    """Wraps a model to count its predict calls"""
+    def __init__(self, model: Any) -> None:
+        self.model = model
+        self.calls = 0
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        self.calls += 1
+        return self.model.predict(features)
+
+def registry(tmp_path) -> ModelManager:
+    models = ModelManager(str(tmp_path))
+    models.save("grader", "1", CountingModel(LogisticRegression().fit(X, [0, 0, 1, 1])))
+    return models
+
+def test_concurrent_requests_share_one_predict(tmp_path):
+    models = registry(tmp_path)
+    batcher = MicroBatcher(models, max_batch_size=64, max_latency=0.05)
+
+    async def _run():
+        results = await asyncio.gather(
+            batcher.predict("grader", [[0.0, 0.0]]),
+            batcher.predict("grader", [[1.0, 1.0], [1.0, 0.0]]),
+            batcher.predict("grader", [[0.0, 1.0]])
+        )
+        assert [result.predictions for result in results] == [[0], [1, 1], [0]]
+        assert {result.version for result in results} == {"1"}
+        assert (await models.get("grader")).calls == 1
+        assert batcher.stats()["batches"] == 1 and batcher.stats()["latency_flushes"] == 1
+
+        # a full batch doesn't wait out the latency, and a request with the wrong width fails on its own
+        size_flushed = MicroBatcher(models, max_batch_size=2, max_latency=60)
+        good, bad = await asyncio.gather(
+            size_flushed.predict("grader", X.tolist()),
+            MicroBatcher(models, max_latency=0).predict("grader", [[1.0, 2.0, 3.0]]),
+            return_exceptions=True
+        )
+        assert good.predictions == [0, 0, 1, 1] and size_flushed.stats()["size_flushes"] == 1
+        assert isinstance(bad, ValueError)
+    asyncio.run(_run())
+
+def test_predict_route_returns_the_version_and_predictions(tmp_path):
+    batcher = MicroBatcher(registry(tmp_path), max_latency=0.001)
+    app = FastAPI()
+    app.include_router(ml_route.router)
+    app.dependency_overrides[get_ml_service] = lambda: MLService(None, None, None, None, None, None, batcher=batcher)
+    client = TestClient(app)
+
+    response = client.post("/ml/predict", json={"model": "grader", "features": [[1.0, 1.0], [0.0, 1.0]]})
+    assert response.status_code == 200
+    assert response.json() == {"model": "grader", "version": "1", "predictions": [1, 0]}
+    assert client.post("/ml/predict", json={"model": "grader", "features": [[1.0], [0.0, 1.0]]}).status_code == 422
+    assert client.post("/ml/predict", json={"model": "grader", "features": []}).status_code == 422
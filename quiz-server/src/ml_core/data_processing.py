@@ -2,32 +2,97 @@
     Class will contain all the functions necessary for preprocessing data, e.g. tokenization, converting to dataframes
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence, Mapping
+import numpy as np
 import pandas as pd
 
+from src.models.logs_model import Actions
+
+# one category per log action, in the enum's order, so every frame shares the same codes
+ACTION_DTYPE = pd.CategoricalDtype([action.value for action in Actions])
+# the ids are INT columns in the database
+ID_DTYPE = np.int32
+# columns of the records returned by MLService.analyse
+RECORD_COLUMNS = ["user_id", "answer", "question", "correct_answer", "log_action", "log_time"]
+
 class DataPrepocessor:
     # functions to preprocess data
     # e.g. store in pandas df, tokenise, lemmatization
+    # every transform works on whole columns, never row by row
 
     def tokenise(self, text: str):
         return text.split("\n")
 
-    def convert_to_df(self, user: Dict[str,Any], answers: List[Dict[str, Any]], logs: List[Dict[str, Any]]):
-        # initialize dictionary to create df
-        data_dict= {}
-
-        # loop through answers and then logs for following structure:
-        # (index)    user_id    answer    question    log_action    log_time
-        for answer in answers:
-            data_dict["user_id"] = user["id"]
-            data_dict["answer"] = answer["answer"]
-            data_dict["question"] = answer["question"]
-            data_dict["correct_answer"] = answer["correctAnswer"]
-            for log in logs:
-                data_dict["log_action"] = log["action"]
-                data_dict["log_time"] = log["time"]
-        print(data_dict)
-
-        # add index attribute for automatic indexing, otherwise, ValueError for index not existing
-        df = pd.DataFrame(data_dict, index=[0])
-        return df
\ No newline at end of file
+    def answers_columns(self, columns: Mapping[str, Sequence[Any]]) -> Dict[str, Any]:
+        """
+            Types the columns of AnswerRepository.get_quiz_answers_with_questions as NumPy arrays
+            Question text and correct answer repeat for every student, so they are categorical (codes + categories)
+        """
+        return {
+            "answer_id": np.asarray(columns["answer_id"], dtype=ID_DTYPE),
+            "user_id": np.asarray(columns["user_id"], dtype=ID_DTYPE),
+            "question_id": np.asarray(columns["question_id"], dtype=ID_DTYPE),
+            "answer": np.asarray(columns["answer"], dtype=object),
+            "question": pd.Categorical(columns["question"]),
+            "correct_answer": pd.Categorical(columns["correct_answer"])
+        }
+
+    def events_columns(self, columns: Mapping[str, Sequence[Any]]) -> Dict[str, Any]:
+        """
+            Types the columns of LogRepository.get_logs_by_quiz_id (or get_logs_after/EngagementRepository.get_unapplied_logs, which add each event's quiz_id)
+            as NumPy arrays, actions as ACTION_DTYPE codes
+        """
+        typed = {
+            "log_id": np.asarray(columns["log_id"], dtype=ID_DTYPE),
+            "user_id": np.asarray(columns["user_id"], dtype=ID_DTYPE),
+            "question_id": np.asarray(columns["question_id"], dtype=ID_DTYPE),
+            "action": pd.Categorical(columns["action"], dtype=ACTION_DTYPE),
+            "time": pd.DatetimeIndex(columns["time"]).astype("datetime64[ns]").to_numpy()
+        }
+        if "quiz_id" in columns:
+            typed["quiz_id"] = np.asarray(columns["quiz_id"], dtype=ID_DTYPE)
+        return typed
+
+    def answers_frame(self, columns: Mapping[str, Sequence[Any]]) -> pd.DataFrame:
+        """Builds the answers frame from the columns of AnswerRepository.get_quiz_answers_with_questions (or answers_columns)"""
+        return pd.DataFrame(self.answers_columns(columns))
+
+    def events_frame(self, columns: Mapping[str, Sequence[Any]]) -> pd.DataFrame:
+        """Builds the log events frame from the columns of LogRepository.get_logs_by_quiz_id (or events_columns)"""
+        return pd.DataFrame(self.events_columns(columns))
+
+    def build_event_frame(self, answers: Mapping[str, Sequence[Any]], logs: Mapping[str, Sequence[Any]]) -> pd.DataFrame:
+        """
+            Joins a quiz's answers to the log events of the same user and question
+            Return:
+                pd.DataFrame: One row per answer x log event, ordered by user, question and time
+                    (answers without any log are dropped)
+        """
+        frame = self.answers_frame(answers).merge(self.events_frame(logs), on=["user_id", "question_id"], how="inner", sort=False)
+        return frame.sort_values(["user_id", "question_id", "time", "log_id"], kind="stable", ignore_index=True)
+
+    def latest_events(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Keeps the latest log event of every answer, in (user, answer) order"""
+        latest = frame.drop_duplicates("answer_id", keep="last")
+        return latest.sort_values(["user_id", "answer_id"], kind="stable", ignore_index=True)
+
+    def to_records(self, frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Converts an event frame to the analysis records (user_id, answer, question, correct_answer, log_action, log_time)"""
+        records = frame.rename(columns={"action": "log_action", "time": "log_time"})[RECORD_COLUMNS]
+        return records.to_dict(orient="records") # type: ignore
+
+    def memory_usage(self, frame: pd.DataFrame) -> int:
+        """Bytes held by a frame, including the Python strings in object columns"""
+        return int(frame.memory_usage(deep=True).sum())
+
+def analysis_frame(answers: Mapping[str, Any], logs: Mapping[str, Any]) -> pd.DataFrame:
+    """
+        The join behind MLService.analyse in one call, so it can run in a worker process (see core/process_pool.py)
+        Takes answers_columns/events_columns and returns columns too: NumPy buffers and categoricals pickle as a
+        few raw byte strings, where a list of dicts would be unpickled object by object while holding the GIL
+        Return:
+            pd.DataFrame: The latest log event of every answer, with the columns to_records needs and question_id
+    """
+    preprocessor = DataPrepocessor()
+    frame = preprocessor.latest_events(preprocessor.build_event_frame(answers, logs))
+    return frame[["user_id", "question_id", "answer", "question", "correct_answer", "action", "time"]]
@@ -0,0 +1,87 @@
+"""
+    Automatic grading of multiple-choice and true/false answers
+    An answer scores its question's marks when it matches the correct answer once both are normalized (case and
+    surrounding/repeated whitespace ignored, common true/false spellings folded together), and 0 otherwise.
+    Text answers are never graded here, their marks are still allocated by hand
+    grade_answer grades one answer as it is submitted, grade_columns a whole quiz at once for a regrade, both with
+    the same normalization so a regrade never disagrees with the grade given at submission
+"""
+
+from typing import Any, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from src.models.question_model import Type
+
+GRADED_TYPES = frozenset({Type.mc.value, Type.tf.value})
+TRUE_SPELLINGS = frozenset({"true", "t", "yes", "y", "1"})
+FALSE_SPELLINGS = frozenset({"false", "f", "no", "n", "0"})
+
+def _type_value(question_type: Any) -> str:
+    # Type members from the ORM rows, raw strings from the column fetches
+    return getattr(question_type, "value", question_type)
+
+def normalize_answer(value: Optional[str], question_type: Any) -> Optional[str]:
+    """
+        The form answers are compared in: casefolded with whitespace collapsed, true/false answers as "true"/"false"
+        Return:
+            str: The normalized answer
+            None: Return null for a missing or blank answer, which matches nothing
+    """
+    if value is None:
+        return None
+    normalized = " ".join(str(value).split()).casefold()
+    if not normalized:
+        return None
+    if _type_value(question_type) == Type.tf.value:
+        if normalized in TRUE_SPELLINGS:
+            return "true"
+        if normalized in FALSE_SPELLINGS:
+            return "false"
+    return normalized
+
+def grade_answer(answer: Optional[str], correct_answer: str, question_type: Any, marks: int) -> Optional[int]:
+    """
+        Return:
+            int: The marks an answer scores, all of the question's or 0
+            None: Return null for a text question, which is graded by hand
+    """
+    if _type_value(question_type) not in GRADED_TYPES:
+        return None
+    expected = normalize_answer(correct_answer, question_type)
+    given = normalize_answer(answer, question_type)
+    return marks if given is not None and given == expected else 0
+
+def _normalized_codes(values: Sequence[Optional[str]], is_tf: np.ndarray) -> np.ndarray:
+    """
+        Normalizes a column one distinct value at a time (a quiz's answers repeat a handful of options)
+        Return:
+            np.ndarray: Per row, a code for its normalized value, equal values share a code (-1 for missing)
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    uniques = list(uniques)
+    as_mc = np.array([normalize_answer(value, Type.mc) for value in uniques] + [None], dtype=object)
+    as_tf = np.array([normalize_answer(value, Type.tf) for value in uniques] + [None], dtype=object)
+    # -1 (missing) picks the trailing None
+    normalized = np.where(is_tf, as_tf[codes], as_mc[codes])
+    return pd.factorize(pd.Series(normalized, dtype=object), use_na_sentinel=True)[0]
+
+def grade_columns(answers: Sequence[Optional[str]], correct_answers: Sequence[str], types: Sequence[Any], marks: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+        Grades many answers in one pass: every distinct answer is normalized once, then the rows are compared
+        as integer codes
+        Return:
+            np.ndarray: Per row, whether its question is graded automatically (mc/tf)
+            np.ndarray: Per row, the marks it scores (0 for the rows that aren't graded)
+    """
+    type_codes, type_uniques = pd.factorize(pd.Series(types, dtype=object))
+    row_types = np.array([_type_value(question_type) for question_type in type_uniques], dtype=object)[type_codes]
+    graded = np.isin(row_types, list(GRADED_TYPES))
+    is_tf = row_types == Type.tf.value
+
+    # both columns share one set of codes, so equal normalized strings get equal codes
+    combined = list(answers) + list(correct_answers)
+    codes = _normalized_codes(combined, np.concatenate([is_tf, is_tf]))
+    given, expected = codes[:len(answers)], codes[len(answers):]
+    correct = (given == expected) & (given != -1)
+    return graded, np.where(graded & correct, np.asarray(marks, dtype=np.int64), 0)
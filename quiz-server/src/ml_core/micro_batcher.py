@@ -0,0 +1,137 @@
+"""
+    Dynamic micro-batching for model predictions
+    A scikit-learn predict costs about the same for one row as for a few hundred, so calling it once per request
+    spends most of the time in per-call overhead. MicroBatcher holds concurrent prediction requests for the same
+    model for at most max_latency seconds (or until max_batch_size rows are waiting), runs one vectorized predict
+    over all of them in a thread, and hands each request back its own rows' predictions
+"""
+
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+import asyncio
+import time
+import numpy as np
+
+from src.core.config import settings
+from src.ml_core.model_manager import ModelManager, model_manager
+
+class Prediction(NamedTuple):
+    version: str
+    predictions: List[Any]
+
+class _Pending(NamedTuple):
+    rows: np.ndarray
+    future: "asyncio.Future[Prediction]"
+
+class MicroBatcher:
+    def __init__(self, models: ModelManager, max_batch_size: int = 64, max_latency: float = 0.005) -> None:
+        """
+            models is the registry the batches' models come from
+            max_batch_size is the number of rows that flushes a batch at once
+            max_latency is the longest, in seconds, a request waits for others to join its batch (0 never batches)
+        """
+        self.models = models
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        # (model, features per row) -> requests waiting, rows of different widths never share a batch,
+        # so a malformed request fails on its own
+        self._pending: Dict[Tuple[str, int], List[_Pending]] = {}
+        self._pending_rows: Dict[Tuple[str, int], int] = {}
+        self._timers: Dict[Tuple[str, int], asyncio.TimerHandle] = {}
+        self._batches: "set[asyncio.Task[None]]" = set()
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+        self.max_rows = 0
+        self.size_flushes = 0
+        self.latency_flushes = 0
+        self.failed = 0
+        self.predict_seconds = 0.0
+
+    async def predict(self, name: str, rows: Sequence[Sequence[float]]) -> Prediction:
+        """
+            Predicts rows with the active version of a model, batched with the other requests for it
+            Return:
+                Prediction: The version that made the predictions, and one prediction per row
+        """
+        features = np.asarray(rows, dtype=np.float64)
+        if features.ndim != 2:
+            raise ValueError("Expected a list of rows with the same number of features")
+        self.requests += 1
+        future: "asyncio.Future[Prediction]" = asyncio.get_running_loop().create_future()
+        if self.max_latency <= 0:
+            await self._run_batch(name, [_Pending(features, future)])
+            return await future
+
+        key = (name, features.shape[1])
+        self._pending.setdefault(key, []).append(_Pending(features, future))
+        self._pending_rows[key] = self._pending_rows.get(key, 0) + len(features)
+        if self._pending_rows[key] >= self.max_batch_size:
+            self.size_flushes += 1
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.max_latency, self._flush_late, key)
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_rows": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_batch_rows": self.max_rows,
+            "size_flushes": self.size_flushes,
+            "latency_flushes": self.latency_flushes,
+            "failed": self.failed,
+            "predict_seconds": round(self.predict_seconds, 3)
+        }
+
+    def _flush_late(self, key: Tuple[str, int]) -> None:
+        self.latency_flushes += 1
+        self._flush(key)
+
+    def _flush(self, key: Tuple[str, int]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(key, [])
+        self._pending_rows.pop(key, None)
+        if pending:
+            # keep a reference until it is done, the loop only holds weak ones
+            task = asyncio.create_task(self._run_batch(key[0], pending))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, name: str, pending: List[_Pending]) -> None:
+        try:
+            # the whole batch is predicted by one version, even if another is activated meanwhile
+            version = self.models.active_version(name)
+            model = await self.models.get(name, version)
+            features = pending[0].rows if len(pending) == 1 else np.concatenate([item.rows for item in pending])
+            predictions = (await self._predict(model, features)).tolist()
+        except Exception as e:
+            self.failed += 1
+            for item in pending:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(features)
+        self.max_rows = max(self.max_rows, len(features))
+        start = 0
+        for item in pending:
+            end = start + len(item.rows)
+            # a caller that went away (cancelled future) just doesn't get its rows
+            if not item.future.done():
+                item.future.set_result(Prediction(version, predictions[start:end]))
+            start = end
+
+    async def _predict(self, model: Any, features: np.ndarray) -> np.ndarray:
+        """Runs predict in a thread, scikit-learn releases the GIL in its numeric loops so the event loop keeps going"""
+        started = time.perf_counter()
+        try:
+            return np.asarray(await asyncio.to_thread(model.predict, features))
+        finally:
+            self.predict_seconds += time.perf_counter() - started
+
+# shared by every request in the process, so concurrent requests end up in the same batches
+micro_batcher = MicroBatcher(model_manager, settings.ML_BATCH_MAX_SIZE, settings.ML_BATCH_MAX_LATENCY_MS / 1000)
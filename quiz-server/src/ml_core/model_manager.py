@@ -1,3 +1,296 @@
 """
-    File will contain all the classes and functions for the ML operations
-"""
\ No newline at end of file
+    Registry of the trained models the ML layer serves
+    Each model is a directory of immutable versions saved with joblib (<MODEL_DIR>/<name>/<version>/model.joblib),
+    plus an ACTIVE file naming the version served. Versions are loaded on first use and memory-mapped (mmap_mode),
+    so their arrays are read from the page cache as they are touched and every worker process on the machine shares
+    the same pages instead of holding its own copy
+    Activating another version loads it before it is served: requests already holding the old model finish with it,
+    the next ones get the new one. Other worker processes pick the switch up from the ACTIVE file within
+    MODEL_REFRESH_SECONDS
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import re
+import time
+import joblib
+import numpy as np
+import psutil
+
+from src.core.config import settings
+from src.api.exceptions.custom_exceptions import ModelNotFoundError
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FILE = "model.joblib"
+ACTIVE_FILE = "ACTIVE"
+# names and versions are directory names, anything else (e.g. "..") never reaches the filesystem
+PATH_PART = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]*")
+
+class LoadedModel(NamedTuple):
+    name: str
+    version: str
+    model: Any
+    path: str
+    load_seconds: float
+    # growth of the process's resident memory while the version was loaded and warmed up
+    load_rss_bytes: int
+    loaded_at: datetime
+
+def _version_key(version: str) -> Tuple[Any, ...]:
+    """Orders versions naturally, so 10 comes after 9 and 2025-10-01 after 2025-09-30"""
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"(\d+)", version) if part)
+
+def _check_part(part: str) -> str:
+    if not PATH_PART.fullmatch(part):
+        raise ModelNotFoundError(f"Invalid model name or version: {part}")
+    return part
+
+def _warm(model: Any) -> None:
+    """One prediction on zeros, so the pages a prediction touches are resident before the first request needs them"""
+    features = getattr(model, "n_features_in_", None)
+    if features is None or not hasattr(model, "predict"):
+        return
+    try:
+        model.predict(np.zeros((1, features)))
+    except Exception as e:
+        logger.warning(f"Warm-up prediction failed for {type(model).__name__}: {e}")
+
+class ModelManager:
+    def __init__(
+            self,
+            directory: str,
+            mmap_mode: Optional[str] = "r",
+            refresh_seconds: float = 10,
+            clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+            directory holds one directory per model, each with one directory per version
+            mmap_mode is joblib's (None reads the arrays into the process's own memory)
+            refresh_seconds is how long a model's active version is used before the ACTIVE file is read again
+        """
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self._loaded: Dict[Tuple[str, str], LoadedModel] = {}
+        # name -> (active version, when it was read)
+        self._active: Dict[str, Tuple[str, float]] = {}
+        # concurrent first uses of a version share one load (see load)
+        self._in_flight: Dict[Tuple[str, str], "asyncio.Future[LoadedModel]"] = {}
+        # loads run one at a time, so the resident memory each one adds is its own
+        self._load_lock = asyncio.Lock()
+        self._process = psutil.Process()
+        self.loads = 0
+        self.coalesced = 0
+        self.swaps = 0
+
+    def names(self) -> List[str]:
+        """The models in the registry"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if os.path.isdir(os.path.join(self.directory, name)))
+
+    def versions(self, name: str) -> List[str]:
+        """A model's saved versions, oldest first"""
+        model_dir = os.path.join(self.directory, _check_part(name))
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(
+            (version for version in os.listdir(model_dir) if os.path.isfile(os.path.join(model_dir, version, ARTIFACT_FILE))),
+            key=_version_key
+        )
+
+    def active_version(self, name: str) -> str:
+        """
+            The version served for a model: the one its ACTIVE file names, or else its latest
+            Raises ModelNotFoundError if the model has no versions
+        """
+        cached = self._active.get(_check_part(name))
+        now = self.clock()
+        if cached is not None and now - cached[1] < self.refresh_seconds:
+            return cached[0]
+        version = self._read_active(name)
+        if version is None:
+            versions = self.versions(name)
+            if not versions:
+                raise ModelNotFoundError(f"No versions of model {name}")
+            version = versions[-1]
+        if cached is not None and cached[0] != version:
+            # another process activated it, this one stops holding the version it replaced
+            self._evict(name, keep=version)
+            self.swaps += 1
+        self._active[name] = (version, now)
+        return version
+
+    async def get(self, name: str, version: Optional[str] = None) -> Any:
+        """
+            Returns a model (its active version unless one is given), loading it on first use
+            Callers keep the object they got for the whole request, a swap meanwhile doesn't affect them
+        """
+        loaded = await self.load(name, version or self.active_version(name))
+        return loaded.model
+
+    async def load(self, name: str, version: str) -> LoadedModel:
+        """
+            Loads and warms up a version if it isn't loaded yet, concurrent calls for the same version share one load
+            Raises ModelNotFoundError if the version isn't saved
+        """
+        key = (_check_part(name), _check_part(version))
+        loaded = self._loaded.get(key)
+        if loaded is not None:
+            return loaded
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        future: "asyncio.Future[LoadedModel]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            async with self._load_lock:
+                loaded = await asyncio.to_thread(self._load, name, version)
+            self._loaded[key] = loaded
+            self.loads += 1
+            future.set_result(loaded)
+            return loaded
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # mark it retrieved, nobody may be waiting on it
+                future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def activate(self, name: str, version: str) -> LoadedModel:
+        """
+            Serves another version of a model (e.g. a rollback) without interrupting the requests using the current one
+            The version is loaded and warmed up first, so no request waits on it, then it replaces the active one
+            and is written to the ACTIVE file for the other processes and the next start
+        """
+        loaded = await self.load(name, version)
+        self._write_active(name, version)
+        previous = self._active.get(name)
+        self._active[name] = (version, self.clock())
+        if previous is not None and previous[0] != version:
+            self.swaps += 1
+        self._evict(name, keep=version)
+        logger.info(f"Model {name} now serves version {version}")
+        return loaded
+
+    async def warm_up(self, names: Iterable[str]) -> int:
+        """
+            Loads the active version of each model at startup, so the first requests don't pay for it
+            A model that can't be loaded is logged and skipped, it is loaded again on first use
+            Return:
+                int: The number of models loaded
+        """
+        warmed = 0
+        for name in names:
+            try:
+                await self.get(name)
+                warmed += 1
+            except Exception as e:
+                logger.error(f"Model {name} could not be warmed up: {e}")
+        return warmed
+
+    def save(self, name: str, version: str, model: Any) -> str:
+        """
+            Saves a new version of a model, uncompressed so it can be memory-mapped, it isn't served until activated
+            (or, without an ACTIVE file, until it is the latest). Versions are immutable: saving one twice raises
+            FileExistsError, so a file a worker has mapped is never rewritten under it
+            Return:
+                str: The artifact's path
+        """
+        version_dir = os.path.join(self.directory, _check_part(name), _check_part(version))
+        path = os.path.join(version_dir, ARTIFACT_FILE)
+        if os.path.exists(path):
+            raise FileExistsError(f"Version {version} of model {name} already exists")
+        os.makedirs(version_dir, exist_ok=True)
+        # written to a temporary file and renamed, so a loader never sees a half-written artifact
+        joblib.dump(model, f"{path}.tmp", compress=0)
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    def stats(self) -> Dict[str, Any]:
+        """
+            Loaded versions with their load time and resident memory. mapped_rss_bytes is how much of the
+            memory-mapped artifact is resident, those pages are shared with every process that maps it
+        """
+        memory = self._process.memory_info()
+        mapped = self._mapped_rss()
+        active = {name: version for name, (version, _) in self._active.items()}
+        return {
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "swaps": self.swaps,
+            "rss_bytes": memory.rss,
+            "models": [
+                {
+                    "name": loaded.name,
+                    "version": loaded.version,
+                    "active": active.get(loaded.name) == loaded.version,
+                    "loaded_at": loaded.loaded_at.isoformat(),
+                    "load_seconds": round(loaded.load_seconds, 4),
+                    "load_rss_bytes": loaded.load_rss_bytes,
+                    "mapped_rss_bytes": mapped.get(os.path.realpath(loaded.path)),
+                    "file_bytes": os.path.getsize(loaded.path) if os.path.exists(loaded.path) else None
+                }
+                for loaded in self._loaded.values()
+            ]
+        }
+
+    def _load(self, name: str, version: str) -> LoadedModel:
+        path = os.path.join(self.directory, name, version, ARTIFACT_FILE)
+        if not os.path.isfile(path):
+            raise ModelNotFoundError(f"Version {version} of model {name} not found")
+        rss = self._process.memory_info().rss
+        started = time.perf_counter()
+        model = joblib.load(path, mmap_mode=self.mmap_mode)
+        _warm(model)
+        load_seconds = time.perf_counter() - started
+        logger.info(f"Loaded model {name} version {version} in {load_seconds:.3f}s")
+        return LoadedModel(
+            name=name,
+            version=version,
+            model=model,
+            path=path,
+            load_seconds=load_seconds,
+            load_rss_bytes=max(self._process.memory_info().rss - rss, 0),
+            loaded_at=datetime.now(timezone.utc)
+        )
+
+    def _evict(self, name: str, keep: str) -> None:
+        # only the registry lets go of them, they are unmapped once the requests still using them are done
+        for key in [key for key in self._loaded if key[0] == name and key[1] != keep]:
+            del self._loaded[key]
+
+    def _read_active(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, name, ACTIVE_FILE)) as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_active(self, name: str, version: str) -> None:
+        path = os.path.join(self.directory, name, ACTIVE_FILE)
+        with open(f"{path}.tmp", "w") as file:
+            file.write(version)
+        os.replace(f"{path}.tmp", path)
+
+    def _mapped_rss(self) -> Dict[str, int]:
+        """Resident bytes per memory-mapped file, empty where the platform doesn't report them"""
+        try:
+            return {os.path.realpath(region.path): region.rss for region in self._process.memory_maps(grouped=True)}
+        except (psutil.Error, AttributeError, NotImplementedError):
+            return {}
+
+# shared by every request in the process, its models are warmed up by the app's lifespan
+model_manager = ModelManager(settings.MODEL_DIR, settings.MODEL_MMAP_MODE, settings.MODEL_REFRESH_SECONDS)
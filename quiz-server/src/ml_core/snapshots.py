@@ -0,0 +1,179 @@
+"""
+    Columnar analytics snapshots
+    Writes the answers (each joined with its question) and the log events as Parquet datasets partitioned by quiz
+    and day (<table>/quiz_id=1/date=2025-01-01/part-<first id>-0.parquet), with typed columns and the enums
+    dictionary-encoded. Rows are only ever appended, so a refresh appends the rows after each table's watermark
+    (the highest id written) instead of rewriting the snapshot. It re-reads a trailing window of ids below the
+    watermark too and skips the ids already written, so a row committed after higher ids isn't missed
+    Only columns that never change once a row is written are snapshotted: an answer's marksAchieved changes when
+    marks are allocated or a quiz is regraded, so it isn't in the answers snapshot (read it from MySQL)
+    Notebooks and the ML layer read them memory-mapped (read_snapshot, read_event_frame) instead of querying MySQL
+    pyarrow is only needed by the snapshot job and its readers, the API never imports this module
+"""
+
+from typing import Any, Dict, Mapping, Optional, Sequence, Set
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.models.logs_model import Actions
+from src.models.question_model import Levels, Type
+
+# every enum column shares one dictionary in the enum's order, so the codes are the same in every file
+ENUM_CATEGORIES: Dict[str, Sequence[str]] = {
+    "action": [action.value for action in Actions],
+    "level": [level.value for level in Levels],
+    "type": [question_type.value for question_type in Type]
+}
+ENUM_TYPE = pa.dictionary(pa.int8(), pa.string())
+
+# answers come from AnswerRepository.get_answers_after, events from LogRepository.get_logs_after
+SCHEMAS: Dict[str, pa.Schema] = {
+    "answers": pa.schema([
+        ("answer_id", pa.int32()),
+        ("user_id", pa.int32()),
+        ("quiz_id", pa.int32()),
+        ("question_id", pa.int32()),
+        ("answer", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("question", pa.string()),
+        ("correct_answer", pa.string()),
+        ("marks", pa.int32()),
+        ("level", ENUM_TYPE),
+        ("type", ENUM_TYPE),
+        ("date", pa.date32())
+    ]),
+    "events": pa.schema([
+        ("log_id", pa.int32()),
+        ("user_id", pa.int32()),
+        ("quiz_id", pa.int32()),
+        ("question_id", pa.int32()),
+        ("action", ENUM_TYPE),
+        ("time", pa.timestamp("us")),
+        ("date", pa.date32())
+    ])
+}
+ID_COLUMNS = {"answers": "answer_id", "events": "log_id"}
+# the day a row is filed under (answers stored before created_at existed go to the null partition)
+DATE_COLUMNS = {"answers": "created_at", "events": "time"}
+PARTITIONING = ds.partitioning(pa.schema([("quiz_id", pa.int32()), ("date", pa.date32())]), flavor="hive")
+WATERMARKS_FILE = "_watermarks.json"
+
+class SnapshotWriter:
+    """
+        Appends batches of rows to the snapshots in a directory and keeps each table's watermark, plus the ids
+        written in the trailing window below it (rescan_ids wide) so the rows re-read there aren't written twice
+        A batch's files are named after its first new id, so a refresh that stopped before saving the watermark
+        rewrites the same files when it runs again instead of duplicating rows. Run one refresh at a time per directory
+    """
+
+    def __init__(self, directory: str, rescan_ids: int = 1000) -> None:
+        self.directory = directory
+        self.rescan_ids = rescan_ids
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.directory, WATERMARKS_FILE)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def watermarks(self) -> Dict[str, int]:
+        """The highest id written per table, 0 before the first refresh"""
+        saved = self._load()
+        return {table: int(saved.get(table, 0)) for table in SCHEMAS}
+
+    def watermark(self, table: str) -> int:
+        return self.watermarks()[table]
+
+    def rescan_from(self, table: str) -> int:
+        """The id a refresh reads the table after: rescan_ids below its watermark"""
+        return max(self.watermark(table) - self.rescan_ids, 0)
+
+    def recent_ids(self, table: str) -> Set[int]:
+        """The ids written in the trailing window below the table's watermark"""
+        return set(self._load().get("recent", {}).get(table, []))
+
+    def append(self, table: str, columns: Mapping[str, Sequence[Any]]) -> int:
+        """
+            Writes the rows of a batch (by column, in id order) that aren't in the snapshot yet to the table's
+            partitions, then moves its watermark
+            Return:
+                int: The number of rows written
+        """
+        ids = columns[ID_COLUMNS[table]]
+        if len(ids) == 0:
+            return 0
+        recent = self.recent_ids(table)
+        keep = [i for i, row_id in enumerate(ids) if row_id not in recent]
+        if len(keep) < len(ids):
+            columns = {name: [values[i] for i in keep] for name, values in columns.items()}
+        if keep:
+            ds.write_dataset(
+                to_table(table, columns),
+                os.path.join(self.directory, table),
+                format="parquet",
+                partitioning=PARTITIONING,
+                basename_template=f"part-{columns[ID_COLUMNS[table]][0]}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore"
+            )
+        self._save_watermark(table, max(self.watermark(table), int(ids[-1])), recent.union(int(i) for i in columns[ID_COLUMNS[table]]))
+        return len(keep)
+
+    def _save_watermark(self, table: str, watermark: int, recent: Set[int]) -> None:
+        # written to a temporary file and renamed, so a crash never leaves a half-written watermark
+        saved = self._load()
+        saved[table] = watermark
+        # the ids at or below the rescan window are never re-read, so they don't need remembering
+        saved.setdefault("recent", {})[table] = sorted(i for i in recent if i > watermark - self.rescan_ids)
+        path = os.path.join(self.directory, WATERMARKS_FILE)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(saved, file)
+        os.replace(f"{path}.tmp", path)
+
+def to_table(table: str, columns: Mapping[str, Sequence[Any]]) -> pa.Table:
+    """Builds a batch with the table's schema: ids as int32, enums against their fixed dictionary, plus its date"""
+    schema = SCHEMAS[table]
+    arrays = []
+    for field in schema:
+        if field.name == "date":
+            arrays.append(pc.cast(arrays[schema.get_field_index(DATE_COLUMNS[table])], pa.date32()))
+        elif field.name in ENUM_CATEGORIES:
+            arrays.append(pa.array(pd.Categorical(columns[field.name], categories=ENUM_CATEGORIES[field.name])).cast(field.type))
+        else:
+            arrays.append(pa.array(list(columns[field.name]), type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def read_snapshot(directory: str, table: str, quiz_id: Optional[int] = None) -> pd.DataFrame:
+    """
+        Reads a table of the snapshots (optionally one quiz's partitions) memory-mapped, in id order
+        Enums come back categorical and times as datetime64[ns], like the DataPrepocessor's frames
+    """
+    path = os.path.join(directory, table)
+    schema = SCHEMAS[table]
+    if not os.path.isdir(path):
+        data = schema.empty_table()
+    else:
+        data = pq.read_table(
+            path,
+            partitioning=PARTITIONING,
+            filters=[("quiz_id", "=", quiz_id)] if quiz_id is not None else None,
+            memory_map=True
+        ).select(schema.names).sort_by(ID_COLUMNS[table])
+    return data.to_pandas(coerce_temporal_nanoseconds=True)
+
+def read_event_frame(directory: str, quiz_id: int) -> pd.DataFrame:
+    """
+        A quiz's answers joined to the log events of the same user and question, from the snapshots
+        Return:
+            pd.DataFrame: One row per answer x log event, ordered like DataPrepocessor.build_event_frame,
+                so latest_events and to_records apply to it as they do to the live data
+    """
+    answers = read_snapshot(directory, "answers", quiz_id).drop(columns=["date"])
+    events = read_snapshot(directory, "events", quiz_id).drop(columns=["quiz_id", "date"])
+    frame = answers.merge(events, on=["user_id", "question_id"], how="inner", sort=False)
+    return frame.sort_values(["user_id", "question_id", "time", "log_id"], kind="stable", ignore_index=True)
@@ -0,0 +1,177 @@
+"""
+    Time-on-task engine
+    Turns the logs event stream (started/paused/resumed/completed) into engagement metrics per (user, question):
+    active time, idle time, pause count and completion latency, plus a per-quiz summary
+    The state is stored in the engagement table and new events are folded into it a batch at a time (see
+    MLService.refresh_engagement), so no process ever rescans the logs table, not even after a restart
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+from src.ml_core.data_processing import ACTION_DTYPE, ID_DTYPE
+
+# time between an event and the next one counts as active after these, idle after a pause
+ACTIVE_ACTIONS = ["started", "resumed"]
+IDLE_ACTIONS = ["paused"]
+KEY_COLUMNS = ["user_id", "question_id"]
+STATE_COLUMNS = ["quiz_id", "events", "active_seconds", "idle_seconds", "pause_count", "started_at", "completed_at", "last_action", "last_time"]
+# how the totals in the state combine with a new batch (the batch comes last)
+STATE_AGGREGATES = {
+    "quiz_id": "last", "events": "sum", "active_seconds": "sum", "idle_seconds": "sum", "pause_count": "sum",
+    "started_at": "min", "completed_at": "min", "last_action": "last", "last_time": "last"
+}
+# "no time yet" in int64 nanoseconds, so the minimum reductions skip events of other actions
+NO_TIME = np.iinfo(np.int64).max
+
+def _codes(actions: List[str]) -> np.ndarray:
+    return np.asarray([ACTION_DTYPE.categories.get_loc(action) for action in actions])
+
+def _empty_state() -> pd.DataFrame:
+    index = pd.MultiIndex.from_arrays([np.array([], dtype=ID_DTYPE), np.array([], dtype=ID_DTYPE)], names=KEY_COLUMNS)
+    return pd.DataFrame({
+        "quiz_id": np.array([], dtype=ID_DTYPE),
+        "events": np.array([], dtype=np.int64),
+        "active_seconds": np.array([], dtype=np.float64),
+        "idle_seconds": np.array([], dtype=np.float64),
+        "pause_count": np.array([], dtype=np.int64),
+        "started_at": np.array([], dtype="datetime64[ns]"),
+        "completed_at": np.array([], dtype="datetime64[ns]"),
+        "last_action": pd.Categorical([], dtype=ACTION_DTYPE),
+        "last_time": np.array([], dtype="datetime64[ns]")
+    }, index=index)
+
+def sessionize(events: pd.DataFrame, carried: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+        Computes the metrics of a batch of events per (user, question), without any per-row Python
+        events needs user_id, question_id, quiz_id, action (ACTION_DTYPE) and time
+        carried holds the last event of (user, question) pairs already in the state, it is only used
+        for the interval up to the first new event and isn't counted again
+        Return:
+            pd.DataFrame: STATE_COLUMNS indexed by (user_id, question_id), for this batch alone
+    """
+    events = events.assign(carried=False, order=events["log_id"].astype(np.int64))
+    if carried is not None and len(carried) > 0:
+        carried = carried.reset_index()
+        events = pd.concat([events, pd.DataFrame({
+            "user_id": carried["user_id"],
+            "question_id": carried["question_id"],
+            "quiz_id": carried["quiz_id"],
+            "action": carried["last_action"],
+            "time": carried["last_time"],
+            "carried": True,
+            "order": np.int64(-1)
+        })], ignore_index=True)
+    events = events.sort_values(["user_id", "question_id", "time", "order"], kind="stable", ignore_index=True)
+
+    users = events["user_id"].to_numpy()
+    questions = events["question_id"].to_numpy()
+    actions = events["action"].cat.codes.to_numpy()
+    times = events["time"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    new = events["carried"].to_numpy() == False # noqa: E712
+
+    # group boundaries where (user, question) changes, then a group id per event
+    boundary = np.r_[True, (users[1:] != users[:-1]) | (questions[1:] != questions[:-1])]
+    group = np.cumsum(boundary) - 1
+    starts = np.flatnonzero(boundary)
+    ends = np.r_[starts[1:] - 1, len(events) - 1]
+    groups = len(starts)
+
+    # the interval before each event belongs to the state the previous event left the question in
+    same_group = ~boundary[1:]
+    gaps = np.maximum(np.diff(times), 0) / 1e9 * same_group # late events never count negative time
+    previous = actions[:-1]
+    active = np.bincount(group[1:], weights=gaps * np.isin(previous, _codes(ACTIVE_ACTIONS)), minlength=groups)
+    idle = np.bincount(group[1:], weights=gaps * np.isin(previous, _codes(IDLE_ACTIONS)), minlength=groups)
+    pauses = np.bincount(group, weights=new & np.isin(actions, _codes(IDLE_ACTIONS)), minlength=groups)
+    counts = np.bincount(group, weights=new, minlength=groups)
+
+    # first start and first completion of the group (carried rows are already in the state)
+    started = np.minimum.reduceat(np.where(new & (actions == _codes(["started"])[0]), times, NO_TIME), starts)
+    completed = np.minimum.reduceat(np.where(new & (actions == _codes(["completed"])[0]), times, NO_TIME), starts)
+
+    return pd.DataFrame({
+        "quiz_id": events["quiz_id"].to_numpy()[starts].astype(ID_DTYPE),
+        "events": counts.astype(np.int64),
+        "active_seconds": active,
+        "idle_seconds": idle,
+        "pause_count": pauses.astype(np.int64),
+        "started_at": _to_datetimes(started),
+        "completed_at": _to_datetimes(completed),
+        "last_action": pd.Categorical.from_codes(actions[ends], dtype=ACTION_DTYPE),
+        "last_time": times[ends].astype("datetime64[ns]")
+    }, index=pd.MultiIndex.from_arrays([users[starts], questions[starts]], names=KEY_COLUMNS))
+
+def _to_datetimes(values: np.ndarray) -> np.ndarray:
+    return np.where(values == NO_TIME, np.datetime64("NaT"), values.astype("datetime64[ns]"))
+
+def state_frame(columns: Mapping[str, Sequence[Any]]) -> pd.DataFrame:
+    """Builds the state, indexed by (user_id, question_id), from the columns of EngagementRepository's reads"""
+    if len(columns["user_id"]) == 0:
+        return _empty_state()
+    index = pd.MultiIndex.from_arrays([
+        np.asarray(columns["user_id"], dtype=ID_DTYPE), np.asarray(columns["question_id"], dtype=ID_DTYPE)
+    ], names=KEY_COLUMNS)
+    return pd.DataFrame({
+        "quiz_id": np.asarray(columns["quiz_id"], dtype=ID_DTYPE),
+        "events": np.asarray(columns["events"], dtype=np.int64),
+        "active_seconds": np.asarray(columns["active_seconds"], dtype=np.float64),
+        "idle_seconds": np.asarray(columns["idle_seconds"], dtype=np.float64),
+        "pause_count": np.asarray(columns["pause_count"], dtype=np.int64),
+        "started_at": pd.DatetimeIndex(columns["started_at"]).astype("datetime64[ns]").to_numpy(),
+        "completed_at": pd.DatetimeIndex(columns["completed_at"]).astype("datetime64[ns]").to_numpy(),
+        "last_action": pd.Categorical(columns["last_action"], dtype=ACTION_DTYPE),
+        "last_time": pd.DatetimeIndex(columns["last_time"]).astype("datetime64[ns]").to_numpy()
+    }, index=index)
+
+def fold_events(state: Mapping[str, Sequence[Any]], events: Mapping[str, Any]) -> pd.DataFrame:
+    """
+        Folds a batch of events into the stored state of the (user, question) pairs they touch
+        The totals of pairs already stored are added to, first start and completion keep the earliest
+        Module level so it runs in the process pool, off the event loop
+        state holds the stored rows of the touched pairs, events the typed columns of DataPrepocessor.events_columns
+        Return:
+            pd.DataFrame: The new rows of the touched pairs, KEY_COLUMNS + STATE_COLUMNS
+    """
+    carried = state_frame(state)
+    batch = sessionize(pd.DataFrame(events), carried)
+    combined = pd.concat([carried, batch]).groupby(level=KEY_COLUMNS, sort=False, observed=True).agg(STATE_AGGREGATES)
+    return combined[STATE_COLUMNS].reset_index()
+
+def question_metrics(state: pd.DataFrame) -> pd.DataFrame:
+    """
+        Engagement per (user, question) from a quiz's state (see state_frame)
+        completion_seconds is the time from the first start to the first completion (NaN until completed)
+    """
+    metrics = state.reset_index()[["user_id", "question_id", "quiz_id", "events", "active_seconds", "idle_seconds", "pause_count"]]
+    metrics["completed"] = state["completed_at"].notna().to_numpy()
+    metrics["completion_seconds"] = ((state["completed_at"] - state["started_at"]).dt.total_seconds()).to_numpy()
+    return metrics.sort_values(KEY_COLUMNS, ignore_index=True)
+
+def quiz_summary(quiz_id: int, state: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """
+        Engagement summary for a quiz across every (user, question) attempt in its state
+        Return:
+            Dict[str, Any]: Totals and averages
+            None: Return null if the quiz has no events yet
+    """
+    metrics = question_metrics(state)
+    if len(metrics) == 0:
+        return None
+    return to_json_records(pd.DataFrame([{
+        "quiz_id": quiz_id,
+        "students": metrics["user_id"].nunique(),
+        "attempts": len(metrics),
+        "events": metrics["events"].sum(),
+        "completion_rate": metrics["completed"].mean(),
+        "total_active_seconds": metrics["active_seconds"].sum(),
+        "mean_active_seconds": metrics["active_seconds"].mean(),
+        "mean_idle_seconds": metrics["idle_seconds"].mean(),
+        "pause_count": metrics["pause_count"].sum(),
+        "median_completion_seconds": metrics["completion_seconds"].median()
+    }]))[0]
+
+def to_json_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Converts a metrics frame to records with plain Python values and None for missing values"""
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records") # type: ignore
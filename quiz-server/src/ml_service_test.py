@@ -0,0 +1,109 @@
+"""
+    Tests for the ML service's data access and preprocessing
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from src.benchmarks.ml_analyse_benchmark import seed, QUIZ_ID, LOGS_PER_ANSWER
+from src.repositories.analysis_repository import AnalysisRepository
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.quiz_repository import QuizRepository
+from src.repositories.engagement_repository import EngagementRepository
+from src.services.ml_service import MLService
+from src.workers.engagement_refresh import refresh_engagement
+from src.api.schemas.log_schema import LogCreate
+from src.api.schemas.ml_schema import QuestionEngagementResponse, QuizEngagementResponse
+from src.models.logs_model import Actions, logs_table
+
+def run_with_service(database, students: int, test):
+    """Seeds the database with one quiz answered by every student and runs the test coroutine"""
+    async def _test(session):
+        await seed(session, students)
+        database.statements.clear()
+        service = MLService(
+            AnalysisRepository(session), AnswerRepository(session), LogRepository(session),
+            QuestionRepository(session), UserRepository(session), QuizRepository(session),
+            engagement_repo=EngagementRepository(session)
+        )
+        await test(service, database.statements)
+    database.run(_test)
+
+def test_analyse_round_trips_do_not_grow_with_students(database):
+    async def test(service, statements):
+        records = await service.analyse(QUIZ_ID)
+        assert len(statements) == 2
+        assert len(records) == 50 * 10
+        # every answer is joined with its own question and the latest log for it
+        first = records[0]
+        assert (first["user_id"], first["question"], first["correct_answer"]) == (1, "Question 1", "a")
+        assert (first["log_action"], first["log_time"]) == ("completed", datetime(2025, 1, 1, 9, 1, 30))
+
+        statements.clear()
+        page = await service.analyse(QUIZ_ID, skip=2, limit=3, user_id=7)
+        assert len(statements) == 3 # user lookup, answers page, logs
+        assert [(r["user_id"], r["question"]) for r in page] == [(7, "Question 3"), (7, "Question 4"), (7, "Question 5")]
+        assert await service.analyse(QUIZ_ID, user_id=999) == []
+    run_with_service(database, 50, test)
+
+def test_event_frame_is_typed_with_one_row_per_event(database):
+    async def test(service, statements):
+        answers = await service.answer_repo.get_quiz_answers_with_questions(QUIZ_ID)
+        logs = await service.log_repo.get_logs_by_quiz_id(QUIZ_ID)
+        frame = service.preprocessor.build_event_frame(answers, logs)
+        assert len(frame) == 5 * 10 * LOGS_PER_ANSWER
+        assert {column: str(dtype) for column, dtype in frame.dtypes.items()} == {
+            "answer_id": "int32", "user_id": "int32", "question_id": "int32", "answer": "object",
+            "question": "category", "correct_answer": "category", "log_id": "int32",
+            "action": "category", "time": "datetime64[ns]"
+        }
+        assert list(frame["action"][:2]) == ["started", "completed"]
+    run_with_service(database, 5, test)
+
+def test_engagement_folds_in_new_and_late_events_once(database):
+    async def test(service, statements):
+        # the routes only read what the background refresh folded in
+        assert await service.get_quiz_engagement(QUIZ_ID) is None
+        assert await refresh_engagement(database.session) == 3 * 10 * LOGS_PER_ANSWER
+        statements.clear()
+        metrics = await service.get_question_engagement(QUIZ_ID, user_id=2)
+        assert len(statements) == 1 and statements[0].lstrip().startswith("SELECT")
+        assert len(metrics) == 10
+        assert QuestionEngagementResponse.model_validate(metrics[0]).model_dump() == {
+            "user_id": 2, "question_id": 1, "quiz_id": QUIZ_ID, "events": 2, "active_seconds": 30.0,
+            "idle_seconds": 0.0, "pause_count": 0, "completed": True, "completion_seconds": 30.0
+        }
+        watermark = await service.engagement_repo.get_watermark()
+        assert watermark == 3 * 10 * LOGS_PER_ANSWER
+
+        # user 3 comes back to question 1 after completing it: pause, resume 2 minutes later, 15s more work
+        completed_at = datetime(2025, 1, 1, 9, 1, 30)
+        for action, delay in [(Actions.paused, 0), (Actions.resumed, 120), (Actions.completed, 135)]:
+            await service.log_repo.create_log(LogCreate(action=action, time=completed_at + timedelta(seconds=delay), user_id=3, question_id=1))
+        statements.clear()
+        assert await service.refresh_engagement() == 3
+        assert not any("FROM answers" in statement for statement in statements) # only the new events are read
+        assert await service.refresh_engagement() == 0
+
+        # an event committed after higher ids (a lower id showing up late) is still folded in, once
+        await service.log_repo.db.execute(insert(logs_table).values(id=watermark + 100, action=Actions.completed, time=completed_at, user_id=1, question_id=2))
+        await service.log_repo.db.commit()
+        assert await service.refresh_engagement() == 1
+        await service.log_repo.db.execute(insert(logs_table).values(id=watermark + 50, action=Actions.completed, time=completed_at, user_id=1, question_id=2))
+        await service.log_repo.db.commit()
+        assert await service.refresh_engagement() == 1
+        assert await service.refresh_engagement() == 0
+        assert (await service.get_question_engagement(QUIZ_ID, user_id=1))[1]["events"] == 4
+        question = (await service.get_question_engagement(QUIZ_ID, user_id=3))[0]
+        assert (question["events"], question["active_seconds"], question["idle_seconds"], question["pause_count"]) == (5, 45.0, 120.0, 1)
+        assert question["completion_seconds"] == 30.0 # latency to the first completion
+
+        summary = QuizEngagementResponse.model_validate(await service.get_quiz_engagement(QUIZ_ID))
+        assert (summary.students, summary.attempts, summary.events, summary.pause_count) == (3, 30, 65, 1)
+        assert summary.completion_rate == 1.0
+        assert await service.get_quiz_engagement(QUIZ_ID + 1) is None
+    run_with_service(database, 3, test)
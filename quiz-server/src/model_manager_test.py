@@ -0,0 +1,93 @@
+"""
+    Tests for the model registry and its routes
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+
+from src.api.routers import ml_route
+from src.api.dependencies.common import get_model_manager
+from src.api.dependencies.auth import validate_current_user
+from src.api.exceptions.custom_exceptions import ModelNotFoundError
+from src.ml_core.model_manager import ModelManager
+from src.models.user_model import Type
+
+X = np.array([[0.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 1.0]])
+
+def trained(labels) -> LogisticRegression:
+    return LogisticRegression().fit(X, labels)
+
+def test_versions_load_lazily_memory_mapped_and_swap_without_dropping_users(tmp_path):
+    manager = ModelManager(str(tmp_path))
+    manager.save("grader", "9", trained([0, 0, 1, 1]))
+    manager.save("grader", "10", trained([0, 1, 0, 1]))
+    with pytest.raises(FileExistsError):
+        manager.save("grader", "9", trained([0, 0, 1, 1]))
+
+    async def _run():
+        assert manager.versions("grader") == ["9", "10"]
+        # nothing is loaded until it is used, and concurrent first uses share the load
+        assert manager.stats()["models"] == []
+        latest, again = await asyncio.gather(manager.get("grader"), manager.get("grader"))
+        assert latest is again
+        assert manager.loads == 1 and manager.coalesced == 1
+        assert isinstance(latest.coef_, np.memmap)
+        assert list(latest.predict(X)) == [0, 1, 0, 1]
+
+        # a request holding version 10 keeps it while 9 is activated
+        in_flight = await manager.get("grader")
+        await manager.activate("grader", "9")
+        assert list(in_flight.predict(X)) == [0, 1, 0, 1]
+        assert list((await manager.get("grader")).predict(X)) == [0, 0, 1, 1]
+        assert manager.active_version("grader") == "9"
+
+        stats = manager.stats()
+        assert stats["swaps"] == 1 and stats["rss_bytes"] > 0
+        [model] = stats["models"]
+        assert (model["name"], model["version"], model["active"]) == ("grader", "9", True)
+        assert model["load_seconds"] > 0 and model["file_bytes"] > 0
+
+        # another process reads the active version from the ACTIVE file
+        other = ModelManager(str(tmp_path))
+        assert other.active_version("grader") == "9"
+        assert await other.warm_up(["grader", "missing"]) == 1
+
+        with pytest.raises(ModelNotFoundError):
+            await manager.get("grader", "11")
+        with pytest.raises(ModelNotFoundError):
+            await manager.get("..", "9")
+    asyncio.run(_run())
+
+def test_model_routes_list_and_activate_versions(tmp_path):
+    manager = ModelManager(str(tmp_path))
+    manager.save("grader", "1", trained([0, 0, 1, 1]))
+    manager.save("grader", "2", trained([0, 1, 0, 1]))
+    app = FastAPI()
+    app.include_router(ml_route.router)
+    app.dependency_overrides[get_model_manager] = lambda: manager
+    app.dependency_overrides[validate_current_user] = lambda: {"id": 1, "type": Type.admin}
+    client = TestClient(app)
+
+    assert client.get("/ml/models").json() == [{"name": "grader", "versions": ["1", "2"], "active": "2"}]
+    activated = client.put("/ml/models/grader/active", json={"version": "1"})
+    assert activated.status_code == 200 and activated.json()["active"] == "1"
+    assert client.get("/ml/models").json()[0]["active"] == "1"
+
+def test_only_admins_activate_model_versions(tmp_path):
+    manager = ModelManager(str(tmp_path))
+    manager.save("grader", "1", trained([0, 0, 1, 1]))
+    manager.save("grader", "2", trained([0, 1, 0, 1]))
+    app = FastAPI()
+    app.include_router(ml_route.router)
+    app.dependency_overrides[get_model_manager] = lambda: manager
+    client = TestClient(app)
+
+    assert client.put("/ml/models/grader/active", json={"version": "1"}, headers={"Authorization": "token"}).status_code == 401
+    app.dependency_overrides[validate_current_user] = lambda: {"id": 2, "type": Type.teacher}
+    assert client.put("/ml/models/grader/active", json={"version": "1"}).status_code == 403
+    assert manager.active_version("grader") == "2"
@@ -1,4 +1,12 @@
 # import all SQLAlchemy models here so Base.metadata.create_all can find them
+from .schools_model import schools_table
+from .topics_model import topics_table
 from .user_model import users_table
+from .quiz_model import quizzes_table
 from .question_model import questions_table
-from .quiz_model import quizzes_table
\ No newline at end of file
+from .qoptions_model import qoptions_table
+from .answers_model import answers_table
+from .logs_model import logs_table
+from .analyses_model import analyses_table
+from .jobs_model import jobs_table
+from .engagement_model import engagement_table, engagement_applied_logs_table
@@ -2,7 +2,7 @@
     Model for Analyses table
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, Text, ForeignKey, Table, Index
 from ..core.database import metadata
 
 analyses_table = Table(
@@ -10,6 +10,8 @@ analyses_table = Table(
     metadata,
     Column("id", Integer, primary_key=True, index=True),
     Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
-    Column("question_id", Integer, ForeignKey("Question.id"), nullable=False),
-    Column("analysis", String, nullable=False)
+    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False),
+    Column("analysis", Text, nullable=False),
+    # a user's analyses (get_analyses_by_user_id)
+    Index("ix_analyses_user", "user_id", "id")
 )
\ No newline at end of file
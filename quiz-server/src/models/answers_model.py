@@ -2,16 +2,27 @@
     Model for Answers table
 """
 
-from sqlalchemy import Column, Integer, String, Table, ForeignKey, TIMESTAMP
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey, TIMESTAMP, Index
 from ..core.database import metadata
 
+def utc_now() -> datetime:
+    """Naive UTC timestamp, as the TIMESTAMP columns store them"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 answers_table = Table(
     "answers",
     metadata,
     Column("id", Integer, primary_key=True, index=True, unique=True),
     Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
-    Column("question_id", Integer, ForeignKey("Question.id"), nullable=False),
-    Column("quiz_id", Integer, ForeignKey("Quiz.id"), nullable=False),
-    Column("answer", String, nullable=True),
-    Column("marksAchieved", Integer, nullable=True)
+    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("answer", Text, nullable=True),
+    Column("marksAchieved", Integer, nullable=True),
+    # when the answer was submitted (answers stored before migration 4 have none), filters exports by date
+    Column("created_at", TIMESTAMP, nullable=True, default=utc_now),
+    # a user's answers for a quiz (get_answers_by_user_and_quiz_id), the user_id prefix serves get_answers_by_user_id
+    Index("ix_answers_user_quiz", "user_id", "quiz_id", "question_id"),
+    # a quiz's answers in id order (get_answers_by_quiz_id, keyset pages)
+    Index("ix_answers_quiz", "quiz_id", "id")
 )
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+    Model for the Engagement tables
+    The time-on-task metrics per (user, question), and the log events already folded into them
+"""
+
+from sqlalchemy import Column, Integer, Double, Enum, TIMESTAMP, ForeignKey, Table, Index
+from ..core.database import metadata
+from .logs_model import Actions
+
+engagement_table = Table(
+    "engagement",
+    metadata,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True, autoincrement=False),
+    Column("question_id", Integer, ForeignKey("questions.id"), primary_key=True, autoincrement=False),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("events", Integer, nullable=False),
+    Column("active_seconds", Double, nullable=False),
+    Column("idle_seconds", Double, nullable=False),
+    Column("pause_count", Integer, nullable=False),
+    Column("started_at", TIMESTAMP, nullable=True),
+    Column("completed_at", TIMESTAMP, nullable=True),
+    # the last event folded in, the interval up to the next one is counted from it
+    Column("last_action", Enum(Actions), nullable=False),
+    Column("last_time", TIMESTAMP, nullable=False),
+    # a quiz's metrics (get_quiz_states)
+    Index("ix_engagement_quiz", "quiz_id", "user_id", "question_id")
+)
+
+# the log ids folded into the engagement table, kept for ENGAGEMENT_RESCAN_IDS below the highest one
+# (the watermark), so events committed out of id order are folded in once and only once
+engagement_applied_logs_table = Table(
+    "engagement_applied_logs",
+    metadata,
+    Column("log_id", Integer, primary_key=True, autoincrement=False)
+)
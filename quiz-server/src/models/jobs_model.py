@@ -0,0 +1,33 @@
+"""
+    Model for Jobs table
+"""
+
+from sqlalchemy import Column, Integer, String, Text, JSON, Enum, TIMESTAMP, Table, Index
+from ..core.database import metadata
+from .answers_model import utc_now
+import enum
+
+# a job moves queued -> running -> completed or failed
+class JobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+jobs_table = Table(
+    "jobs",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("kind", String(50), nullable=False),
+    Column("params", JSON, nullable=False),
+    # higher runs first, ties in submission order
+    Column("priority", Integer, nullable=False, default=0),
+    Column("status", Enum(JobStatus), nullable=False, default=JobStatus.queued),
+    Column("result", JSON, nullable=True),
+    Column("error", Text, nullable=True),
+    Column("created_at", TIMESTAMP, nullable=False, default=utc_now),
+    Column("started_at", TIMESTAMP, nullable=True),
+    Column("finished_at", TIMESTAMP, nullable=True),
+    # jobs still queued when the process stopped are picked up at startup (get_queued_jobs)
+    Index("ix_jobs_status", "status", "id")
+)
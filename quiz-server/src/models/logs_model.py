@@ -2,7 +2,7 @@
     Model for Logs table
 """
 
-from sqlalchemy import Column, Integer, Enum, ForeignKey, Table, TIMESTAMP
+from sqlalchemy import Column, Integer, Enum, ForeignKey, Table, TIMESTAMP, Index
 from ..core.database import metadata
 import enum
 
@@ -20,5 +20,11 @@ logs_table = Table(
     Column("action", Enum(Actions), nullable=False),
     Column("time", TIMESTAMP, nullable=False),
     Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
-    Column("question_id", Integer, ForeignKey("Question.id"), nullable=False)
+    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False),
+    # a user's events for one question (get_logs_by_user_id with question_id)
+    Index("ix_logs_user_question_time", "user_id", "question_id", "time"),
+    # a user's timeline in (time, id) order (get_logs_by_user_id, keyset pages)
+    Index("ix_logs_user_time", "user_id", "time", "id"),
+    # every event for a question, across users (get_logs_by_quiz_id joins from the quiz's questions)
+    Index("ix_logs_question_time", "question_id", "time")
 )
\ No newline at end of file
@@ -2,7 +2,7 @@
     Model for qoptions table
 """
 
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Table, ForeignKey, Index
 from ..core.database import metadata
 
 qoptions_table = Table(
@@ -10,5 +10,7 @@ qoptions_table = Table(
     metadata,
     Column("id", Integer, primary_key=True, index=True),
     Column("option", String(100), nullable=False),
-    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False)
+    Column("question_id", Integer, ForeignKey("questions.id"), nullable=False),
+    # a question's options (get_qoptions_by_question)
+    Index("ix_qoptions_question", "question_id", "id")
 )
\ No newline at end of file
@@ -2,7 +2,7 @@
     Model for Analyses table
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, Enum, TIMESTAMP, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, Boolean, Enum, TIMESTAMP, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from ..core.database import metadata # import Base from db setup
 import enum
@@ -22,10 +22,12 @@ questions_table = Table(
     "questions",
     metadata,
     Column("id", Integer, primary_key=True, index=True, unique=True),
-    Column("quiz_id", Integer, ForeignKey("Quiz.id"), nullable=False),
-    Column("question", String, nullable=False),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("question", Text, nullable=False),
     Column("marks", Integer, nullable=False),
     Column("level", Enum(Levels), nullable=False, default=Levels.low),
-    Column("correctAnswer", String, nullable=False),
-    Column("type", Enum(Type), nullable=False, default=Type.text)
+    Column("correctAnswer", String(255), nullable=False),
+    Column("type", Enum(Type), nullable=False, default=Type.text),
+    # a quiz's questions (get_questions_by_quiz_id)
+    Index("ix_questions_quiz", "quiz_id", "id")
 )
\ No newline at end of file
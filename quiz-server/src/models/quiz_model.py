@@ -9,7 +9,7 @@ quizzes_table = Table(
     "quizzes",
     metadata,
     Column("id", Integer, primary_key=True, index=True),
-    Column("title", String, nullable=False),
+    Column("title", String(255), nullable=False),
     Column("duration", Integer, nullable=False),
     Column("grade", Integer, nullable=False),
     Column("school_id", Integer, ForeignKey("schools.id"), nullable=True),
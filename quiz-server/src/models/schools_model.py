@@ -20,8 +20,8 @@ schools_table = Table(
     "schools",
     metadata,
     Column("id", Integer, primary_key=True, index=True),
-    Column("name", String, nullable=False),
-    Column("province", String, nullable=False),
+    Column("name", String(255), nullable=False),
+    Column("province", String(100), nullable=False),
     Column("area", Enum(Area), nullable=False),
     Column("type", Enum(Type), nullable=False)
 )
\ No newline at end of file
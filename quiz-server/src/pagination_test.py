@@ -0,0 +1,92 @@
+"""
+    Tests for paging the list routes by cursor (X-Next-Cursor) and by skip/limit
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from src.models.logs_model import logs_table
+from src.models.question_model import questions_table
+from src.api.routers import log_router
+from src.api.dependencies.common import get_db_session, get_read_db_session
+from src.api.exceptions.custom_exceptions import InvalidCursorError
+from src.utils.pagination import NEXT_CURSOR_HEADER, ID_KEYSET, encode_cursor
+
+START = datetime(2025, 1, 1, 9)
+# user 1's events: ids out of time order, and runs of events sharing a timestamp across page boundaries
+USER_LOG_SECONDS = [30, 0, 0, 0, 30, 30, 60, 0, 90, 60, 60]
+
+@pytest.fixture
+def client(make_database):
+    """A client for the log routes over a seeded database file, the test client runs the app on its own event loop"""
+    database = make_database("quiz")
+
+    async def _seed(session):
+        await session.execute(insert(questions_table).values(id=1, quiz_id=1, question="2 + 2?", marks=1, level="low", correctAnswer="4", type="mc"))
+        await session.execute(insert(logs_table), [
+            {"action": "started", "time": START + timedelta(seconds=seconds), "user_id": 1 + (n % 3 == 2), "question_id": 1}
+            for n, seconds in enumerate(USER_LOG_SECONDS * 2)
+        ])
+        await session.commit()
+    database.run(_seed)
+
+    async def session():
+        async with database.session() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(log_router.router)
+    app.dependency_overrides[get_db_session] = session
+    app.dependency_overrides[get_read_db_session] = session
+
+    # as main.py maps it
+    @app.exception_handler(InvalidCursorError)
+    async def invalid_cursor_handler(request: Request, exc: InvalidCursorError) -> JSONResponse:
+        return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+    with TestClient(app) as client:
+        yield client
+
+def walk(client: TestClient, path: str, limit: int) -> list:
+    """Follows X-Next-Cursor from the first page to the last, returns every row in order"""
+    rows, params = [], {"limit": limit}
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        rows.extend(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return rows
+        params = {"limit": limit, "cursor": cursor}
+
+def test_cursors_walk_every_row_once(client: TestClient):
+    every = walk(client, "/logs/all", limit=4)
+    assert [row["id"] for row in every] == list(range(1, len(USER_LOG_SECONDS) * 2 + 1))
+
+    # (time, id) keyset: ties on time are broken by id, whichever page they straddle
+    for limit in (1, 2, 3, 5):
+        timeline = walk(client, "/logs/user/1", limit=limit)
+        expected = sorted((row for row in every if row["user_id"] == 1), key=lambda row: (row["time"], row["id"]))
+        assert [row["id"] for row in timeline] == [row["id"] for row in expected]
+
+def test_malformed_and_tampered_cursors_are_rejected(client: TestClient):
+    for cursor in ["not a cursor", "e30", encode_cursor(["id"], ["1"])[:-3] + "xyz"]:
+        response = client.get("/logs/all", params={"cursor": cursor})
+        assert response.status_code == 400, cursor
+    # a cursor issued for another sort key
+    assert client.get("/logs/user/1", params={"cursor": encode_cursor(ID_KEYSET, [3])}).status_code == 400
+    assert client.get("/logs/all", params={"cursor": encode_cursor(ID_KEYSET, [3])}).status_code == 200
+
+def test_skip_and_limit_page_as_before(client: TestClient):
+    page = client.get("/logs/all", params={"skip": 2, "limit": 3})
+    assert [row["id"] for row in page.json()] == [3, 4, 5]
+    # skip pages carry the cursor for the page after them too
+    following = client.get("/logs/all", params={"limit": 3, "cursor": page.headers[NEXT_CURSOR_HEADER]})
+    assert [row["id"] for row in following.json()] == [6, 7, 8]
+    last = client.get("/logs/all", params={"skip": 20, "limit": 3})
+    assert [row["id"] for row in last.json()] == [21, 22] and NEXT_CURSOR_HEADER not in last.headers
@@ -0,0 +1,43 @@
+"""
+    Tests for the engine options built from the DB_* settings and the pool telemetry
+"""
+
+import asyncio
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.config import Settings
+from src.core.pool import InstrumentedAsyncPool, engine_options, install_pool_events, warm_pool, pool_stats
+
+def test_pool_sizing_only_applies_to_queue_pools():
+    memory = engine_options(Settings(DATABASE_URL="sqlite+aiosqlite://", FIREBASE_SERVICE_ACCOUNT="{}"))
+    assert memory == {"echo": False, "pool_pre_ping": False}
+    mysql = engine_options(Settings(DATABASE_URL="mysql+asyncmy://u:p@localhost/quiz", FIREBASE_SERVICE_ACCOUNT="{}", DB_PRE_PING="always"))
+    assert mysql["poolclass"] is InstrumentedAsyncPool
+    assert (mysql["pool_size"], mysql["max_overflow"], mysql["pool_recycle"], mysql["pool_pre_ping"]) == (10, 20, 1800, True)
+
+def test_warm_pool_and_idle_pre_ping(tmp_path):
+    async def _run():
+        settings = Settings(
+            DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", FIREBASE_SERVICE_ACCOUNT="{}",
+            DB_POOL_SIZE=3, DB_PRE_PING_IDLE_SECONDS=0
+        )
+        engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings))
+        install_pool_events(engine, settings)
+        statements = []
+        try:
+            assert await warm_pool(engine, 5) == 3
+            stats = pool_stats(engine)
+            assert (stats["size"], stats["checked_in"], stats["checked_out"], stats["checkouts"]) == (3, 3, 0, 3)
+
+            # connections idle past the threshold are pinged at checkout, outside the engine's statement events
+            event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 2"))
+                assert pool_stats(engine)["checked_out"] == 1
+            assert statements == ["SELECT 2"]
+            assert pool_stats(engine)["checkouts"] == 4
+        finally:
+            await engine.dispose()
+    asyncio.run(_run())
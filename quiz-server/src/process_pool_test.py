@@ -0,0 +1,52 @@
+"""
+    Tests for the process pool that runs the CPU-bound ML work
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.core.process_pool import ProcessPool
+from src.api.exceptions.custom_exceptions import TaskTimeoutError
+from src.benchmarks.ml_analyse_benchmark import seed, QUIZ_ID
+from src.repositories.analysis_repository import AnalysisRepository
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.quiz_repository import QuizRepository
+from src.services.ml_service import MLService
+
+def test_analysis_runs_in_the_pool_with_timeouts_and_cancellation(database):
+    async def _run():
+        pool = ProcessPool(workers=1)
+        try:
+            await pool.start()
+            async with database.session() as session:
+                await seed(session, 20)
+                repos = (
+                    AnalysisRepository(session), AnswerRepository(session), LogRepository(session),
+                    QuestionRepository(session), UserRepository(session), QuizRepository(session)
+                )
+                # same records as the inline run (a pool that isn't started runs work inline)
+                pooled = await MLService(*repos, pool=pool).analyse(QUIZ_ID)
+                assert pooled == await MLService(*repos, pool=ProcessPool(workers=0)).analyse(QUIZ_ID)
+                assert len(pooled) == 200 and pool.stats()["completed"] == 1
+
+            # the caller gets its timeout while the task is still running
+            busy = asyncio.create_task(pool.run(time.sleep, 1))
+            await asyncio.sleep(0.2)
+            started = time.perf_counter()
+            with pytest.raises(TaskTimeoutError):
+                # queued behind the busy worker, it is dropped without ever running
+                await pool.run(time.sleep, 5, timeout=0.1)
+            assert time.perf_counter() - started < 0.5
+            await busy
+            started = time.perf_counter()
+            assert await pool.run(abs, -3) == 3
+            assert time.perf_counter() - started < 2
+            assert pool.stats()["timeouts"] == 1 and pool.stats()["in_flight"] == 0
+        finally:
+            await pool.stop()
+    asyncio.run(_run())
@@ -0,0 +1,104 @@
+"""
+    Tests for the schema migrations and the index set behind the repositories' hot queries
+    Every hot repository query is captured as it's sent to the driver, then EXPLAINed,
+    and the test fails if any of them reads a table with a full scan
+"""
+
+import asyncio
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import models # noqa: F401 (registers every table on the metadata)
+from src.core.database import metadata
+from src.core.migrations import run_migrations, schema_migrations_table, MIGRATIONS
+from src.core.query_plans import find_full_scans
+from src.core.quiz_content_cache import quiz_content_cache
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.qoptions_repository import QOptionsRepository
+from src.repositories.analysis_repository import AnalysisRepository
+from src.utils.pagination import encode_cursor, ID_KEYSET, TIME_ID_KEYSET
+from datetime import datetime
+
+async def hot_queries(session: AsyncSession) -> None:
+    answers = AnswerRepository(session)
+    logs = LogRepository(session)
+    await answers.get_answer_by_id(1)
+    await answers.get_answers_by_user_and_quiz_id(1, 1)
+    await answers.get_answers_by_user_id(1)
+    await answers.get_answers_by_quiz_id(1)
+    await answers.get_answers_by_quiz_id(1, cursor=encode_cursor(ID_KEYSET, [10]))
+    await answers.get_answers_with_questions(cursor=encode_cursor(ID_KEYSET, [10]))
+    await logs.get_logs_by_user_id(1)
+    await logs.get_logs_by_user_id(1, question_id=1)
+    await logs.get_logs_by_user_id(1, cursor=encode_cursor(TIME_ID_KEYSET, [datetime(2025, 1, 1), 10]))
+    await logs.get_logs(cursor=encode_cursor(ID_KEYSET, [10]))
+    await answers.get_quiz_answers_with_questions(1)
+    await logs.get_logs_by_quiz_id(1)
+    await logs.get_logs_by_quiz_id(1, user_id=1)
+    await logs.get_logs_after(10)
+    quiz_content_cache.clear()
+    await QuestionRepository(session).get_questions_by_quiz_id(1)
+    await QuestionRepository(session).get_questions_by_ids([1, 2])
+    await QOptionsRepository(session).get_qoptions_by_question(1)
+    await AnalysisRepository(session).get_analyses_by_user_id(1)
+
+def test_migrations_are_versioned_and_idempotent(make_database):
+    engine = make_database(migrate=False).engine
+
+    async def _run():
+        assert await run_migrations(engine) == [m.version for m in MIGRATIONS]
+        assert await run_migrations(engine) == []
+        async with engine.connect() as conn:
+            versions = (await conn.execute(select(schema_migrations_table.c.version))).scalars().all()
+            indexes = await conn.run_sync(lambda c: {i["name"] for i in inspect(c).get_indexes("answers")})
+        assert sorted(versions) == [m.version for m in MIGRATIONS]
+        assert {"ix_answers_user_quiz", "ix_answers_quiz"} <= indexes
+    asyncio.run(_run())
+
+def schema(conn) -> dict:
+    """Every table's columns (name, nullable) and indexes (name, columns)"""
+    inspector = inspect(conn)
+    return {
+        table: (
+            [(column["name"], column["nullable"]) for column in inspector.get_columns(table)],
+            sorted((index["name"], tuple(index["column_names"])) for index in inspector.get_indexes(table))
+        )
+        for table in inspector.get_table_names() if table != schema_migrations_table.name
+    }
+
+def test_an_older_schema_upgrades_to_the_models(make_database):
+    engine = make_database(migrate=False).engine
+    models_engine = make_database(migrate=False).engine
+
+    async def _run():
+        # a database migrated before the later migrations (and their tables) existed
+        assert await run_migrations(engine, target=2) == [1, 2]
+        async with engine.connect() as conn:
+            assert "jobs" not in await conn.run_sync(lambda c: inspect(c).get_table_names())
+        assert await run_migrations(engine) == [3, 4, 5, 6]
+
+        # ends up with the schema src/models describes
+        async with models_engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        async with engine.connect() as migrated, models_engine.connect() as created:
+            assert await migrated.run_sync(schema) == await created.run_sync(schema)
+    asyncio.run(_run())
+
+def test_hot_queries_use_indexes(database):
+    engine = database.engine
+    # EXPLAIN needs each statement's parameters as well
+    captured = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, statement, parameters, *args: captured.append((statement, parameters)))
+
+    async def _run():
+        async with database.session() as session:
+            await hot_queries(session)
+        selects = [(s, p) for s, p in captured if s.lstrip().upper().startswith("SELECT")]
+        async with engine.connect() as conn:
+            scans = await conn.run_sync(lambda c: {s: find_full_scans(c, s, p) for s, p in selects})
+        assert selects
+        assert {s: lines for s, lines in scans.items() if lines} == {}
+    asyncio.run(_run())
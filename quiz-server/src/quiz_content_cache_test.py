@@ -0,0 +1,145 @@
+"""
+    Tests for serving a quiz's questions and options from the quiz content cache
+"""
+
+import asyncio
+import json
+
+from fastapi import Request
+from sqlalchemy import insert
+
+from src.core.quiz_content_cache import QuizContentCache, quiz_content_cache
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.qoptions_repository import QOptionsRepository
+from src.repositories.quiz_repository import QuizRepository
+from src.models.quiz_model import quizzes_table
+from src.services.quiz_service import QuizService
+from src.utils.http_cache import matches_etag
+from src.api.schemas.question_schema import QuestionCreate, QuestionUpdate
+from src.api.schemas.qoptions_schema import QOptionsCreate, QOptionsUpdate
+from src.api.schemas.quiz_schema import QuizCreate
+
+def question(text: str, quiz_id: int = 1) -> QuestionCreate:
+    return QuestionCreate(question=text, marks=1, level="low", correctAnswer="a", quiz_id=quiz_id, type="mc")
+
+def test_quiz_content_is_served_from_the_cache_until_a_write(database):
+    async def _run():
+        statements = database.statements
+        quiz_content_cache.clear()
+        try:
+            async with database.session() as session:
+                await session.execute(insert(quizzes_table), [{"id": 1, "title": "Sums", "duration": 10, "grade": 1, "topic_id": 1}, {"id": 2, "title": "More sums", "duration": 10, "grade": 1, "topic_id": 1}])
+                await session.commit()
+                questions = QuestionRepository(session)
+                qoptions = QOptionsRepository(session)
+                first = await questions.create_question(question("1 + 1?"))
+                second = await questions.create_question(question("2 + 2?"))
+                option = await qoptions.create_qoption(QOptionsCreate(option="2", question_id=first["id"]))
+
+                statements.clear()
+                # a miss loads the quiz, its questions and all their options in one query
+                assert [q["question"] for q in await questions.get_questions_by_quiz_id(1)] == ["1 + 1?", "2 + 2?"]
+                assert len(statements) == 1
+
+                # hits cost no queries, for the questions and for any question's options
+                assert [q["id"] for q in await questions.get_questions_by_quiz_id(1, skip=1)] == [second["id"]]
+                assert await qoptions.get_qoptions_by_question(first["id"]) == [option]
+                assert await qoptions.get_qoptions_by_question(second["id"]) == []
+                assert len(statements) == 1
+
+                # callers get copies, the cached rows can't be modified through them
+                (await questions.get_questions_by_quiz_id(1))[0]["question"] = "changed"
+                assert (await questions.get_questions_by_quiz_id(1))[0]["question"] == "1 + 1?"
+
+                await questions.update_question(first["id"], QuestionUpdate(question="3 + 3?", marks=1, level="low", correctAnswer="6", quiz_id=1, type="mc"))
+                assert (await questions.get_questions_by_quiz_id(1))[0]["question"] == "3 + 3?"
+
+                await qoptions.update_qopt(option["id"], QOptionsUpdate(option="6", question_id=first["id"]))
+                assert (await qoptions.get_qoptions_by_question(first["id"]))[0]["option"] == "6"
+
+                await questions.create_question(question("4 + 4?"))
+                assert len(await questions.get_questions_by_quiz_id(1)) == 3
+
+                # moving a question drops the quiz it left as well as the one it joined
+                await questions.get_questions_by_quiz_id(2)
+                await questions.update_question(second["id"], QuestionUpdate(question="2 + 2?", marks=1, level="low", correctAnswer="4", quiz_id=2, type="mc"))
+                assert [q["id"] for q in await questions.get_questions_by_quiz_id(2)] == [second["id"]]
+                assert second["id"] not in [q["id"] for q in await questions.get_questions_by_quiz_id(1)]
+        finally:
+            quiz_content_cache.clear()
+    asyncio.run(_run())
+
+def test_concurrent_misses_share_one_load():
+    async def _run():
+        cache = QuizContentCache(maxsize=10, ttl=60)
+        loads = []
+
+        async def load():
+            loads.append(1)
+            await asyncio.sleep(0.01)
+            return {"questions": [{"id": 7, "quiz_id": 1}], "options": {7: [{"id": 3, "question_id": 7}]}}
+
+        results = await asyncio.gather(*[cache.get_quiz(1, load) for _ in range(20)])
+        assert len(loads) == 1 and all(result is results[0] for result in results)
+        assert cache.stats()["loads"] == 1 and cache.stats()["coalesced"] == 19
+
+        # an option write invalidates its quiz, even while a load is in flight
+        in_flight = asyncio.ensure_future(cache.get_quiz(2, load))
+        await asyncio.sleep(0)
+        cache.invalidate_option(3)
+        assert cache.cached_options(7) is None
+        await in_flight
+        assert len(cache) == 0
+    asyncio.run(_run())
+
+def test_full_quiz_is_rendered_once_per_load(database):
+    async def _run():
+        quiz_content_cache.clear()
+        try:
+            async with database.session() as session:
+                service = QuizService(QuizRepository(session), QuestionRepository(session))
+                assert await service.get_full_quiz(1) is None
+
+                quiz = await QuizRepository(session).create_quiz(QuizCreate(title="Sums", duration=10, grade=1, topic_id=1))
+                first = await QuestionRepository(session).create_question(question("1 + 1?", quiz["id"]))
+                await QuestionRepository(session).create_question(question("True?", quiz["id"]))
+                await QOptionsRepository(session).create_qoption(QOptionsCreate(option="2", question_id=first["id"]))
+                await QOptionsRepository(session).create_qoption(QOptionsCreate(option="3", question_id=first["id"]))
+
+                body, etag = await service.get_full_quiz(quiz["id"])
+                full_quiz = json.loads(body)
+                assert full_quiz["title"] == "Sums"
+                assert [[o["option"] for o in q["options"]] for q in full_quiz["questions"]] == [["2", "3"], []]
+                # served from the same rendering until the content changes
+                assert (await service.get_full_quiz(quiz["id"]))[0] is body
+
+                conditional = Request({"type": "http", "headers": [(b"if-none-match", f'W/{etag}, "other"'.encode())]})
+                assert matches_etag(conditional, etag)
+
+                await QOptionsRepository(session).update_qopt(full_quiz["questions"][0]["options"][0]["id"], QOptionsUpdate(option="4", question_id=first["id"]))
+                changed_body, changed_etag = await service.get_full_quiz(quiz["id"])
+                assert changed_etag != etag and not matches_etag(conditional, changed_etag)
+        finally:
+            quiz_content_cache.clear()
+    asyncio.run(_run())
+
+def test_indexes_are_pruned_with_their_quiz():
+    async def _run():
+        now = [0.0]
+        cache = QuizContentCache(maxsize=1, ttl=5, clock=lambda: now[0])
+
+        def content(quiz_id: int):
+            async def load():
+                question_id = quiz_id * 10
+                return {"questions": [{"id": question_id, "quiz_id": quiz_id}], "options": {question_id: [{"id": question_id + 1, "question_id": question_id}]}}
+            return load
+
+        await cache.get_quiz(1, content(1))
+        assert cache.cached_options(10) == [{"id": 11, "question_id": 10}]
+        # evicting quiz 1 forgets its question and option ids, expiring quiz 2 forgets its own
+        await cache.get_quiz(2, content(2))
+        assert (cache._quiz_by_question, cache._question_by_option) == ({20: 2}, {21: 20})
+        now[0] = 5
+        assert cache.cached_options(20) is None
+        assert (cache._quiz_by_question, cache._question_by_option) == ({}, {})
+    asyncio.run(_run())
@@ -0,0 +1,66 @@
+"""
+    Tests for read/write splitting, using two SQLite files as the primary and its replica
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from src.core.replicas import ReplicaRouter
+from src.repositories.question_repository import QuestionRepository
+from src.api.schemas.question_schema import QuestionCreate, QuestionUpdate
+
+def question(text: str) -> QuestionCreate:
+    return QuestionCreate(question=text, marks=1, level="low", correctAnswer="a", quiz_id=1, type="mc")
+
+@pytest.fixture
+def engines(make_database) -> list:
+    """A primary and two replica database files, each holding a different question 1"""
+    engines = []
+    for name in ("primary", "replica1", "replica2"):
+        database = make_database(name)
+        database.run(lambda session: QuestionRepository(session).create_question(question(name)))
+        engines.append(database.engine)
+    return engines
+
+def test_reads_go_to_the_replica_until_the_request_writes(engines):
+    primary, replica, _ = engines
+
+    async def _run():
+        async with AsyncSession(primary) as db, AsyncSession(replica) as read_db:
+            repo = QuestionRepository(db, read_db)
+            assert (await repo.get_question_by_id(1))["question"] == "replica1"
+            await repo.update_question(1, QuestionUpdate(question="updated", marks=1, level="low", correctAnswer="a", quiz_id=1, type="mc"))
+            # the replica hasn't caught up, the request reads its own write from the primary
+            assert (await repo.get_question_by_id(1))["question"] == "updated"
+            assert (await QuestionRepository(db, read_db).get_questions())[0]["question"] == "updated"
+    asyncio.run(_run())
+
+def test_round_robin_health_checks_and_stickiness(engines, tmp_path):
+    primary, replica1, replica2 = engines
+
+    async def _run():
+        broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica3.db'}")
+        router = ReplicaRouter(primary, [replica1, replica2, broken], sticky_seconds=0.2)
+        try:
+            assert [router.engine_for_read() for _ in range(3)] == [replica1, replica2, broken]
+            health = await router.check_health()
+            assert list(health.values()) == [True, True, False]
+            reads = [router.engine_for_read() for _ in range(4)]
+            assert reads[0] is not reads[1] and reads[:2] == reads[2:] and set(reads) == {replica1, replica2}
+
+            router.record_write("client-a")
+            assert router.engine_for_read("client-a") is primary
+            assert router.engine_for_read("client-b") is not primary
+            async with router.session(router.engine_for_read("client-b")) as read_db:
+                assert (await QuestionRepository(read_db).get_question_by_id(1))["question"] in ("replica1", "replica2")
+            await asyncio.sleep(0.25)
+            assert router.engine_for_read("client-a") is not primary
+            assert router.stats()["sticky_reads"] == 1
+
+            router.healthy = {engine: False for engine in router.replicas}
+            assert router.engine_for_read() is primary
+        finally:
+            await broken.dispose()
+    asyncio.run(_run())
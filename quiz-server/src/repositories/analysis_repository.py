@@ -4,48 +4,68 @@
 """
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import select, insert
-from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete
 
+from .base_repository import BaseRepository
 from ..models.analyses_model import analyses_table
+from ..models.question_model import questions_table
 from ..api.schemas.analysis_schema import AnalysisCreate
 
-class AnalysisRepository:
-    def __init__(self, db: Session) -> None:
-        self.db = db
+class AnalysisRepository(BaseRepository):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None) -> None:
+        super().__init__(db, read_db)
 
     async def create_analysis(self, analysis_data: AnalysisCreate):
         """Creates a new analysis record"""
-        def _create_analysis_sync():
-            stmt = insert(analyses_table).values(
-                user_id = analysis_data.user_id,
-                question_id = analysis_data.question_id,
-                analysis = analysis_data.analysis
-            )
+        values = {
+            "user_id": analysis_data.user_id,
+            "question_id": analysis_data.question_id,
+            "analysis": analysis_data.analysis
+        }
 
-            result = self.db.execute(stmt)
-            self.db.commit()
+        return await self.insert_returning(analyses_table, values)
 
-            created_analysis_row = self.db.execute(
-                select(analyses_table).where(analyses_table.c.id == result.lastrowid)
-            ).first()
+    async def create_analyses(self, analyses_data: List[AnalysisCreate]) -> int:
+        """Creates many analysis records with a single multi-row insert, returns how many were written"""
+        values = [
+            {
+                "user_id": analysis_data.user_id,
+                "question_id": analysis_data.question_id,
+                "analysis": analysis_data.analysis
+            }
+            for analysis_data in analyses_data
+        ]
+        await self.insert_many(analyses_table, values)
+        return len(values)
 
-            return created_analysis_row._asdict() if created_analysis_row else None
-        return await run_in_threadpool(_create_analysis_sync)
+    async def replace_quiz_analyses(self, quiz_id: int, analyses_data: List[AnalysisCreate], user_id: Optional[int] = None) -> int:
+        """
+            Replaces the analyses of a quiz's questions (optionally one user's) with new ones: the old rows are
+            deleted and the new ones inserted in the same transaction, so running an analysis again (a retried or
+            requeued job) never leaves duplicates. Returns how many were written
+        """
+        stmt = delete(analyses_table).where(
+            analyses_table.c.question_id.in_(select(questions_table.c.id).where(questions_table.c.quiz_id == quiz_id))
+        )
+        if user_id is not None:
+            stmt = stmt.where(analyses_table.c.user_id == user_id)
+        try:
+            await self.db.execute(stmt)
+            if analyses_data:
+                return await self.create_analyses(analyses_data)
+            await self.commit()
+            return 0
+        except Exception:
+            await self.rollback()
+            raise
 
     async def get_analysis_by_id(self, id: int) -> Optional[Dict[str, Any]]:
         """Retrieves an analysis by id"""
-        def _get_analysis_by_id_sync():
-            stmt = select(analyses_table).where(analyses_table.c.id == id)
-            analysis_row = self.db.execute(stmt).first()
-            return analysis_row._asdict() if analysis_row else None
-        return await run_in_threadpool(_get_analysis_by_id_sync)
-
-    async def get_analyses_by_user_id(self, id: int, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
-        """Retrieves all analyses for a user"""
-        def _get_analyses_by_user_id_sync():
-            stmt = select(analyses_table).where(analyses_table.c.user_id == id).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_analyses_by_user_id_sync)
\ No newline at end of file
+        stmt = select(analyses_table).where(analyses_table.c.id == id)
+        return await self.fetch_one(stmt)
+
+    async def get_analyses_by_user_id(self, id: int, skip: int=0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves all analyses for a user, paged by id (cursor) or offset"""
+        stmt = select(analyses_table).where(analyses_table.c.user_id == id)
+        return await self.fetch_all(self.paginate(stmt, [analyses_table.c.id], skip, limit, cursor))
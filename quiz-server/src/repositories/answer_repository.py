@@ -3,136 +3,264 @@
     Contains all the concrete implementations for answer_service functions
 """
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import select, insert, update, delete
-from starlette.concurrency import run_in_threadpool
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Mapping, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, delete, String, type_coerce
 
-from ..models.answers_model import answers_table
-from ..models.question_model import questions_table
+from .base_repository import BaseRepository
+from ..models.answers_model import answers_table, utc_now
+from ..models.question_model import questions_table, Type
+from ..models.user_model import users_table
 from ..api.schemas.answer_schema import AnswerCreate
+from ..api.schemas.export_schema import ExportFilters
 
-class AnswerRepository:
-    def __init__(self, db: Session):
-        self.db = db
+# ids per UPDATE ... WHERE id IN (...) when marks are set in bulk, well under SQLite's and MySQL's limits
+MARKS_UPDATE_CHUNK_SIZE = 5000
 
-    async def create_answer(self, answer_data: AnswerCreate):
+class AnswerRepository(BaseRepository):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
+        super().__init__(db, read_db)
+
+    async def create_answer(self, answer_data: AnswerCreate, marks: Optional[int] = None):
         """
-        Creates a new answer record
+        Creates a new answer record, with its marks if it was graded on submission
         """
+        values = {
+            "question_id": answer_data.question_id,
+            "user_id": answer_data.user_id,
+            "quiz_id": answer_data.quiz_id,
+            "answer": answer_data.answer,
+            "marksAchieved": marks,
+            "created_at": utc_now()
+        }
 
-        def _create_answer_sync():
-            stmt = insert(answers_table).values(
-                question_id = answer_data.question_id,
-                user_id = answer_data.user_id,
-                quiz_id = answer_data.quiz_id,
-                answer = answer_data.answer
-            )
-
-            result = self.db.execute(stmt)
-            self.db.commit()
+        return await self.insert_returning(answers_table, values)
 
-            created_answer_row = self.db.execute(
-                select(answers_table).where(answers_table.c.id == result.lastrowid)
-            ).first()
+    async def create_answers(self, answers_data: List[AnswerCreate], marks: Optional[List[Optional[int]]] = None) -> List[Dict[str, Any]]:
+        """
+        Creates many answer records for one attempt with a single multi-row insert
+        Expects every answer to share the same user and quiz, with no question repeated
+        marks holds each answer's marks if they were graded on submission
+        Return:
+            List[Dict[str, Any]]: The new rows in the order given
+        """
+        created_at = utc_now()
+        marks = marks if marks is not None else [None] * len(answers_data)
+        values = [
+            {
+                "question_id": answer_data.question_id,
+                "user_id": answer_data.user_id,
+                "quiz_id": answer_data.quiz_id,
+                "answer": answer_data.answer,
+                "marksAchieved": answer_marks,
+                "created_at": created_at
+            }
+            for answer_data, answer_marks in zip(answers_data, marks)
+        ]
+        created_rows = await self.insert_many(answers_table, values)
+        if created_rows is None:
+            # no RETURNING for multi-row inserts, read the ids back (inside the caller's transaction)
+            user_id, quiz_id = values[0]["user_id"], values[0]["quiz_id"]
+            stmt = select(answers_table).where(
+                (answers_table.c.user_id == user_id)
+                & (answers_table.c.quiz_id == quiz_id)
+                & (answers_table.c.question_id.in_([v["question_id"] for v in values]))
+            ).order_by(answers_table.c.id.desc())
+            created_rows = await self.fetch_all(stmt)
 
-            return created_answer_row._asdict() if created_answer_row else None
-        return await run_in_threadpool(_create_answer_sync)
+        # match rows back to the input by question, newest first in case the attempt was submitted before
+        latest: Dict[int, Dict[str, Any]] = {}
+        for row in sorted(created_rows, key=lambda r: r["id"], reverse=True):
+            latest.setdefault(row["question_id"], row)
+        return [latest[v["question_id"]] for v in values]
 
     async def get_answer_by_id(self, id: int) -> Optional[Dict[str, Any]]:
         """
             Retrieves an answer by ID
         """
-
-        def _get_answer_by_id_sync():
-            stmt = select(answers_table).where(answers_table.c.id == id)
-            answer_row = self.db.execute(stmt).first()
-            return answer_row._asdict() if answer_row else None
-        return await run_in_threadpool(_get_answer_by_id_sync)
+        stmt = select(answers_table).where(answers_table.c.id == id)
+        return await self.fetch_one(stmt)
 
     async def get_answers_by_user_id(self, id: int, skip: int = 0, limit: int=10) -> List[Dict[str, Any]]:
         """
         Retrieves answers by user id
         """
-        def _get_answers_by_user_id_sync():
-            stmt = select(answers_table, questions_table.c.question).where(answers_table.c.user_id == id).join(questions_table, answers_table.c.question_id == questions_table.c.id).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_answers_by_user_id_sync)
+        stmt = select(answers_table, questions_table.c.question).where(answers_table.c.user_id == id).join(questions_table, answers_table.c.question_id == questions_table.c.id).offset(skip).limit(limit)
+        return await self.fetch_all(stmt)
 
     async def get_answers_by_user_and_quiz_id(self, user_id: int, quiz_id: int, skip: int = 0, limit: int=10) -> List[Dict[str, Any]]:
         """
         Retrieves answers by user id
         """
-        def _get_answers_by_user_id_sync():
-            stmt = select(
-                    answers_table.c.question_id,
-                    answers_table.c.user_id,
-                    answers_table.c.quiz_id,
-                    answers_table.c.answer,
-                    answers_table.c.marksAchieved.label('marks_achieved'),
-                    questions_table.c.question,
-                    questions_table.c.correctAnswer,
-                    questions_table.c.marks.label('total_marks')
-                ).where(
-                    (answers_table.c.user_id == user_id) & (answers_table.c.quiz_id == quiz_id)
-                ).join(
-                    questions_table,
-                    answers_table.c.question_id == questions_table.c.id
-                ).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_answers_by_user_id_sync)
-
-    async def get_answers_by_quiz_id(self, id:int, skip: int = 0, limit: int=10) -> List[Dict[str, Any]]:
-        """
-            Retrieves answers through the quiz_id
-        """
-        def _get_answers_by_quiz_id_sync():
-            stmt = select(answers_table, questions_table.c.question).where(answers_table.c.quiz_id == id).join(questions_table, answers_table.c.question_id == questions_table.c.id).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_answers_by_quiz_id_sync)
+        stmt = select(
+                answers_table.c.question_id,
+                answers_table.c.user_id,
+                answers_table.c.quiz_id,
+                answers_table.c.answer,
+                answers_table.c.marksAchieved.label('marks_achieved'),
+                questions_table.c.question,
+                questions_table.c.correctAnswer,
+                questions_table.c.marks.label('total_marks')
+            ).where(
+                (answers_table.c.user_id == user_id) & (answers_table.c.quiz_id == quiz_id)
+            ).join(
+                questions_table,
+                answers_table.c.question_id == questions_table.c.id
+            ).offset(skip).limit(limit)
+        return await self.fetch_all(stmt)
+
+    async def get_answers_by_quiz_id(self, id:int, skip: int = 0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+            Retrieves answers through the quiz_id, paged by answer id (cursor) or offset
+        """
+        stmt = select(answers_table, questions_table.c.question).where(answers_table.c.quiz_id == id).join(questions_table, answers_table.c.question_id == questions_table.c.id)
+        return await self.fetch_all(self.paginate(stmt, [answers_table.c.id], skip, limit, cursor))
 
     async def get_answers(self, skip: int = 0, limit = 10) -> List[Dict[str, Any]]:
         """Retrieves all answers"""
-        def _get_answers_sync():
-            stmt = select(answers_table).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_answers_sync)
+        stmt = select(answers_table).offset(skip).limit(limit)
+        return await self.fetch_all(stmt)
 
-    async def get_answers_with_questions(self, skip: int = 0, limit = 10) -> List[Dict[str, Any]]:
-        """Retrieves all answers"""
-        def _get_answers_sync():
-            stmt = select(
-                    answers_table.c.id,
-                    answers_table.c.question_id,
-                    answers_table.c.user_id,
-                    answers_table.c.quiz_id,
-                    answers_table.c.answer,
-                    questions_table.c.marks,
-                    answers_table.c.marksAchieved,
-                    questions_table.c.question,
-                    questions_table.c.correctAnswer,
-                    questions_table.c.type
-                ).join(
-                    questions_table,
-                    answers_table.c.question_id == questions_table.c.id
-                ).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_answers_sync)
+    async def get_answers_with_questions(self, skip: int = 0, limit = 10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves all answers, paged by answer id (cursor) or offset"""
+        stmt = select(
+                answers_table.c.id,
+                answers_table.c.question_id,
+                answers_table.c.user_id,
+                answers_table.c.quiz_id,
+                answers_table.c.answer,
+                questions_table.c.marks,
+                answers_table.c.marksAchieved,
+                questions_table.c.question,
+                questions_table.c.correctAnswer,
+                questions_table.c.type
+            ).join(
+                questions_table,
+                answers_table.c.question_id == questions_table.c.id
+            )
+        return await self.fetch_all(self.paginate(stmt, [answers_table.c.id], skip, limit, cursor))
+
+    async def get_quiz_answers_with_questions(self, quiz_id: int, user_id: Optional[int] = None, skip: int = 0, limit: Optional[int] = None) -> Dict[str, Tuple[Any, ...]]:
+        """
+        Retrieves every answer for a quiz joined with its question in one query (optionally for one user)
+        Used by the ML layer instead of querying user by user, limit None returns every answer
+        Returns the result by column for the DataPrepocessor
+        """
+        stmt = select(
+                answers_table.c.id.label("answer_id"),
+                answers_table.c.user_id,
+                answers_table.c.question_id,
+                answers_table.c.answer,
+                questions_table.c.question,
+                questions_table.c.correctAnswer.label("correct_answer")
+            ).join(
+                questions_table,
+                answers_table.c.question_id == questions_table.c.id
+            ).where(answers_table.c.quiz_id == quiz_id)
+        if user_id is not None:
+            stmt = stmt.where(answers_table.c.user_id == user_id)
+        stmt = stmt.order_by(answers_table.c.user_id, answers_table.c.id)
+        if limit is not None:
+            stmt = stmt.offset(skip).limit(limit)
+        return await self.fetch_columns(stmt)
+
+    async def get_answers_after(self, answer_id: int, limit: int = 10000) -> Dict[str, Tuple[Any, ...]]:
+        """
+        Retrieves the next batch of answers after an answer id, in id order, each joined with its question
+        Used to append new answers to the analytics snapshots without rescanning the table, so only the columns
+        that never change once an answer is written (no marksAchieved)
+        Returns the result by column, with level and type as their raw strings (no Enum per row)
+        """
+        stmt = select(
+                answers_table.c.id.label("answer_id"),
+                answers_table.c.user_id,
+                answers_table.c.quiz_id,
+                answers_table.c.question_id,
+                answers_table.c.answer,
+                answers_table.c.created_at,
+                questions_table.c.question,
+                questions_table.c.correctAnswer.label("correct_answer"),
+                questions_table.c.marks,
+                type_coerce(questions_table.c.level, String).label("level"),
+                type_coerce(questions_table.c.type, String).label("type")
+            ).join(
+                questions_table,
+                answers_table.c.question_id == questions_table.c.id
+            ).where(answers_table.c.id > answer_id).order_by(answers_table.c.id).limit(limit)
+        return await self.fetch_columns(stmt)
+
+    async def export_answers(self, filters: ExportFilters, batch_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+            Streams every answer matching the export filters in id order, in batches (see stream_all)
+            The date range applies to created_at, so answers stored before it existed only appear in unbounded exports
+        """
+        stmt = select(
+                answers_table.c.id,
+                answers_table.c.user_id,
+                users_table.c.school_id,
+                answers_table.c.quiz_id,
+                answers_table.c.question_id,
+                answers_table.c.answer,
+                answers_table.c.marksAchieved,
+                answers_table.c.created_at
+            ).join(
+                users_table,
+                answers_table.c.user_id == users_table.c.id
+            ).order_by(answers_table.c.id)
+        if filters.quiz_id is not None:
+            stmt = stmt.where(answers_table.c.quiz_id == filters.quiz_id)
+        if filters.school_id is not None:
+            stmt = stmt.where(users_table.c.school_id == filters.school_id)
+        if filters.start is not None:
+            stmt = stmt.where(answers_table.c.created_at >= filters.start)
+        if filters.end is not None:
+            stmt = stmt.where(answers_table.c.created_at < filters.end)
+        async for batch in self.stream_all(stmt, batch_size):
+            yield batch
+
+    async def get_quiz_answers_for_grading(self, quiz_id: int) -> Dict[str, Tuple[Any, ...]]:
+        """
+        Retrieves every answer to a quiz's automatically graded (mc/tf) questions with its correct answer and marks,
+        by column, with type as its raw string. Read on the primary inside the regrade's transaction
+        """
+        stmt = select(
+                answers_table.c.id.label("answer_id"),
+                answers_table.c.answer,
+                answers_table.c.marksAchieved.label("marks_achieved"),
+                questions_table.c.correctAnswer.label("correct_answer"),
+                type_coerce(questions_table.c.type, String).label("type"),
+                questions_table.c.marks
+            ).join(
+                questions_table,
+                answers_table.c.question_id == questions_table.c.id
+            ).where(
+                (answers_table.c.quiz_id == quiz_id) & (questions_table.c.type.in_([Type.mc, Type.tf]))
+            ).order_by(answers_table.c.id)
+        return await self.fetch_columns(stmt)
+
+    async def set_marks(self, answer_ids_by_marks: Mapping[int, Sequence[int]]) -> int:
+        """
+        Sets the marks of many answers with one UPDATE ... WHERE id IN (...) per marks value
+        (a quiz's graded answers score one of a handful of values), MARKS_UPDATE_CHUNK_SIZE ids at most per statement
+        Commits once, or not at all inside a UnitOfWork
+        Return:
+            int: The number of answers updated
+        """
+        updated = 0
+        try:
+            for marks, answer_ids in answer_ids_by_marks.items():
+                for start in range(0, len(answer_ids), MARKS_UPDATE_CHUNK_SIZE):
+                    chunk = list(answer_ids[start:start + MARKS_UPDATE_CHUNK_SIZE])
+                    result = await self.db.execute(
+                        update(answers_table).where(answers_table.c.id.in_(chunk)).values(marksAchieved=marks)
+                    )
+                    updated += result.rowcount
+            await self.commit()
+            return updated
+        except Exception:
+            await self.rollback()
+            raise
 
     async def allocate_marks_to_answer(self, id: int, marks: int) -> Optional[Dict[str, Any]]:
         """Allocate marks to a user's answer (basically updating their record)"""
-        def _allocate_marks_to_answer():
-            stmt = update(answers_table).where(answers_table.c.id == id).values(marksAchieved = marks)
-            result = self.db.execute(stmt)
-            self.db.commit()
-            answer_row = self.db.execute(
-                select(answers_table).where(answers_table.c.id == result.lastrowid)
-            ).first()
-            return answer_row._asdict() if answer_row else None
-        return await run_in_threadpool(_allocate_marks_to_answer)
-
+        return await self.update_returning(answers_table, id, {"marksAchieved": marks})
@@ -0,0 +1,234 @@
+"""
+    Base Repository
+    Contains the shared async query helpers that every repository builds on
+"""
+
+from typing import Optional, List, Dict, Any, Sequence, Tuple, AsyncIterator
+import enum
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Table, Enum, Select, select, insert, update
+from sqlalchemy.engine import Result
+from sqlalchemy.sql import Executable, ColumnElement
+
+from src.utils.pagination import decode_cursor, keyset_after
+
+# session.info key set while a UnitOfWork owns the transaction
+UNIT_OF_WORK_KEY = "unit_of_work"
+# session.info key set once the session has committed a write, later reads in the request go to the primary
+PRIMARY_WRITE_KEY = "primary_write"
+# rows read per round of fetch_columns, the event loop serves other requests between rounds
+FETCH_PARTITION_SIZE = 2000
+
+class BaseRepository:
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None) -> None:
+        """
+        Initializes the repository with an asynchronous database session.
+        Queries are awaited directly on the async driver, so concurrency is bounded by the connection pool
+        db is the primary (writes), read_db a replica session for reads (defaults to db, see core/replicas.py)
+        """
+        self.db = db
+        self.read_db = read_db if read_db is not None else db
+
+    @property
+    def reader(self) -> AsyncSession:
+        """
+            Session for reads: the replica, unless this session has written (uncommitted work, an open
+            UnitOfWork or a committed write earlier in the request), so a request always reads its own writes
+        """
+        if self.read_db is self.db or self.db.in_transaction() or self.in_unit_of_work or self.db.info.get(PRIMARY_WRITE_KEY):
+            return self.db
+        return self.read_db
+
+    async def fetch_one(self, stmt: Executable) -> Optional[Dict[str, Any]]:
+        """
+            Executes a statement and returns the first row
+            Return:
+                Dict[str, Any]: The first row
+                None: Return null if no row matched
+        """
+        result = await self.reader.execute(stmt)
+        row = result.first()
+        return row._asdict() if row else None
+
+    async def fetch_all(self, stmt: Executable) -> List[Dict[str, Any]]:
+        """Executes a statement and returns every row as a dict"""
+        result = await self.reader.execute(stmt)
+        return [row._asdict() for row in result.fetchall()]
+
+    async def fetch_columns(self, stmt: Executable, primary: bool = False) -> Dict[str, Tuple[Any, ...]]:
+        """
+            Executes a statement and returns its result column by column, e.g. for building a DataFrame
+            Rows are fetched and split into columns a partition at a time, so a large result doesn't hold the
+            event loop while it is read
+            primary reads on the primary whatever the session did before, for reads a write depends on
+            Return:
+                Dict[str, Tuple[Any, ...]]: Each column label mapped to its values in row order
+        """
+        result = await (self.db if primary else self.reader).stream(stmt.execution_options(yield_per=FETCH_PARTITION_SIZE)) # type: ignore[attr-defined]
+        keys = list(result.keys())
+        columns: List[List[Any]] = [[] for _ in keys]
+        async for partition in result.partitions():
+            for column, values in zip(columns, zip(*partition)):
+                column.extend(values)
+        return {key: tuple(column) for key, column in zip(keys, columns)}
+
+    async def stream_all(self, stmt: Executable, batch_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+            Executes a statement on a server-side cursor (stream_results) and yields its rows in batches of dicts,
+            so memory stays at one batch however many rows match
+            The session must stay open while the batches are consumed
+        """
+        result = await self.reader.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield [row._asdict() for row in partition]
+
+    def paginate(self, stmt: Select[Any], keys: Sequence[ColumnElement[Any]], skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> Select[Any]:
+        """
+            Orders a list query by its sort keys and applies one page
+            With a cursor the page starts right after the cursor's key (keyset), otherwise it falls back to OFFSET
+            keys must be unique together (end with the primary key) and their labels must match the cursor's key names
+        """
+        stmt = stmt.order_by(*keys).limit(limit)
+        if cursor is None:
+            return stmt.offset(skip)
+        values = decode_cursor(cursor, [key.key for key in keys]) # type: ignore[attr-defined]
+        return stmt.where(keyset_after(keys, values))
+
+    @property
+    def in_unit_of_work(self) -> bool:
+        """True while a UnitOfWork owns the session's transaction"""
+        return bool(self.db.info.get(UNIT_OF_WORK_KEY))
+
+    async def commit(self) -> None:
+        """Commits the session, unless a UnitOfWork will commit it once at the end"""
+        if not self.in_unit_of_work:
+            await self.db.commit()
+            self.db.info[PRIMARY_WRITE_KEY] = True
+
+    async def rollback(self) -> None:
+        """Rolls the session back, unless a UnitOfWork will roll it back on exit"""
+        if not self.in_unit_of_work:
+            await self.db.rollback()
+
+    async def execute_write(self, stmt: Executable) -> Result[Any]:
+        """
+            Executes a write statement and commits it
+            Rolls the session back if the write fails so the session stays usable
+        """
+        try:
+            result = await self.db.execute(stmt)
+            await self.commit()
+            return result
+        except Exception:
+            await self.rollback()
+            raise
+
+    def supports_returning(self, kind: str) -> bool:
+        """
+            Checks if the session's dialect supports RETURNING for a write
+            kind is one of 'insert', 'update' or 'delete'
+        """
+        dialect = self.db.get_bind().dialect
+        return bool(getattr(dialect, f"{kind}_returning", False))
+
+    async def insert_returning(self, table: Table, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+            Inserts a row and returns the persisted row without a follow-up SELECT
+            Uses INSERT ... RETURNING where the dialect supports it (SQLite, MariaDB, Postgres),
+            otherwise rebuilds the row from the bound values plus the generated primary key (MySQL)
+            Return:
+                Dict[str, Any]: The new row
+                None: Return null if no row created
+        """
+        stmt = insert(table).values(**values)
+        if self.supports_returning("insert"):
+            result = await self.execute_write(stmt.returning(*table.c))
+            row = result.first()
+            return row._asdict() if row else None
+
+        result = await self.execute_write(stmt)
+        primary_key = result.inserted_primary_key
+        if primary_key is None:
+            return None
+        return build_inserted_row(table, values, primary_key)
+
+    async def insert_many(self, table: Table, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]] | None:
+        """
+            Inserts many rows with one executemany-style multi-row INSERT
+            Return:
+                List[Dict[str, Any]]: The new rows, where the dialect supports RETURNING
+                    (in no guaranteed order, callers match them back on their own keys)
+                None: The dialect can't return rows from a multi-row insert (MySQL), callers read them back
+        """
+        if not rows:
+            return []
+        try:
+            if self.supports_returning("insert"):
+                stmt = insert(table).returning(*table.c)
+                result = await self.db.execute(stmt, rows)
+                created_rows = [row._asdict() for row in result.fetchall()]
+            else:
+                await self.db.execute(insert(table), rows)
+                created_rows = None
+            await self.commit()
+            return created_rows
+        except Exception:
+            await self.rollback()
+            raise
+
+    async def update_returning(self, table: Table, id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+            Updates a row by its id and returns the persisted row
+            Uses UPDATE ... RETURNING where the dialect supports it, otherwise reads the row back
+            inside the same transaction before committing (skipped if nothing matched)
+            Return:
+                Dict[str, Any]: The updated row
+                None: Return null if no row matched
+        """
+        stmt = update(table).where(table.c.id == id).values(**values)
+        try:
+            if self.supports_returning("update"):
+                result = await self.db.execute(stmt.returning(*table.c))
+                row = result.first()
+                updated_row = row._asdict() if row else None
+            else:
+                result = await self.db.execute(stmt)
+                updated_row = None
+                if result.rowcount != 0:
+                    # read back on the primary, in the write's own transaction
+                    row = (await self.db.execute(select(table).where(table.c.id == id))).first()
+                    updated_row = row._asdict() if row else None
+            await self.commit()
+            return updated_row
+        except Exception:
+            await self.rollback()
+            raise
+
+def build_inserted_row(table: Table, values: Dict[str, Any], primary_key: Any) -> Dict[str, Any]:
+    """
+        Rebuilds an inserted row from its bound values and generated primary key
+        Columns that were not bound fall back to their scalar Python default (server defaults are unknown here, so None)
+        Enum columns are coerced to their enum class so the row matches what a SELECT returns
+    """
+    pk_values = dict(zip([c.name for c in table.primary_key.columns], primary_key))
+    row: Dict[str, Any] = {}
+    for column in table.c:
+        if column.name in values:
+            value = values[column.name]
+        elif column.name in pk_values:
+            value = pk_values[column.name]
+        elif column.default is not None and column.default.is_scalar:
+            value = column.default.arg # type: ignore[union-attr]
+        else:
+            value = None
+        row[column.name] = _coerce_enum(column.type, value)
+    return row
+
+def _coerce_enum(column_type: Any, value: Any) -> Any:
+    """Converts a bound string into the enum member a SELECT would return"""
+    enum_class = getattr(column_type, "enum_class", None)
+    if not isinstance(column_type, Enum) or enum_class is None or value is None or isinstance(value, enum.Enum):
+        return value
+    if value in enum_class.__members__:
+        return enum_class[value]
+    return enum_class(value)
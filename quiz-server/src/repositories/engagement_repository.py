@@ -0,0 +1,91 @@
+"""
+    Repository for Engagement
+    Contains all the concrete implementations for the stored time-on-task metrics
+"""
+
+from typing import Optional, List, Dict, Any, Tuple, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete, func, exists, tuple_, String, type_coerce
+
+from .base_repository import BaseRepository
+from ..models.engagement_model import engagement_table, engagement_applied_logs_table
+from ..models.logs_model import logs_table
+from ..models.question_model import questions_table
+
+STATE_SELECT = [
+    engagement_table.c.user_id,
+    engagement_table.c.question_id,
+    engagement_table.c.quiz_id,
+    engagement_table.c.events,
+    engagement_table.c.active_seconds,
+    engagement_table.c.idle_seconds,
+    engagement_table.c.pause_count,
+    engagement_table.c.started_at,
+    engagement_table.c.completed_at,
+    type_coerce(engagement_table.c.last_action, String).label("last_action"),
+    engagement_table.c.last_time
+]
+
+class EngagementRepository(BaseRepository):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None) -> None:
+        """
+            The refresh reads on the primary: the events folded in and the state they are folded into must be
+            the committed ones. The metrics served to the routes (get_quiz_states) are read from read_db
+        """
+        super().__init__(db, read_db)
+
+    async def get_watermark(self) -> int:
+        """The highest log id folded into the engagement metrics, 0 before the first"""
+        result = await self.db.execute(select(func.coalesce(func.max(engagement_applied_logs_table.c.log_id), 0)))
+        return int(result.scalar_one())
+
+    async def get_unapplied_logs(self, after: int, limit: int = 10000) -> Dict[str, Tuple[Any, ...]]:
+        """
+            Retrieves the next batch of log events above a log id that haven't been folded in yet, in id order,
+            with each event's quiz. Returns the result by column for the DataPrepocessor
+        """
+        stmt = select(
+                logs_table.c.id.label("log_id"),
+                logs_table.c.user_id,
+                logs_table.c.question_id,
+                questions_table.c.quiz_id,
+                type_coerce(logs_table.c.action, String).label("action"),
+                logs_table.c.time
+            ).join(
+                questions_table,
+                logs_table.c.question_id == questions_table.c.id
+            ).where(
+                (logs_table.c.id > after)
+                & ~exists().where(engagement_applied_logs_table.c.log_id == logs_table.c.id)
+            ).order_by(logs_table.c.id).limit(limit)
+        return await self.fetch_columns(stmt, primary=True)
+
+    async def get_states(self, pairs: Sequence[Tuple[int, int]]) -> Dict[str, Tuple[Any, ...]]:
+        """Retrieves the stored metrics of (user_id, question_id) pairs, by column"""
+        stmt = select(*STATE_SELECT).where(tuple_(engagement_table.c.user_id, engagement_table.c.question_id).in_(list(pairs)))
+        return await self.fetch_columns(stmt, primary=True)
+
+    async def get_quiz_states(self, quiz_id: int, user_id: Optional[int] = None) -> Dict[str, Tuple[Any, ...]]:
+        """Retrieves the stored metrics of a quiz (optionally one user's), by column"""
+        stmt = select(*STATE_SELECT).where(engagement_table.c.quiz_id == quiz_id)
+        if user_id is not None:
+            stmt = stmt.where(engagement_table.c.user_id == user_id)
+        return await self.fetch_columns(stmt)
+
+    async def save_states(self, log_ids: Sequence[int], states: List[Dict[str, Any]], prune_below: int) -> None:
+        """
+            Marks a batch of log events as folded in and replaces the metrics of the pairs they touched, in one
+            transaction, and forgets the applied ids at or below prune_below (they are never re-read)
+            The log ids are the primary key, so a process folding events another one already folded (e.g. two
+            workers refreshing at once) fails with an IntegrityError and rolls back, instead of counting them twice
+        """
+        try:
+            await self.db.execute(insert(engagement_applied_logs_table), [{"log_id": log_id} for log_id in log_ids])
+            pairs = [(state["user_id"], state["question_id"]) for state in states]
+            await self.db.execute(delete(engagement_table).where(tuple_(engagement_table.c.user_id, engagement_table.c.question_id).in_(pairs)))
+            await self.db.execute(insert(engagement_table), states)
+            await self.db.execute(delete(engagement_applied_logs_table).where(engagement_applied_logs_table.c.log_id <= prune_below))
+            await self.commit()
+        except Exception:
+            await self.rollback()
+            raise
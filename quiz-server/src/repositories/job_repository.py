@@ -0,0 +1,72 @@
+"""
+    Repository for Jobs
+    Contains all the concrete implementations for the job queue's persisted state
+"""
+
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+
+from .base_repository import BaseRepository
+from ..models.jobs_model import jobs_table, JobStatus
+from ..models.answers_model import utc_now
+
+class JobRepository(BaseRepository):
+    def __init__(self, db: AsyncSession) -> None:
+        """Jobs are read on the primary, their state changes while clients poll them"""
+        super().__init__(db)
+
+    async def create_job(self, kind: str, params: Dict[str, Any], priority: int = 0) -> Optional[Dict[str, Any]]:
+        """Creates a queued job"""
+        values = {
+            "kind": kind,
+            "params": params,
+            "priority": priority,
+            "status": JobStatus.queued,
+            "created_at": utc_now()
+        }
+
+        return await self.insert_returning(jobs_table, values)
+
+    async def get_job_by_id(self, id: int) -> Optional[Dict[str, Any]]:
+        """Retrieves a job by id"""
+        stmt = select(jobs_table).where(jobs_table.c.id == id)
+        return await self.fetch_one(stmt)
+
+    async def get_queued_jobs(self) -> List[Dict[str, Any]]:
+        """Retrieves the queued jobs in id order"""
+        stmt = select(jobs_table).where(jobs_table.c.status == JobStatus.queued).order_by(jobs_table.c.id)
+        return await self.fetch_all(stmt)
+
+    async def claim_job(self, id: int) -> Optional[Dict[str, Any]]:
+        """
+            Moves a queued job to running, the status check makes the claim atomic across workers and processes
+            Return:
+                Dict[str, Any]: The claimed job
+                None: Return null if the job doesn't exist or isn't queued any more
+        """
+        result = await self.execute_write(
+            update(jobs_table).where(
+                (jobs_table.c.id == id) & (jobs_table.c.status == JobStatus.queued)
+            ).values(status=JobStatus.running, started_at=utc_now())
+        )
+        if result.rowcount == 0:
+            return None
+        return await self.get_job_by_id(id)
+
+    async def mark_completed(self, id: int, result: Any) -> Optional[Dict[str, Any]]:
+        """Stores a job's result and moves it to completed"""
+        return await self.update_returning(jobs_table, id, {"status": JobStatus.completed, "result": result, "finished_at": utc_now()})
+
+    async def mark_failed(self, id: int, error: str) -> Optional[Dict[str, Any]]:
+        """Stores why a job failed and moves it to failed"""
+        return await self.update_returning(jobs_table, id, {"status": JobStatus.failed, "error": error, "finished_at": utc_now()})
+
+    async def requeue_stale_jobs(self, started_before: datetime) -> None:
+        """Moves jobs that started running before a time back to queued (their process stopped mid-run)"""
+        await self.execute_write(
+            update(jobs_table).where(
+                (jobs_table.c.status == JobStatus.running) & (jobs_table.c.started_at < started_before)
+            ).values(status=JobStatus.queued, started_at=None)
+        )
@@ -3,69 +3,131 @@
     Contains all the concrete implementations for log_service functions
 """
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import select, insert, update, Select
-from starlette.concurrency import run_in_threadpool
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, Select, String, type_coerce
 
+from .base_repository import BaseRepository
 from ..models.logs_model import logs_table
 from ..models.question_model import questions_table
+from ..models.user_model import users_table
 from ..api.schemas.log_schema import LogCreate, LogUpdate
+from ..api.schemas.export_schema import ExportFilters
 
-class LogRepository:
-    def __init__(self, db: Session) -> None:
-        self.db = db
+class LogRepository(BaseRepository):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None) -> None:
+        super().__init__(db, read_db)
 
     async def create_log(self, log_data: LogCreate):
         """Creates a new log record"""
-        def _create_log_sync():
-            stmt = insert(logs_table).values(
-                action = log_data.action,
-                time = log_data.time,
-                user_id = log_data.user_id,
-                question_id = log_data.question_id
-            )
+        values = {
+            "action": log_data.action,
+            "time": log_data.time,
+            "user_id": log_data.user_id,
+            "question_id": log_data.question_id
+        }
 
-            result = self.db.execute(stmt)
-            self.db.commit()
+        return await self.insert_returning(logs_table, values)
 
-            created_log_row = self.db.execute(
-                select(logs_table).where(logs_table.c.id == result.lastrowid)
-            ).first()
-
-            return created_log_row._asdict() if created_log_row else None
-        return await run_in_threadpool(_create_log_sync)
+    async def create_logs(self, logs_data: List[LogCreate]) -> int:
+        """Creates many log records with a single multi-row insert, returns how many were written"""
+        values = [
+            {
+                "action": log_data.action,
+                "time": log_data.time,
+                "user_id": log_data.user_id,
+                "question_id": log_data.question_id
+            }
+            for log_data in logs_data
+        ]
+        await self.insert_many(logs_table, values)
+        return len(values)
 
     async def get_log_by_id(self, id: int) -> Optional[Dict[str, Any]]:
         """Retrieves a log by its id"""
-        def _get_log_by_sync():
-            stmt = select(logs_table).where(logs_table.c.id == id)
-            log_row = self.db.execute(stmt).first()
-            return log_row._asdict() if log_row else None
-        return await run_in_threadpool(_get_log_by_sync)
+        stmt = select(logs_table).where(logs_table.c.id == id)
+        return await self.fetch_one(stmt)
+
+    async def get_logs_by_user_id(self, id: int, question_id: Optional[int] = None, skip: int=0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves all user logs in time order, paged by (time, id) (cursor) or offset"""
+        stmt: Select[Any] = select(logs_table, questions_table.c.question).join(questions_table, logs_table.c.question_id == questions_table.c.id)
+        if question_id is not None:
+            stmt = stmt.where((logs_table.c.user_id == id) & (logs_table.c.question_id == question_id))
+        else:
+            stmt = stmt.where(logs_table.c.user_id == id)
+        return await self.fetch_all(self.paginate(stmt, [logs_table.c.time, logs_table.c.id], skip, limit, cursor))
+
+    async def get_logs_by_quiz_id(self, quiz_id: int, user_id: Optional[int] = None) -> Dict[str, Tuple[Any, ...]]:
+        """
+        Retrieves every log event for a quiz's questions in one query (optionally for one user), in time order
+        Used by the ML layer instead of querying user by user and question by question
+        Returns the result by column for the DataPrepocessor, with action as its raw string (no Enum per row)
+        """
+        stmt = select(
+                logs_table.c.id.label("log_id"),
+                logs_table.c.user_id,
+                logs_table.c.question_id,
+                type_coerce(logs_table.c.action, String).label("action"),
+                logs_table.c.time
+            ).join(
+                questions_table,
+                logs_table.c.question_id == questions_table.c.id
+            ).where(questions_table.c.quiz_id == quiz_id)
+        if user_id is not None:
+            stmt = stmt.where(logs_table.c.user_id == user_id)
+        return await self.fetch_columns(stmt.order_by(logs_table.c.time, logs_table.c.id))
 
-    async def get_logs_by_user_id(self, id: int, question_id: Optional[int] = None, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
-        """Retrieves all user logs"""
-        def _get_logs_by_user_id_sync():
-            stmt: Select[Any]
-            print(f"question_id: {question_id}")
-            if question_id is not None:
-                stmt = select(logs_table, questions_table.c.question).where((logs_table.c.user_id == id) & (logs_table.c.question_id == question_id)).offset(skip).limit(limit)
-            else:
-                stmt = select(logs_table, questions_table.c.question).where(logs_table.c.user_id == id).offset(skip).limit(limit)
-            print(f"stmt: {stmt}")
-            results = self.db.execute(stmt).fetchall()
-            print(f"results: {results}")
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_logs_by_user_id_sync)
+    async def get_logs_after(self, log_id: int, limit: int = 10000) -> Dict[str, Tuple[Any, ...]]:
+        """
+        Retrieves the next batch of log events after a log id, in id order, with each event's quiz
+        Used to fold new events into the engagement metrics without rescanning the table
+        Returns the result by column for the DataPrepocessor
+        """
+        stmt = select(
+                logs_table.c.id.label("log_id"),
+                logs_table.c.user_id,
+                logs_table.c.question_id,
+                questions_table.c.quiz_id,
+                type_coerce(logs_table.c.action, String).label("action"),
+                logs_table.c.time
+            ).join(
+                questions_table,
+                logs_table.c.question_id == questions_table.c.id
+            ).where(logs_table.c.id > log_id).order_by(logs_table.c.id).limit(limit)
+        return await self.fetch_columns(stmt)
+
+    async def export_logs(self, filters: ExportFilters, batch_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Streams every log event matching the export filters (date range on time) in id order, in batches (see stream_all)"""
+        stmt = select(
+                logs_table.c.id,
+                logs_table.c.user_id,
+                users_table.c.school_id,
+                questions_table.c.quiz_id,
+                logs_table.c.question_id,
+                type_coerce(logs_table.c.action, String).label("action"),
+                logs_table.c.time
+            ).join(
+                questions_table,
+                logs_table.c.question_id == questions_table.c.id
+            ).join(
+                users_table,
+                logs_table.c.user_id == users_table.c.id
+            ).order_by(logs_table.c.id)
+        if filters.quiz_id is not None:
+            stmt = stmt.where(questions_table.c.quiz_id == filters.quiz_id)
+        if filters.school_id is not None:
+            stmt = stmt.where(users_table.c.school_id == filters.school_id)
+        if filters.start is not None:
+            stmt = stmt.where(logs_table.c.time >= filters.start)
+        if filters.end is not None:
+            stmt = stmt.where(logs_table.c.time < filters.end)
+        async for batch in self.stream_all(stmt, batch_size):
+            yield batch
 
-    async def get_logs(self, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
-        """Retrieves all logs"""
-        def _get_logs_sync():
-            stmt = select(logs_table).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_logs_sync)
+    async def get_logs(self, skip: int=0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves all logs, paged by log id (cursor) or offset"""
+        stmt = select(logs_table)
+        return await self.fetch_all(self.paginate(stmt, [logs_table.c.id], skip, limit, cursor))
 
     async def update_log(self, id: int, log_data: LogUpdate) -> Dict[str, Any] | None:
         """
@@ -74,22 +136,10 @@ class LogRepository:
                 Dict[str, Any]: The updated row
                 None: Return null if no row updated
         """
-        def _update_log_sync():
-            # create a dict of non-None values from log data
-            update_values = {k: v for k, v in log_data.model_dump(exclude_unset=True).items() if v is not None}
-
-            if not update_values:
-                log_row = self.db.execute(select(logs_table).where(logs_table.c.id == id)).first()
-                return log_row._asdict() if log_row else None
-
-            stmt = update(logs_table).where(logs_table.c.id == id).values(**update_values)
-            self.db.execute(stmt)
-            self.db.commit()
+        # create a dict of non-None values from log data
+        update_values = {k: v for k, v in log_data.model_dump(exclude_unset=True).items() if v is not None}
 
-            # fetch the updated log to return its current data
-            updated_log_row = self.db.execute(
-                select(logs_table).where(logs_table.c.id == id)
-            ).first()
-            return updated_log_row._asdict() if updated_log_row else None
+        if not update_values:
+            return await self.fetch_one(select(logs_table).where(logs_table.c.id == id))
 
-        return await run_in_threadpool(_update_log_sync)
\ No newline at end of file
+        return await self.update_returning(logs_table, id, update_values)
@@ -4,75 +4,63 @@
 """
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert, update, Select
-from starlette.concurrency import run_in_threadpool
 
+from .base_repository import BaseRepository
+from ..core.quiz_content_cache import quiz_content_cache
+from ..core.resource_versions import resource_versions
 from ..models.qoptions_model import qoptions_table
 from ..models.question_model import questions_table
 from ..api.schemas.qoptions_schema import QOptionsCreate, QOptionsUpdate
 
-class QOptionsRepository:
-    def __init__(self, db: Session) -> None:
-        self.db = db
+class QOptionsRepository(BaseRepository):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None) -> None:
+        super().__init__(db, read_db)
 
     async def create_qoption(self, qopt_data: QOptionsCreate):
         """
             Creates a new a question option (qoption)
         """
-        def _create_qoption_sync():
-            stmt = insert(qoptions_table).values(
-                option = qopt_data.option,
-                question_id = qopt_data.question_id
-            )
+        values = {
+            "option": qopt_data.option,
+            "question_id": qopt_data.question_id
+        }
 
-            result = self.db.execute(stmt)
-            self.db.commit()
-
-            created_qopt_row = self.db.execute(
-                select(qoptions_table).where(qoptions_table.c.id == result.lastrowid)
-            ).first()
-
-            return created_qopt_row._asdict() if created_qopt_row else None
-        return await run_in_threadpool(_create_qoption_sync)
+        qoption = await self.insert_returning(qoptions_table, values)
+        resource_versions.bump(qoptions_table.name)
+        quiz_content_cache.invalidate_question(qopt_data.question_id)
+        return qoption
 
     async def get_qoption_by_id(self, id: int) -> Dict[str, Any] | None:
         """
             Retrieves a question option by its ID
         """
-        def _get_qopt_by_id_sync():
-            stmt = select(qoptions_table).where(qoptions_table.c.id == id)
-            qopt_row = self.db.execute(stmt).first()
-            return qopt_row._asdict() if qopt_row else None
-        return await run_in_threadpool(_get_qopt_by_id_sync)
+        stmt = select(qoptions_table).where(qoptions_table.c.id == id)
+        return await self.fetch_one(stmt)
 
     async def get_qoptions_by_question(self, q_id: int, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
         """
             Retrieves question options for a question
             i.e. if a quesiton is a multiple choice, then it will fetch all those options related to the question
+            Served from the quiz content cache when the question's quiz is cached
         """
-        def _get_qopts_by_q_sync():
-            stmt = select(qoptions_table).where(qoptions_table.c.question_id == q_id).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_qopts_by_q_sync)
+        cached = quiz_content_cache.cached_options(q_id)
+        if cached is not None:
+            return [dict(option) for option in cached[skip:skip + limit]]
+        stmt = select(qoptions_table).where(qoptions_table.c.question_id == q_id).offset(skip).limit(limit)
+        return await self.fetch_all(stmt)
 
     async def update_qopt(self, id: int, qopt_data: QOptionsUpdate):
-        def _update_qopt_sync():
-            update_values = {k: v for k, v in qopt_data.model_dump(exclude_unset=True).items()}
-
-            if not update_values:
-                qopt_row = self.db.execute(select(qoptions_table).where(qoptions_table.c.id == id)).first()
-                return qopt_row._asdict() if qopt_row else None
-
-            stmt = update(qoptions_table).where(qoptions_table.c.id == id).values(**update_values)
-
-            self.db.execute(stmt)
-            self.db.commit()
+        update_values = {k: v for k, v in qopt_data.model_dump(exclude_unset=True).items()}
 
-            updated_qopt_row = self.db.execute(
-                select(qoptions_table).where(qoptions_table.c.id == id)
-            ).first()
+        if not update_values:
+            return await self.fetch_one(select(qoptions_table).where(qoptions_table.c.id == id))
 
-            return updated_qopt_row._asdict() if updated_qopt_row else None
-        return run_in_threadpool(_update_qopt_sync)
+        qoption = await self.update_returning(qoptions_table, id, update_values)
+        resource_versions.bump(qoptions_table.name)
+        # the option may have moved question, drop both the question it was cached under and its new one
+        quiz_content_cache.invalidate_option(id)
+        if qoption is not None:
+            quiz_content_cache.invalidate_question(qoption["question_id"])
+        return qoption
@@ -4,16 +4,20 @@
 """
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert, update, delete
-from starlette.concurrency import run_in_threadpool
 
+from .base_repository import BaseRepository
+from ..core.quiz_content_cache import quiz_content_cache
+from ..core.resource_versions import resource_versions
 from ..models.question_model import questions_table
+from ..models.quiz_model import quizzes_table
+from ..models.qoptions_model import qoptions_table
 from ..api.schemas.question_schema import QuestionCreate, QuestionUpdate
 
-class QuestionRepository:
-    def __init__(self, db: Session):
-        self.db = db
+class QuestionRepository(BaseRepository):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
+        super().__init__(db, read_db)
 
     async def create_question(self, question_data: QuestionCreate) -> Dict[str, Any] | None:
         """
@@ -22,25 +26,19 @@ class QuestionRepository:
             Dict[str, Any]: The new row
             None: Return null if no row created
         """
-        def _create_question_sync():
-            stmt = insert(questions_table).values(
-                question = question_data.question,
-                marks = question_data.marks,
-                level = question_data.level,
-                correctAnswer = question_data.correctAnswer,
-                quiz_id = question_data.quiz_id,
-                type = question_data.type
-            )
-
-            result = self.db.execute(stmt)
-            self.db.commit()
-
-            created_question_row = self.db.execute(
-                select(questions_table).where(questions_table.c.id == result.lastrowid)
-            ).first()
-
-            return created_question_row._asdict() if created_question_row else None
-        return await run_in_threadpool(_create_question_sync)
+        values = {
+            "question": question_data.question,
+            "marks": question_data.marks,
+            "level": question_data.level,
+            "correctAnswer": question_data.correctAnswer,
+            "quiz_id": question_data.quiz_id,
+            "type": question_data.type
+        }
+
+        question = await self.insert_returning(questions_table, values)
+        resource_versions.bump(questions_table.name)
+        quiz_content_cache.invalidate_quiz(question_data.quiz_id)
+        return question
 
     async def get_question_by_id(self, id: int) -> Optional[Dict[str, Any]]:
         """
@@ -49,28 +47,74 @@ class QuestionRepository:
                 Dict[str, Any]: The question row
                 None: Return null if no row created
         """
-        def _get_question_by_id_sync():
-            stmt = select(questions_table).where(questions_table.c.id == id)
-            question_row = self.db.execute(stmt).first()
-            return question_row._asdict() if question_row else None
-        return await run_in_threadpool(_get_question_by_id_sync)
+        stmt = select(questions_table).where(questions_table.c.id == id)
+        return await self.fetch_one(stmt)
+
+    async def get_questions_by_ids(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Retrieves many questions with one IN query, keyed by question id"""
+        if not ids:
+            return {}
+        stmt = select(questions_table).where(questions_table.c.id.in_(set(ids)))
+        return {row["id"]: row for row in await self.fetch_all(stmt)}
 
     async def get_questions_by_quiz_id(self, id: int, skip: int=0, limit:int=10) -> List[Dict[str, Any]]:
-        """Retrieves questions by their quiz id foreign key"""
-        def _get_questions_by_quiz_id_sync():
-            stmt = select(questions_table).where(questions_table.c.quiz_id == id).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
-        return await run_in_threadpool(_get_questions_by_quiz_id_sync)
+        """Retrieves questions by their quiz id foreign key, in id order, from the quiz content cache"""
+        content = await self.get_quiz_content(id)
+        return [dict(question) for question in content["questions"][skip:skip + limit]]
 
-    async def get_questions(self, skip: int=0, limit:int=10) -> List[Dict[str, Any]]:
-        """Retrieves a list of questions"""
-        def _get_questions_sync():
-            stmt = select(questions_table).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
+    async def get_quiz_content(self, quiz_id: int) -> Dict[str, Any]:
+        """
+            Retrieves a quiz with its questions and their options from the quiz content cache
+            Return:
+                Dict[str, Any]: {"quiz": quiz row or None, "questions": [question rows], "options": {question_id: [option rows]}} (shared, don't modify)
+        """
+        return await quiz_content_cache.get_quiz(quiz_id, lambda: self._load_quiz_content(quiz_id))
 
-        return await run_in_threadpool(_get_questions_sync)
+    async def _load_quiz_content(self, quiz_id: int) -> Dict[str, Any]:
+        """
+            Loads a quiz, its questions and all their options with one outer-joined query (one row per option)
+            Runs on its own primary session: the result is shared by every request, so it must not come
+            from a lagging replica or join the calling request's transaction
+        """
+        stmt = (
+            select(
+                quizzes_table.c.id.label("quiz_id"),
+                *[c.label(f"quiz_{c.name}") for c in quizzes_table.c if c.name != "id"],
+                *[c.label(f"question_{c.name}") for c in questions_table.c if c.name != "quiz_id"],
+                qoptions_table.c.id.label("option_id"),
+                qoptions_table.c.option
+            )
+            .select_from(
+                quizzes_table
+                .outerjoin(questions_table, questions_table.c.quiz_id == quizzes_table.c.id)
+                .outerjoin(qoptions_table, qoptions_table.c.question_id == questions_table.c.id)
+            )
+            .where(quizzes_table.c.id == quiz_id)
+            .order_by(questions_table.c.id, qoptions_table.c.id)
+        )
+        async with AsyncSession(self.db.bind, expire_on_commit=False) as db:
+            rows = (await db.execute(stmt)).fetchall()
+
+        quiz: Optional[Dict[str, Any]] = None
+        questions: List[Dict[str, Any]] = []
+        options: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            if quiz is None:
+                quiz = {"id": row.quiz_id, **{c.name: getattr(row, f"quiz_{c.name}") for c in quizzes_table.c if c.name != "id"}}
+            question_id = row.question_id
+            if question_id is None: # a quiz without questions
+                continue
+            if question_id not in options:
+                options[question_id] = []
+                questions.append({c.name: getattr(row, f"question_{c.name}") if c.name != "quiz_id" else row.quiz_id for c in questions_table.c})
+            if row.option_id is not None:
+                options[question_id].append({"id": row.option_id, "option": row.option, "question_id": question_id})
+        return {"quiz": quiz, "questions": questions, "options": options}
+
+    async def get_questions(self, skip: int=0, limit:int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves a list of questions, paged by id (cursor) or offset"""
+        stmt = select(questions_table)
+        return await self.fetch_all(self.paginate(stmt, [questions_table.c.id], skip, limit, cursor))
 
     async def update_question(self, id: int, question_data: QuestionUpdate) -> Dict[str, Any] | None:
         """
@@ -79,23 +123,16 @@ class QuestionRepository:
                 Dict[str, Any]: The new row
                 None: Return null if no row created
         """
-        def _update_question_sync():
-            # create a dict of non-None values from question_data
-            update_values = {k: v for k, v in question_data.model_dump(exclude_unset=True).items() if v is not None}
-
-            if not update_values: # no date to update
-                question_row = self.db.execute(select(questions_table).where(questions_table.c.id == id)).first()
-                return question_row._asdict() if question_row else None
-
-            stmt = update(questions_table).where(questions_table.c.id == id).values(**update_values)
-
-            self.db.execute(stmt)
-            self.db.commit()
-
-            updated_question_row = self.db.execute(
-                select(questions_table).where(questions_table.c.id == id)
-            ).first()
-
-            return updated_question_row._asdict() if updated_question_row else None
-
-        return await run_in_threadpool(_update_question_sync)
\ No newline at end of file
+        # create a dict of non-None values from question_data
+        update_values = {k: v for k, v in question_data.model_dump(exclude_unset=True).items() if v is not None}
+
+        if not update_values: # no date to update
+            return await self.fetch_one(select(questions_table).where(questions_table.c.id == id))
+
+        question = await self.update_returning(questions_table, id, update_values)
+        resource_versions.bump(questions_table.name)
+        # the question may have moved quiz, drop both the one it was cached under and the one it's in now
+        quiz_content_cache.invalidate_question(id)
+        if question is not None:
+            quiz_content_cache.invalidate_quiz(question["quiz_id"])
+        return question
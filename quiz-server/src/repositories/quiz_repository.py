@@ -4,52 +4,41 @@
 """
 
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert, update, delete
-from starlette.concurrency import run_in_threadpool
 
+from .base_repository import BaseRepository
+from ..core.quiz_content_cache import quiz_content_cache
+from ..core.resource_versions import resource_versions
 from ..models.quiz_model import quizzes_table
 from ..api.schemas.quiz_schema import QuizCreate, QuizResponse, QuizUpdate
 
-class QuizRepository:
-    def __init__(self, db: Session):
-        self.db = db
+class QuizRepository(BaseRepository):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
+        super().__init__(db, read_db)
 
     async def create_quiz(self, quiz_data: QuizCreate) -> Dict[str, Any] | None:
         """Creates a new quiz record"""
-        def _create_quiz_sync():
-            stmt = insert(quizzes_table).values(
-                title = quiz_data.title,
-                duration = quiz_data.duration,
-                topic_id = quiz_data.topic_id,
-                school_id = quiz_data.school_id,
-                grade = quiz_data.grade
-            )
-
-            result = self.db.execute(stmt)
-            self.db.commit()
-
-            created_quiz_row = self.db.execute(
-                select(quizzes_table).where(quizzes_table.c.id == result.lastrowid)
-            ).first()
-
-            return created_quiz_row._asdict() if created_quiz_row else None
-
-        return await run_in_threadpool(_create_quiz_sync)
+        values = {
+            "title": quiz_data.title,
+            "duration": quiz_data.duration,
+            "topic_id": quiz_data.topic_id,
+            "school_id": quiz_data.school_id,
+            "grade": quiz_data.grade
+        }
+
+        quiz = await self.insert_returning(quizzes_table, values)
+        resource_versions.bump(quizzes_table.name)
+        if quiz is not None: # the id may be cached as not found
+            quiz_content_cache.invalidate_quiz(quiz["id"])
+        return quiz
 
     async def get_quiz_by_id(self, id: int) -> Optional[Dict[str, Any]]:
         """Retrieves a quiz by ID"""
-        def _get_quiz_by_id_sync():
-            stmt = select(quizzes_table).where(quizzes_table.c.id == id)
-            quiz_row = self.db.execute(stmt).first()
-            return quiz_row._asdict() if quiz_row else None
-        return await run_in_threadpool(_get_quiz_by_id_sync)
-
-    async def get_quizzes(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
-        """Retrieves a list of quizzes"""
-        def _get_quizzes_sync():
-            stmt = select(quizzes_table).offset(skip).limit(limit)
-            results = self.db.execute(stmt).fetchall()
-            return [row._asdict() for row in results]
+        stmt = select(quizzes_table).where(quizzes_table.c.id == id)
+        return await self.fetch_one(stmt)
 
-        return await run_in_threadpool(_get_quizzes_sync)
\ No newline at end of file
+    async def get_quizzes(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves a list of quizzes, paged by id (cursor) or offset"""
+        stmt = select(quizzes_table)
+        return await self.fetch_all(self.paginate(stmt, [quizzes_table.c.id], skip, limit, cursor))
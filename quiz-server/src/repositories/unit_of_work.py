@@ -0,0 +1,43 @@
+"""
+    Unit of Work
+    Groups writes across repositories into one transaction with a single commit
+"""
+
+from typing import Optional, Any
+from types import TracebackType
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base_repository import UNIT_OF_WORK_KEY, PRIMARY_WRITE_KEY
+from .answer_repository import AnswerRepository
+from .log_repository import LogRepository
+from .question_repository import QuestionRepository
+
+class UnitOfWork:
+    """
+        Usage:
+            async with uow:
+                await uow.answers.create_answer(...)
+                await uow.logs.create_log(...)
+        Repositories skip their own commits while the block is open,
+        the block commits once on success and rolls everything back on any exception
+    """
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.answers = AnswerRepository(db)
+        self.logs = LogRepository(db)
+        self.questions = QuestionRepository(db)
+
+    async def __aenter__(self) -> "UnitOfWork":
+        if self.db.info.get(UNIT_OF_WORK_KEY):
+            raise RuntimeError("A unit of work is already open on this session")
+        self.db.info[UNIT_OF_WORK_KEY] = True
+        return self
+
+    async def __aexit__(self, exc_type: Optional[type[BaseException]], exc: Optional[BaseException], tb: Optional[TracebackType]) -> Any:
+        self.db.info.pop(UNIT_OF_WORK_KEY, None)
+        if exc_type is None:
+            await self.db.commit()
+            self.db.info[PRIMARY_WRITE_KEY] = True
+        else:
+            await self.db.rollback()
+        return False
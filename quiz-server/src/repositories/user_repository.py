@@ -5,46 +5,37 @@
 
 from typing import Optional, List, Dict, Any, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import select, delete
 from sqlalchemy.engine import Row
 
+from src.repositories.base_repository import BaseRepository
 from src.models.user_model import users_table
 from src.api.schemas.user_schema import UserCreate, UserUpdate
 
-class UserRepository:
-    def __init__(self, db: AsyncSession):
+class UserRepository(BaseRepository):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
         """
         Initializes the repository with an asynchronous database session.
         """
-        self.db = db
-        print(f"User repository initialized with session: {self.db}")
+        super().__init__(db, read_db)
 
     async def create_user(self, user_data: UserCreate) -> Dict[str, Any] | None:
         """
         Asynchronously creates a new user record using SQLAlchemy Core.
         """
         try:
-            stmt = insert(users_table).values(
-                email=user_data.email,
-                password=user_data.password,
-                name=user_data.name,
-                surname=user_data.surname,
-                grade=user_data.grade,
-                type=user_data.type,
-                school_id=user_data.school_id
-            )
-
-            # Execute the insert statement and await the result
-            result = await self.db.execute(stmt)
-            await self.db.commit()
-
-            # Get the ID of the newly created row
-            new_user_id = result.lastrowid
-
-            # Fetch and return the newly created user
-            return await self.get_user_by_id(new_user_id)
+            values = {
+                "email": user_data.email,
+                "password": user_data.password,
+                "name": user_data.name,
+                "surname": user_data.surname,
+                "grade": user_data.grade,
+                "type": user_data.type,
+                "school_id": user_data.school_id
+            }
+            # the new row comes back from the insert itself (see insert_returning)
+            return await self.insert_returning(users_table, values)
         except Exception as e:
-            await self.db.rollback()
             print(f"Error creating user: {e}")
             return None
 
@@ -55,7 +46,7 @@ class UserRepository:
         try:
             stmt = select(users_table).where(users_table.c.id == id)
             # Await the execution and then fetch the first result
-            result = await self.db.execute(stmt)
+            result = await self.reader.execute(stmt)
             user_row: Optional[Row] = result.first()
             return user_row._asdict() if user_row else None
         except Exception as e:
@@ -69,24 +60,22 @@ class UserRepository:
         try:
             stmt = select(users_table).where(users_table.c.email == email)
             # Await the execution and then fetch the first result
-            result = await self.db.execute(stmt)
+            result = await self.reader.execute(stmt)
             user_row: Optional[Row] = result.first()
-            print(f"User Row: {user_row}")
             return user_row._asdict() if user_row else None
         except Exception as e:
             print(f"Error getting user by email: {e}")
             return None
 
-    async def get_users(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Asynchronously retrieves a list of users.
+        Asynchronously retrieves a list of users, paged by id (cursor) or offset.
         """
+        stmt = self.paginate(select(users_table), [users_table.c.id], skip, limit, cursor)
         try:
-            stmt = select(users_table).offset(skip).limit(limit)
             # Await the execution and then fetch all results
-            result = await self.db.execute(stmt)
+            result = await self.reader.execute(stmt)
             users: Sequence[Row] = result.fetchall()
-            print(f"Results: {users}")
             return [row._asdict() for row in users]
         except Exception as e:
             print(f"Error getting all users: {e}")
@@ -101,16 +90,9 @@ class UserRepository:
             if not update_values:
                 return await self.get_user_by_id(id)
 
-            stmt = update(users_table).where(users_table.c.id == id).values(**update_values)
-
-            # Await the execution of the update statement
-            await self.db.execute(stmt)
-            await self.db.commit()
-
-            # Fetch and return the updated user
-            return await self.get_user_by_id(id)
+            # the updated row comes back from the update itself (see update_returning)
+            return await self.update_returning(users_table, id, update_values)
         except Exception as e:
-            await self.db.rollback()
             print(f"Error updating user: {e}")
             return None
 
@@ -122,7 +104,7 @@ class UserRepository:
             stmt = delete(users_table).where(users_table.c.id == id)
             # Await the execution of the delete statement
             result = await self.db.execute(stmt)
-            await self.db.commit()
+            await self.commit()
             return result.rowcount > 0
         except Exception as e:
             await self.db.rollback()
@@ -21,6 +21,6 @@ class AnalysisService:
         analysis_dict = await self.analysis_repo.get_analysis_by_id(id)
         return analysis_dict
 
-    async def get_analyses_by_user_id(self, id: int, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
-        analysis_list_dict = await self.analysis_repo.get_analyses_by_user_id(id=id, skip=skip, limit=limit)
+    async def get_analyses_by_user_id(self, id: int, skip: int=0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        analysis_list_dict = await self.analysis_repo.get_analyses_by_user_id(id=id, skip=skip, limit=limit, cursor=cursor)
         return analysis_list_dict
\ No newline at end of file
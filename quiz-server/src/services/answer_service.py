@@ -4,24 +4,82 @@
 """
 
 from typing import Optional, List, Dict, Any
-from src.api.schemas.answer_schema import AnswerResponse, AnswerCreate
+import numpy as np
+import pandas as pd
+from src.api.schemas.answer_schema import AnswerResponse, AnswerCreate, AnswerSubmission
 from src.api.schemas.log_schema import LogCreate
 from src.repositories.answer_repository import AnswerRepository
 from src.repositories.log_repository import LogRepository
+from src.repositories.unit_of_work import UnitOfWork
+from src.ml_core.grading import grade_answer, grade_columns
 
 class AnswerService:
-    def __init__(self, answer_repo: AnswerRepository, log_repo: LogRepository) -> None:
+    def __init__(self, answer_repo: AnswerRepository, log_repo: LogRepository, uow: UnitOfWork) -> None:
         self.answer_repo = answer_repo
         self.log_repo = log_repo
+        self.uow = uow
 
-    async def create_answer(self, answer_data: AnswerCreate, log_data: LogCreate):
+    async def create_answer(self, answer_data: AnswerCreate, log_data: LogCreate) -> Optional[Dict[str, Any]]:
         """
-            Creates a new answer and adds it log
+            Creates a new answer and adds its log in one transaction (one commit)
+            Multiple-choice and true/false answers are graded as they are stored
+            Returns the answer joined with its question's details, or None if the question doesn't exist
         """
-        answer_dict = await self.answer_repo.create_answer(answer_data)
-        await self.log_repo.create_log(log_data)
+        async with self.uow as uow:
+            question = await uow.questions.get_question_by_id(answer_data.question_id)
+            if question is None:
+                return None
+            marks = grade_answer(answer_data.answer, question["correctAnswer"], question["type"], question["marks"])
+            answer_dict = await uow.answers.create_answer(answer_data, marks)
+            await uow.logs.create_log(log_data)
 
-        return answer_dict
+        if answer_dict is None:
+            return None
+        return join_question(answer_dict, question)
+
+    async def create_answers_batch(self, submissions: List[AnswerSubmission]) -> Optional[List[Dict[str, Any]]]:
+        """
+            Creates the answers and logs of one attempt in a single transaction
+            Every submission is validated (and mc/tf ones graded) in one pass, the valid ones are written with one
+            multi-row insert per table and the rest are reported back with the reason they were rejected
+            Return:
+                List[Dict[str, Any]]: One result per submission, in order ({index, answer} or {index, error})
+                None: The submissions span more than one attempt (user and quiz)
+        """
+        if not submissions:
+            return []
+        attempts = {(s.answer.user_id, s.answer.quiz_id) for s in submissions}
+        if len(attempts) > 1:
+            return None
+
+        results: List[Dict[str, Any]] = [{"index": index} for index in range(len(submissions))]
+        async with self.uow as uow:
+            questions = await uow.questions.get_questions_by_ids([s.answer.question_id for s in submissions])
+
+            accepted: List[int] = []
+            marks: List[Optional[int]] = []
+            seen_questions: set[int] = set()
+            for index, submission in enumerate(submissions):
+                answer, log = submission.answer, submission.log
+                question = questions.get(answer.question_id)
+                if question is None or question["quiz_id"] != answer.quiz_id:
+                    results[index]["error"] = "Question not found in this quiz"
+                elif log.user_id != answer.user_id or log.question_id != answer.question_id:
+                    results[index]["error"] = "Log does not belong to this answer"
+                elif answer.question_id in seen_questions:
+                    results[index]["error"] = "Question answered more than once in this batch"
+                else:
+                    seen_questions.add(answer.question_id)
+                    accepted.append(index)
+                    marks.append(grade_answer(answer.answer, question["correctAnswer"], question["type"], question["marks"]))
+
+            if accepted:
+                created = await uow.answers.create_answers([submissions[i].answer for i in accepted], marks)
+                await uow.logs.create_logs([submissions[i].log for i in accepted])
+                for index, answer_dict in zip(accepted, created):
+                    results[index]["answer"] = join_question(answer_dict, questions[answer_dict["question_id"]])
+
+        return results
 
     async def get_answer_by_id(self, id: int) -> Optional[Dict[str, Any]]:
         """
@@ -40,14 +98,14 @@ class AnswerService:
         answers_list_dict = await self.answer_repo.get_answers_by_user_and_quiz_id(user_id=user_id, quiz_id=quiz_id, skip=skip, limit=limit)
         return answers_list_dict
 
-    async def get_answers_by_quiz_id(self, id:int, skip: int = 0, limit: int=10) -> List[Dict[str, Any]]:
+    async def get_answers_by_quiz_id(self, id:int, skip: int = 0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieves answers by quiz id"""
-        answers_list_dict = await self.answer_repo.get_answers_by_quiz_id(id=id, skip=skip, limit=limit)
+        answers_list_dict = await self.answer_repo.get_answers_by_quiz_id(id=id, skip=skip, limit=limit, cursor=cursor)
         return answers_list_dict
 
-    async def get_answers_with_questions(self, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
+    async def get_answers_with_questions(self, skip: int=0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieves all answers"""
-        answers_list_dict = await self.answer_repo.get_answers_with_questions(skip=skip, limit=limit)
+        answers_list_dict = await self.answer_repo.get_answers_with_questions(skip=skip, limit=limit, cursor=cursor)
         return answers_list_dict
 
     async def get_answers(self, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
@@ -59,3 +117,34 @@ class AnswerService:
         """Allocates marks to a user's answer"""
         answer_dict = await self.answer_repo.allocate_marks_to_answer(id, marks)
         return answer_dict
+
+    async def regrade_quiz(self, quiz_id: int) -> Dict[str, Any]:
+        """
+            Grades every multiple-choice and true/false answer to a quiz again, e.g. after a correct answer was fixed
+            The answers are read with one query, compared in one vectorized pass and only the marks that changed
+            are written, with one UPDATE per marks value, all in one transaction
+            Return:
+                Dict[str, Any]: The quiz, how many answers were graded and how many of their marks changed
+        """
+        async with self.uow as uow:
+            columns = await uow.answers.get_quiz_answers_for_grading(quiz_id)
+            _, marks = grade_columns(columns["answer"], columns["correct_answer"], columns["type"], columns["marks"])
+            answer_ids = np.asarray(columns["answer_id"], dtype=np.int64)
+            current = pd.Series(columns["marks_achieved"], dtype="Int64").to_numpy(dtype=np.int64, na_value=-1)
+            changed = current != marks
+            answer_ids_by_marks = {
+                int(value): answer_ids[changed & (marks == value)].tolist()
+                for value in np.unique(marks[changed])
+            }
+            updated = await uow.answers.set_marks(answer_ids_by_marks)
+        return {"quiz_id": quiz_id, "graded": len(answer_ids), "updated": updated}
+
+def join_question(answer: Dict[str, Any], question: Dict[str, Any]) -> Dict[str, Any]:
+    """Builds the joined AnswerResponse shape (same as get_answers_with_questions) from rows already in hand"""
+    return {
+        **answer,
+        "question": question["question"],
+        "marks": question["marks"],
+        "correctAnswer": question["correctAnswer"],
+        "type": question["type"]
+    }
@@ -0,0 +1,70 @@
+"""
+    Service for Exports
+    Contains all the logic for the export_router: streams answers and logs as NDJSON or CSV,
+    one batch of rows at a time, so memory stays flat however large the export is
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, List
+from datetime import datetime
+import csv
+import enum
+import io
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.schemas.export_schema import ExportFilters, ExportFormat
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+
+# rows fetched from the server-side cursor per batch, each batch becomes one chunk of the response
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES: Dict[str, str] = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+class ExportService:
+    def __init__(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """
+            session_factory opens the session an export reads through
+            A stream outlives the request's own sessions (they close before the body is sent), so each export opens its own
+        """
+        self.session_factory = session_factory
+
+    async def export_answers(self, filters: ExportFilters, format: ExportFormat) -> AsyncIterator[bytes]:
+        """Streams the answers matching the filters, encoded as format"""
+        async with self.session_factory() as db:
+            async for chunk in encode_batches(AnswerRepository(db).export_answers(filters, EXPORT_BATCH_SIZE), format):
+                yield chunk
+
+    async def export_logs(self, filters: ExportFilters, format: ExportFormat) -> AsyncIterator[bytes]:
+        """Streams the log events matching the filters, encoded as format"""
+        async with self.session_factory() as db:
+            async for chunk in encode_batches(LogRepository(db).export_logs(filters, EXPORT_BATCH_SIZE), format):
+                yield chunk
+
+async def encode_batches(batches: AsyncIterator[List[Dict[str, Any]]], format: ExportFormat) -> AsyncIterator[bytes]:
+    """
+        Encodes batches of rows as NDJSON (one object per line) or CSV (a header row, then one line per row)
+        An export with no matching rows has an empty body
+    """
+    header_written = False
+    async for batch in batches:
+        if not batch:
+            continue
+        if format == "ndjson":
+            yield b"".join(to_json(row) + b"\n" for row in batch)
+            continue
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            writer.writerow(batch[0].keys())
+            header_written = True
+        writer.writerows([_csv_value(value) for value in row.values()] for row in batch)
+        yield buffer.getvalue().encode()
+
+def _csv_value(value: Any) -> Any:
+    """CSV cells as the NDJSON export writes them: ISO datetimes, enum values, empty for null"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return "" if value is None else value
@@ -20,12 +20,12 @@ class LogService:
         question_dict = await self.log_repo.get_log_by_id(id)
         return question_dict
 
-    async def get_logs_by_user_id(self, id: int, question_id: Optional[int] = None, skip: int=0, limit: int=10):
+    async def get_logs_by_user_id(self, id: int, question_id: Optional[int] = None, skip: int=0, limit: int=10, cursor: Optional[str] = None):
         """Retrieves logs by user id"""
-        log_list_dict = await self.log_repo.get_logs_by_user_id(id, question_id, skip, limit)
+        log_list_dict = await self.log_repo.get_logs_by_user_id(id, question_id, skip, limit, cursor)
         return log_list_dict
 
-    async def get_logs(self, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
+    async def get_logs(self, skip: int=0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieves all logs"""
-        log_list_dict = await self.log_repo.get_logs(skip, limit)
+        log_list_dict = await self.log_repo.get_logs(skip, limit, cursor)
         return log_list_dict
\ No newline at end of file
@@ -4,7 +4,11 @@
 """
 
 from typing import Optional, List, Dict, Any
-import pandas as pd
+import asyncio
+import logging
+from pandas import DataFrame
+from pydantic_core import to_json
+from sqlalchemy.exc import IntegrityError
 # all the relevant schemas
 from src.api.schemas.analysis_schema import AnalysisCreate, AnalysisResponse
 from src.api.schemas.answer_schema import AnswerResponse
@@ -12,7 +16,11 @@ from src.api.schemas.log_schema import LogResponse
 from src.api.schemas.question_schema import QuestionResponse
 from src.api.schemas.user_schema import UserResponse
 
-from src.ml_core.data_processing import DataPrepocessor
+from src.core.config import settings
+from src.core.process_pool import ProcessPool, process_pool
+from src.ml_core.data_processing import DataPrepocessor, analysis_frame
+from src.ml_core.time_on_task import fold_events, state_frame, question_metrics, quiz_summary, to_json_records
+from src.ml_core.micro_batcher import MicroBatcher, micro_batcher
 
 # repositories
 from src.repositories.analysis_repository import AnalysisRepository
@@ -21,60 +29,152 @@ from src.repositories.log_repository import LogRepository
 from src.repositories.question_repository import QuestionRepository
 from src.repositories.user_repository import UserRepository
 from src.repositories.quiz_repository import QuizRepository
+from src.repositories.engagement_repository import EngagementRepository
+
+logger = logging.getLogger(__name__)
+
+# log events folded into the engagement metrics per query (and transaction)
+ENGAGEMENT_BATCH_SIZE = 10000
+# one engagement refresh at a time per process (the routes only read), the database keeps processes from folding an event twice
+engagement_lock = asyncio.Lock()
+# analysis rows converted to records between yields to the event loop
+RECORDS_CHUNK_SIZE = 1000
 
 class MLService:
-    def __init__(self, analysis_repo: AnalysisRepository, answer_repo: AnswerRepository, log_repo: LogRepository, question_repo: QuestionRepository, user_repo: UserRepository, quiz_repo: QuizRepository) -> None:
+    def __init__(self, analysis_repo: AnalysisRepository, answer_repo: AnswerRepository, log_repo: LogRepository, question_repo: QuestionRepository, user_repo: UserRepository, quiz_repo: QuizRepository, engagement_repo: Optional[EngagementRepository] = None, pool: Optional[ProcessPool] = None, batcher: Optional[MicroBatcher] = None) -> None:
         self.preprocessor = DataPrepocessor()
+        self.pool = pool if pool is not None else process_pool
+        self.batcher = batcher if batcher is not None else micro_batcher
         self.analysis_repo = analysis_repo
         self.answer_repo = answer_repo
         self.log_repo = log_repo
         self.question_repo = question_repo
         self.user_repo = user_repo
         self.quiz_repo = quiz_repo
+        # primary-only, needed by the engagement methods
+        self.engagement_repo = engagement_repo
 
     # functions for the machine learning model e.g. sentiment analysis, classification
     async def analyse(self, id: int, skip: int = 0, limit: int = 10, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        # initialise the list of dataframes
-        dfs: List[pd.DataFrame] = []
-        # if the user_id query exists
+        """
+            Builds the analysis records for a quiz, one per answer joined with its question and latest log
+            The whole quiz (or one user's part of it) is pulled with two set-based queries and joined in one
+            per-event DataFrame, so the number of round trips doesn't grow with the number of students
+            The DataFrame work runs in the process pool, off the event loop
+            skip/limit page the answers when filtering by one user
+        """
+        frame = await self._analysis_frame(id, user_id=user_id, skip=skip, limit=limit)
+        return [] if frame is None else await self._to_records(frame)
+
+    async def store_analyses(self, quiz_id: int, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+            Runs the analysis of a whole quiz (or one user's part of it) and stores one analysis per answer,
+            keyed by user and question, through the AnalysisRepository. The analyses stored by an earlier run are
+            replaced, so a job that runs again doesn't duplicate them. Run by the job queue, not in a request
+            Return:
+                Dict[str, Any]: The quiz, the user and how many analyses were stored
+        """
+        frame = await self._analysis_frame(quiz_id, user_id=user_id)
+        analyses = []
+        if frame is not None:
+            for i, (record, question_id) in enumerate(zip(await self._to_records(frame), frame["question_id"].tolist())):
+                analyses.append(AnalysisCreate(user_id=record["user_id"], question_id=question_id, analysis=to_json(record).decode()))
+                if i % RECORDS_CHUNK_SIZE == RECORDS_CHUNK_SIZE - 1:
+                    await asyncio.sleep(0)
+        stored = await self.analysis_repo.replace_quiz_analyses(quiz_id, analyses, user_id=user_id)
+        return {"quiz_id": quiz_id, "user_id": user_id, "analyses": stored}
+
+    async def predict(self, model: str, features: List[List[float]]) -> Dict[str, Any]:
+        """
+            Predicts rows of features with the active version of a model
+            Concurrent requests for the same model share one vectorized predict (see MicroBatcher)
+            Return:
+                Dict[str, Any]: The model, the version that made the predictions and one prediction per row
+        """
+        prediction = await self.batcher.predict(model, features)
+        return {"model": model, "version": prediction.version, "predictions": prediction.predictions}
+
+    async def _analysis_frame(self, quiz_id: int, user_id: Optional[int] = None, skip: int = 0, limit: Optional[int] = None) -> Optional[DataFrame]:
+        """
+            The latest log event of every answer for a quiz (optionally one user's answers, paged by skip/limit,
+            limit None is every answer). The columns are typed as NumPy arrays here and joined in the process
+            pool (see data_processing.analysis_frame)
+            Return:
+                DataFrame: One row per answer with a log event
+                None: Return null if the user doesn't exist or there are no answers
+        """
         if user_id is not None:
             user = await self.user_repo.get_user_by_id(user_id)
-            # if the user exists
-            if(user is not None):
-                u_answers = await self.answer_repo.get_answers_by_user_and_quiz_id(user["id"], id, skip=skip, limit=limit)
-                if len(u_answers) == 0:
-                    return []
-                u_logs = await self.log_repo.get_logs_by_user_id(user["id"], skip=skip, limit=limit)
-                if len(u_logs) == 0:
-                    return []
-                singular_df = self.preprocessor.convert_to_df(user=user, answers=u_answers, logs=u_logs)
-                dfs.append(singular_df)
-            # else return an empty array
-            else:
-                return []
-        # if the user_id query doesn't exist
+            if user is None:
+                return None
+            answers = await self.answer_repo.get_quiz_answers_with_questions(quiz_id, user_id=user_id, skip=skip, limit=limit)
         else:
-            print("Getting by all users")
-            users = await self.user_repo.get_users()
-            for user in users:
-                u_answers = await self.answer_repo.get_answers_by_user_and_quiz_id(user["id"], id)
-                # if there are no answers or logs, skip to the next user
-                # otherwise will cause an error with Pandas
-                # TODO: Create a "no answers" and "no logs" placeholder
-                if len(u_answers) == 0:
-                    continue
-                # go through each answer and get every log that matches the answer's question
-                for u_answer in u_answers:
-                    u_logs = await self.log_repo.get_logs_by_user_id(user["id"], question_id=u_answer["question_id"])
-                    if len(u_logs) == 0:
-                        continue
-                    singular_df = self.preprocessor.convert_to_df(user=user, answers=u_answers, logs=u_logs)
-                    print(singular_df.head())
-                    dfs.append(singular_df)
-        # if the dataframes exist, create one dataframe
-        if len(dfs) > 0:
-            df = pd.concat(dfs, ignore_index=True)
-        else:
-            return []
-        # return as list of dicts
-        return df.to_dict(orient='records') # type: ignore
\ No newline at end of file
+            answers = await self.answer_repo.get_quiz_answers_with_questions(quiz_id)
+        if len(answers["answer_id"]) == 0:
+            return None
+        # typed as soon as they arrive, the logs query runs in between
+        answer_columns = self.preprocessor.answers_columns(answers)
+        logs = await self.log_repo.get_logs_by_quiz_id(quiz_id, user_id=user_id)
+        return await self.pool.run(analysis_frame, answer_columns, self.preprocessor.events_columns(logs))
+
+    async def _to_records(self, frame: DataFrame) -> List[Dict[str, Any]]:
+        """Converts the analysis rows to records a chunk at a time, letting other requests run in between"""
+        records: List[Dict[str, Any]] = []
+        for start in range(0, len(frame), RECORDS_CHUNK_SIZE):
+            records.extend(self.preprocessor.to_records(frame.iloc[start:start + RECORDS_CHUNK_SIZE]))
+            await asyncio.sleep(0)
+        return records
+
+    async def refresh_engagement(self) -> int:
+        """
+            Folds the log events not folded in yet into the stored engagement metrics, a batch (one transaction)
+            at a time. Events are read from ENGAGEMENT_RESCAN_IDS below the watermark, skipping those already
+            applied, so an event committed after higher ids is still counted exactly once
+            The pandas work runs in the process pool
+            Return:
+                int: The number of events applied
+        """
+        assert self.engagement_repo is not None
+        repo = self.engagement_repo
+        applied = 0
+        async with engagement_lock:
+            while True:
+                watermark = await repo.get_watermark()
+                columns = await repo.get_unapplied_logs(watermark - settings.ENGAGEMENT_RESCAN_IDS, limit=ENGAGEMENT_BATCH_SIZE)
+                batch = len(columns["log_id"])
+                if batch == 0:
+                    await repo.rollback()
+                    break
+                events = self.preprocessor.events_columns(columns)
+                state = await repo.get_states(list(set(zip(columns["user_id"], columns["question_id"]))))
+                folded = await self.pool.run(fold_events, state, events)
+                new_watermark = max(watermark, int(events["log_id"].max()))
+                try:
+                    await repo.save_states(columns["log_id"], to_json_records(folded), new_watermark - settings.ENGAGEMENT_RESCAN_IDS)
+                except IntegrityError:
+                    # another process folded (some of) these events first, the next refresh picks up what's left
+                    logger.info("Engagement refresh raced another process, stopping")
+                    break
+                applied += batch
+                if batch < ENGAGEMENT_BATCH_SIZE:
+                    break
+        return applied
+
+    async def get_question_engagement(self, quiz_id: int, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+            Engagement per (user, question) for a quiz, as of the last background refresh
+            (see workers/engagement_refresh.py), read only
+        """
+        assert self.engagement_repo is not None
+        state = state_frame(await self.engagement_repo.get_quiz_states(quiz_id, user_id=user_id))
+        return to_json_records(question_metrics(state))
+
+    async def get_quiz_engagement(self, quiz_id: int) -> Optional[Dict[str, Any]]:
+        """
+            Engagement summary for a quiz, as of the last background refresh, read only
+            Return:
+                Dict[str, Any]: The summary
+                None: Return null if no log events of the quiz have been folded in yet
+        """
+        assert self.engagement_repo is not None
+        return quiz_summary(quiz_id, state_frame(await self.engagement_repo.get_quiz_states(quiz_id)))
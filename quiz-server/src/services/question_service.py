@@ -33,7 +33,7 @@ class QuestionService:
         questions_list_dict = await self.question_repo.get_questions_by_quiz_id(id=id, skip=skip, limit=limit)
         return questions_list_dict
 
-    async def get_questions(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+    async def get_questions(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieves all questions through pagination"""
-        questions_list_dict = await self.question_repo.get_questions(skip=skip, limit=limit)
+        questions_list_dict = await self.question_repo.get_questions(skip=skip, limit=limit, cursor=cursor)
         return questions_list_dict
\ No newline at end of file
@@ -3,15 +3,19 @@
     Contains all the logic for the quiz_router
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
-from src.api.schemas.quiz_schema import QuizCreate, QuizResponse, QuizUpdate
+from src.api.schemas.quiz_schema import QuizCreate, QuizResponse, QuizUpdate, QuizFullResponse
 
+from src.core.quiz_content_cache import quiz_content_cache
+from src.utils.serialization import serialize
 from src.repositories.quiz_repository import QuizRepository
+from src.repositories.question_repository import QuestionRepository
 
 class QuizService:
-    def __init__(self, quiz_repo: QuizRepository):
+    def __init__(self, quiz_repo: QuizRepository, question_repo: QuestionRepository):
         self.quiz_repo = quiz_repo
+        self.question_repo = question_repo
 
     async def create_quiz(self, quiz_data: QuizCreate) -> Optional[Dict[str, Any]]:
         """Creates a new quiz"""
@@ -23,7 +27,27 @@ class QuizService:
         quiz_dict = await self.quiz_repo.get_quiz_by_id(id)
         return quiz_dict
 
-    async def get_quizzes(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+    async def get_quizzes(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieves a list of quizzes"""
-        quiz_list_dict = await self.quiz_repo.get_quizzes(skip=skip, limit=limit)
-        return quiz_list_dict
\ No newline at end of file
+        quiz_list_dict = await self.quiz_repo.get_quizzes(skip=skip, limit=limit, cursor=cursor)
+        return quiz_list_dict
+
+    async def get_full_quiz(self, id: int) -> Optional[Tuple[bytes, str]]:
+        """
+            Retrieves a quiz with its questions and their options, already serialized
+            Return:
+                Tuple[bytes, str]: The JSON body and its ETag, rendered once per load of the quiz content cache
+                None: Return null if the quiz doesn't exist
+        """
+        content = await self.question_repo.get_quiz_content(id)
+        if content["quiz"] is None:
+            return None
+        return quiz_content_cache.rendered(content, render_full_quiz)
+
+def render_full_quiz(content: Dict[str, Any]) -> bytes:
+    """Serializes cached quiz content as a QuizFullResponse"""
+    full_quiz = {
+        **content["quiz"],
+        "questions": [{**question, "options": content["options"][question["id"]]} for question in content["questions"]]
+    }
+    return serialize(QuizFullResponse, full_quiz)
@@ -17,8 +17,8 @@ class SchoolService:
         school_dict = await self.school_repo.get_school_by_id(id)
         return school_dict
 
-    async def get_schools(self, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
-        schools = await self.school_repo.get_schools(skip, limit)
+    async def get_schools(self, skip: int=0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        schools = await self.school_repo.get_schools(skip, limit, cursor)
         return schools
 
     async def update_school(self, id: int, school_data: SchoolUpdate) -> Optional[Dict[str, Any]]:
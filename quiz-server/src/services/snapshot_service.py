@@ -0,0 +1,45 @@
+"""
+    Service for the analytics snapshots
+    Appends the answers and log events written since the last refresh to the Parquet snapshots (see ml_core.snapshots)
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Tuple
+import asyncio
+
+from src.ml_core.snapshots import SnapshotWriter, ID_COLUMNS
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+
+# rows read per query and written per batch of files
+SNAPSHOT_BATCH_SIZE = 10000
+
+class SnapshotService:
+    def __init__(self, answer_repo: AnswerRepository, log_repo: LogRepository, writer: SnapshotWriter) -> None:
+        self.answer_repo = answer_repo
+        self.log_repo = log_repo
+        self.writer = writer
+
+    async def refresh(self) -> Dict[str, int]:
+        """
+            Reads each table from a trailing window below its watermark in id order, in batches, and appends the
+            rows not in the snapshots yet
+            Writing the files runs in a thread so the event loop keeps serving while a batch is encoded
+            Return:
+                Dict[str, int]: The number of rows appended per table
+        """
+        sources: Dict[str, Callable[..., Awaitable[Dict[str, Tuple[Any, ...]]]]] = {
+            "answers": self.answer_repo.get_answers_after,
+            "events": self.log_repo.get_logs_after
+        }
+        appended = {}
+        for table, fetch in sources.items():
+            appended[table] = 0
+            after = self.writer.rescan_from(table)
+            while True:
+                columns = await fetch(after, limit=SNAPSHOT_BATCH_SIZE)
+                appended[table] += await asyncio.to_thread(self.writer.append, table, columns)
+                ids = columns[ID_COLUMNS[table]]
+                if len(ids) < SNAPSHOT_BATCH_SIZE:
+                    break
+                after = ids[-1]
+        return appended
@@ -15,8 +15,8 @@ class TopicService:
         topic_dict = await self.topic_repo.get_topic(id)
         return topic_dict
 
-    async def get_all_topics(self, skip: int=0, limit: int=10) -> List[Dict[str, Any]]:
-        topics = await self.topic_repo.get_all_topics(skip, limit)
+    async def get_all_topics(self, skip: int=0, limit: int=10, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        topics = await self.topic_repo.get_all_topics(skip, limit, cursor)
         return topics
 
     async def update_topic(self, id: int, topic_data: TopicUpdate) -> Optional[Dict[str, Any]]:
@@ -11,10 +11,15 @@ from src.api.schemas.user_schema import UserUpdate, UserCreate, UserResponse
 
 # import UserRepository for data access
 from src.repositories.user_repository import UserRepository
+from src.core.user_cache import UserCache, user_cache
 
 class UserService:
-    def __init__(self, user_repo: UserRepository):
+    def __init__(self, user_repo: UserRepository, cache: Optional[UserCache] = None):
         self.user_repo = user_repo
+        self.cache = cache if cache is not None else user_cache
+        # request scoped memo: FastAPI builds the service once per request, so the auth
+        # dependency and the route share these lookups
+        self._users_by_email: Dict[str, Optional[Dict[str, Any]]] = {}
 
     async def create_user(self, user_data: UserCreate) -> Optional[Dict[str, Any]]:
         """
@@ -23,8 +28,7 @@ class UserService:
         """
 
         # business logic: check if user with this email already exists
-        existing_user = await self.user_repo.get_user_by_email(user_data.email)
-        print(f"Existing user: {existing_user}")
+        existing_user = await self.get_user_by_email(user_data.email)
         if existing_user:
             return None # indicate conflict, router will handle http 400
         # in a real app, hash the password here
@@ -32,6 +36,8 @@ class UserService:
         # call the repo to create the user
         # the repo now returns a dict (or None)
         user_dict = await self.user_repo.create_user(user_data)
+        if user_dict is not None:
+            self._users_by_email[user_dict["email"]] = user_dict
         return user_dict
 
     async def get_user_by_id(self, id: int) -> Optional[Dict[str, Any]]:
@@ -46,17 +52,28 @@ class UserService:
         """
         Retrieves a user by email
         returns a dict representation of the user or None if not found
+        Answered from this request's memo, then the shared user cache, then the database
+        (a missing user is only remembered for the request)
         """
-        user_dict = await self.user_repo.get_user_by_email(email)
+        if email in self._users_by_email:
+            self.cache.request_hits += 1
+            return self._users_by_email[email]
+        user_dict = self.cache.get(email)
+        if user_dict is None:
+            user_dict = await self.user_repo.get_user_by_email(email)
+            if user_dict is not None:
+                self.cache.put_user(user_dict)
+        # callers get their own copy of the cached row
+        user_dict = dict(user_dict) if user_dict is not None else None
+        self._users_by_email[email] = user_dict
         return user_dict
 
-    async def get_all_users(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_all_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Retrieves all users with pagination
+        Retrieves all users with pagination (offset or cursor)
         Returns a list of user dictionaries
         """
-        users_list_dict = await self.user_repo.get_users(skip=skip, limit=limit)
-        print(f"Users list: {users_list_dict}")
+        users_list_dict = await self.user_repo.get_users(skip=skip, limit=limit, cursor=cursor)
         return users_list_dict
 
     async def update_user(self, id: int, user_data: UserUpdate) -> Optional[Dict[str, Any]]:
@@ -65,6 +82,7 @@ class UserService:
         Handles partial updates and passes to the repo
         """
         updated_user_dict = await self.user_repo.update_user(id, user_data)
+        self._forget_user(id, updated_user_dict["email"] if updated_user_dict else None)
         return updated_user_dict
 
     async def delete_user(self, id: int) -> bool:
@@ -73,4 +91,13 @@ class UserService:
         Returns True on successful deletion, False otherwise
         """
         deleted = await self.user_repo.delete_user(id)
-        return deleted
\ No newline at end of file
+        self._forget_user(id)
+        return deleted
+
+    def _forget_user(self, id: int, email: Optional[str] = None) -> None:
+        """Drops a written user from the shared cache and this request's memo"""
+        self.cache.invalidate_user(id, email)
+        self._users_by_email = {
+            cached_email: user for cached_email, user in self._users_by_email.items()
+            if cached_email != email and (user is None or user["id"] != id)
+        }
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+    Tests for the Parquet analytics snapshots
+"""
+
+import os
+import asyncio
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import insert, select, delete
+
+from src.benchmarks.ml_analyse_benchmark import seed, QUIZ_ID, QUESTIONS_PER_QUIZ, LOGS_PER_ANSWER
+from src.models.logs_model import logs_table
+from src.ml_core.data_processing import DataPrepocessor
+from src.ml_core.snapshots import SnapshotWriter, ENUM_TYPE, read_snapshot, read_event_frame
+from src.repositories.analysis_repository import AnalysisRepository
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.quiz_repository import QuizRepository
+from src.services import snapshot_service
+from src.services.snapshot_service import SnapshotService
+from src.services.ml_service import MLService
+
+STUDENTS = 20
+
+def test_snapshots_append_new_rows_only(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_service, "SNAPSHOT_BATCH_SIZE", 150)
+
+    async def _run():
+        async with database.session() as session:
+            await seed(session, STUDENTS)
+            # one log isn't committed yet when the first refresh runs
+            late_id = STUDENTS * QUESTIONS_PER_QUIZ * LOGS_PER_ANSWER - 5
+            late = dict((await session.execute(select(logs_table).where(logs_table.c.id == late_id))).mappings().one())
+            await session.execute(delete(logs_table).where(logs_table.c.id == late_id))
+            await session.commit()
+
+            service = SnapshotService(AnswerRepository(session), LogRepository(session), SnapshotWriter(str(tmp_path)))
+            answers = STUDENTS * QUESTIONS_PER_QUIZ
+            assert await service.refresh() == {"answers": answers, "events": answers * LOGS_PER_ANSWER - 1}
+            assert await service.refresh() == {"answers": 0, "events": 0}
+
+            await session.execute(insert(logs_table), [{"user_id": 1, "question_id": 1, "action": "paused", "time": datetime(2025, 1, 2, 9)}])
+            await session.commit()
+            assert await service.refresh() == {"answers": 0, "events": 1}
+            assert os.path.isdir(tmp_path / "events" / f"quiz_id={QUIZ_ID}" / "date=2025-01-02")
+
+            # a log committed after higher ids (a lower id showing up late) is appended once
+            await session.execute(insert(logs_table), [late])
+            await session.commit()
+            assert await service.refresh() == {"answers": 0, "events": 1}
+            assert await service.refresh() == {"answers": 0, "events": 0}
+
+            # the snapshot gives the same analysis records as the live query
+            ml = MLService(
+                AnalysisRepository(session), AnswerRepository(session), LogRepository(session),
+                QuestionRepository(session), UserRepository(session), QuizRepository(session)
+            )
+            preprocessor = DataPrepocessor()
+            snapshot = preprocessor.to_records(preprocessor.latest_events(read_event_frame(str(tmp_path), QUIZ_ID)))
+            assert snapshot == await ml.analyse(QUIZ_ID)
+    asyncio.run(_run())
+
+    events = read_snapshot(str(tmp_path), "events")
+    assert len(events) == STUDENTS * QUESTIONS_PER_QUIZ * LOGS_PER_ANSWER + 1
+    assert list(events["log_id"]) == sorted(events["log_id"])
+    assert list(events["action"].cat.categories) == ["paused", "resumed", "started", "completed"]
+    assert str(events["time"].dtype) == "datetime64[ns]"
+    assert len(read_snapshot(str(tmp_path), "answers", quiz_id=QUIZ_ID + 1)) == 0
+
+    files = pq.ParquetDataset(str(tmp_path / "answers")).files
+    schema = pq.read_schema(files[0])
+    assert "marks_achieved" not in schema.names # changes when marks are allocated, so never snapshotted
+    assert schema.field("level").type == ENUM_TYPE and schema.field("type").type == ENUM_TYPE
+    assert schema.field("answer_id").type == pa.int32()
@@ -0,0 +1,65 @@
+"""
+    Tests for the verified ID token cache
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.token_cache import TokenCache
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_entries_expire_at_ttl_or_token_exp():
+    clock = Clock()
+    cache = TokenCache(maxsize=10, ttl=300, clock=clock)
+    cache.put("long-lived", {"uid": "a", "exp": clock.now + 3600})
+    cache.put("expiring", {"uid": "b", "exp": clock.now + 60})
+    cache.put("expired", {"uid": "c", "exp": clock.now - 1})
+    assert cache.get("expired") is None
+    clock.now += 61
+    assert cache.get("expiring") is None
+    assert cache.get("long-lived") == {"uid": "a", "exp": 4600.0}
+    clock.now += 240
+    assert cache.get("long-lived") is None
+    assert len(cache._entries) == 0
+    assert "long-lived" not in str(cache._entries) # only the hash is stored
+
+def test_lru_eviction():
+    cache = TokenCache(maxsize=2, ttl=300)
+    cache.put("a", {"uid": "a"})
+    cache.put("b", {"uid": "b"})
+    cache.get("a")
+    cache.put("c", {"uid": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_concurrent_requests_verify_once_and_failures_are_not_cached():
+    async def _run():
+        cache = TokenCache(maxsize=10, ttl=300)
+        calls = []
+
+        async def verify(token):
+            calls.append(token)
+            await asyncio.sleep(0.01)
+            if token == "bad":
+                raise ValueError("invalid signature")
+            return {"uid": token}
+
+        results = await asyncio.gather(*[cache.get_or_verify("good", verify) for _ in range(20)])
+        assert results == [{"uid": "good"}] * 20
+        assert await cache.get_or_verify("good", verify) == {"uid": "good"}
+        assert calls == ["good"]
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await cache.get_or_verify("bad", verify)
+        assert calls == ["good", "bad", "bad"]
+        assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 22)
+    asyncio.run(_run())
@@ -0,0 +1,57 @@
+"""
+    Tests for resolving the authenticated user from the request memo and the shared user cache
+"""
+
+from src.core.user_cache import UserCache
+from src.repositories.user_repository import UserRepository
+from src.services.user_service import UserService
+from src.api.schemas.user_schema import UserCreate, UserUpdate
+
+def test_current_user_costs_no_queries_once_cached(database):
+    async def test(session):
+        statements = database.statements
+        cache = UserCache(maxsize=100, ttl=60)
+        def request() -> UserService:
+            return UserService(UserRepository(session), cache)
+
+        user = await request().create_user(UserCreate(email="ada@example.com", password="x", name="Ada", surname="L", type="student"))
+        assert user is not None
+
+        # the auth dependency and the route look the same email up in one request
+        statements.clear()
+        service = request()
+        assert await service.get_user_by_email("ada@example.com") == user
+        assert await service.get_user_by_email("ada@example.com") == user
+        assert len(statements) == 1
+
+        # later requests are served by the shared cache
+        assert await request().get_user_by_email("ada@example.com") == user
+        assert len(statements) == 1
+
+        # an update drops the entry, the next request reads the new row
+        await request().update_user(user["id"], UserUpdate(email="ada@example.com", name="Augusta", surname="L", type="student"))
+        statements.clear()
+        assert (await request().get_user_by_email("ada@example.com"))["name"] == "Augusta"
+        assert len(statements) == 1
+
+        await request().delete_user(user["id"])
+        assert await request().get_user_by_email("ada@example.com") is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["request_hits"] == 1
+    database.run(test)
+
+def test_id_index_follows_the_entries():
+    now = [0.0]
+    cache = UserCache(maxsize=2, ttl=60, clock=lambda: now[0])
+    cache.put_user({"id": 1, "email": "ada@example.com"})
+    # user 1 changed email in another worker and user 3 took the old one: invalidating user 1 leaves user 3 cached
+    cache.put_user({"id": 3, "email": "ada@example.com"})
+    cache.invalidate_user(1)
+    assert cache.get("ada@example.com")["id"] == 3 and cache._emails_by_id == {3: "ada@example.com"}
+
+    # evicted and expired users leave the index too
+    cache.put_user({"id": 4, "email": "alan@example.com"})
+    cache.put_user({"id": 5, "email": "grace@example.com"})
+    assert cache._emails_by_id == {4: "alan@example.com", 5: "grace@example.com"}
+    now[0] = 60
+    assert cache.get("alan@example.com") is None and cache.get("grace@example.com") is None
+    assert cache._emails_by_id == {}
@@ -0,0 +1,149 @@
+"""
+    Content negotiation for bulk responses
+    Routes opt in (see compressible) to be sent as MessagePack when the client's Accept prefers it, and
+    gzipped by CompressionMiddleware when the client accepts gzip and the body is over a size threshold.
+    Both save bandwidth on the large, repetitive payloads AR devices pull over mobile networks
+"""
+
+from typing import Any, Dict, Optional, Sequence
+import gzip
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# older clients send the unregistered x- name
+MEDIA_TYPE_ALIASES = {"application/x-msgpack": MSGPACK_MEDIA_TYPE}
+
+# request.state key set by routes that opted in to compression
+COMPRESS_STATE_KEY = "compress"
+
+class EncodingStats:
+    """Counters for the opted-in responses: how many went out as MessagePack or gzip, and the bytes gzip saved"""
+
+    def __init__(self) -> None:
+        self.responses = 0
+        self.msgpack_responses = 0
+        self.gzip_responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "msgpack_responses": self.msgpack_responses,
+            "gzip_responses": self.gzip_responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "compression_ratio": self.bytes_out / self.bytes_in if self.bytes_in else 1.0
+        }
+
+# shared by every request in the process
+encoding_stats = EncodingStats()
+
+def parse_qualities(header: Optional[str]) -> Dict[str, float]:
+    """Parses an Accept or Accept-Encoding header into {value: q}, e.g. 'gzip;q=0.5, br' -> {'gzip': 0.5, 'br': 1.0}"""
+    qualities: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        value, *params = [p.strip() for p in part.split(";")]
+        if not value:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        value = value.lower()
+        qualities[MEDIA_TYPE_ALIASES.get(value, value)] = q
+    return qualities
+
+def preferred_media_type(accept: Optional[str], offered: Sequence[str] = (JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE)) -> str:
+    """
+        The offered media type the client ranks highest, ties and wildcards go to the first one offered (JSON)
+        A client that accepts none of them still gets JSON, as before negotiation existed
+    """
+    qualities = parse_qualities(accept)
+    def _quality(media_type: str) -> float:
+        main_type = media_type.split("/")[0]
+        for candidate in (media_type, f"{main_type}/*", "*/*"):
+            if candidate in qualities:
+                return qualities[candidate]
+        return 0.0 if qualities else 1.0
+    best = max(offered, key=lambda media_type: (_quality(media_type), -offered.index(media_type)))
+    return best if _quality(best) > 0 else offered[0]
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    qualities = parse_qualities(accept_encoding)
+    return qualities.get(encoding, qualities.get("*", 0.0)) > 0
+
+async def compressible(request: Request) -> None:
+    """Route dependency opting the response in to gzip (CompressionMiddleware leaves other routes alone)"""
+    setattr(request.state, COMPRESS_STATE_KEY, True)
+
+class CompressionMiddleware:
+    """
+        Gzips the responses of routes that opted in, when the client accepts gzip and the body is at least
+        minimum_size bytes. Compression runs in the threadpool so large bodies don't stall the event loop.
+        Streamed responses are passed through untouched
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 6) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding")
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def _send(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if not scope.get("state", {}).get(COMPRESS_STATE_KEY) or "content-encoding" in headers:
+                    passthrough = True
+                    await send(message)
+                    return
+                # the body now depends on Accept-Encoding, caches must keep the variants apart
+                headers.add_vary_header("Accept-Encoding")
+                start = message
+            elif message.get("more_body", False):
+                passthrough = True
+                await send(start)
+                await send(message)
+            else:
+                await self._send_encoded(start, message.get("body", b""), accept_encoding, send)
+
+        await self.app(scope, receive, _send)
+
+    async def _send_encoded(self, start: Message, body: bytes, accept_encoding: Optional[str], send: Send) -> None:
+        encoding_stats.responses += 1
+        encoding_stats.bytes_in += len(body)
+        if len(body) >= self.minimum_size and accepts_encoding(accept_encoding, "gzip"):
+            compressed = await run_in_threadpool(gzip.compress, body, self.level)
+            if len(compressed) < len(body):
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = "gzip"
+                headers["Content-Length"] = str(len(compressed))
+                # the gzipped bytes aren't the identity representation the strong ETag was issued for
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                body = compressed
+                encoding_stats.gzip_responses += 1
+        encoding_stats.bytes_out += len(body)
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
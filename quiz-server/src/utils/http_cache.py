@@ -0,0 +1,59 @@
+"""
+    HTTP conditional request helpers
+    Strong ETags for rendered bodies or resource versions and If-None-Match handling, so clients
+    (and any proxy in front of the API) re-validate a cached response with a 304 instead of downloading it again
+"""
+
+from typing import Awaitable, Callable, Dict, Optional
+import hashlib
+from fastapi import HTTPException, Request, Response, status
+
+from src.core.resource_versions import resource_versions
+
+# Cache-Control per kind of route
+# rarely edited lists, a browser or proxy may reuse them for a few minutes without asking
+REFERENCE_CACHE_CONTROL = "public, max-age=300"
+# quiz content teachers edit, always re-validated (cheaply, with a 304) so edits show up immediately
+CONTENT_CACHE_CONTROL = "public, no-cache"
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag of a response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def matches_etag(request: Request, etag: str) -> bool:
+    """
+        True if the request's If-None-Match already names this ETag (or is *)
+        Uses the weak comparison If-None-Match calls for, so W/"x" matches "x"
+    """
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    """Empty 304 carrying the ETag the client already holds"""
+    resource_versions.not_modified += 1
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag, cache_control))
+
+def conditional_get(resource: str, cache_control: str) -> Callable[[Request, Response], Awaitable[None]]:
+    """
+        Dependency for GET routes serving a versioned resource (see core/resource_versions.py)
+        Answers 304 before the route touches the database when If-None-Match holds the current version,
+        otherwise adds the ETag and Cache-Control headers to the route's response
+    """
+    async def _conditional_get(request: Request, response: Response) -> None:
+        etag = resource_versions.etag(resource)
+        headers = _cache_headers(etag, cache_control)
+        if matches_etag(request, etag):
+            resource_versions.not_modified += 1
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+    return _conditional_get
+
+def _cache_headers(etag: str, cache_control: Optional[str]) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+    return headers
@@ -0,0 +1,70 @@
+"""
+    Keyset (cursor) pagination helpers
+    A cursor is an opaque url-safe token holding the sort key of the last row of a page,
+    the next page starts strictly after it so the cost doesn't grow with depth like OFFSET does
+"""
+
+from typing import Optional, List, Dict, Any, Sequence
+from datetime import datetime
+import base64
+import json
+from fastapi import Response
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import ColumnElement
+
+from src.api.exceptions.custom_exceptions import InvalidCursorError
+
+# header carrying the cursor for the next page, absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# sort keys used by the list endpoints
+ID_KEYSET = ("id",)
+TIME_ID_KEYSET = ("time", "id")
+
+def encode_cursor(key_names: Sequence[str], values: Sequence[Any]) -> str:
+    """Encodes the sort key of a row into an opaque cursor token"""
+    encoded = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    payload = json.dumps({"k": list(key_names), "v": encoded}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, key_names: Sequence[str]) -> List[Any]:
+    """
+        Decodes a cursor token back into its sort key values
+        Raises InvalidCursorError if the token is malformed or was issued for a different sort key
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        names, values = payload["k"], payload["v"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}")
+    if names != list(key_names) or len(values) != len(key_names):
+        raise InvalidCursorError("Cursor does not belong to this listing")
+    try:
+        return [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in values]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}")
+
+def keyset_after(columns: Sequence[ColumnElement[Any]], values: Sequence[Any]) -> ColumnElement[bool]:
+    """
+        Builds the condition for rows sorted strictly after the given key
+        i.e. (a, b) > (x, y) expanded to a > x OR (a = x AND b > y), which every dialect can serve from an index
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column > values[i]))
+    return or_(*clauses)
+
+def next_cursor(rows: List[Dict[str, Any]], key_names: Sequence[str], limit: int) -> Optional[str]:
+    """Returns the cursor for the page after rows, or None if this was the last page"""
+    if limit <= 0 or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(key_names, [last[name] for name in key_names])
+
+def set_next_cursor(response: Response, rows: List[Dict[str, Any]], key_names: Sequence[str], limit: int) -> None:
+    """Adds the next page's cursor to the response headers, the body stays a plain list for older clients"""
+    cursor = next_cursor(rows, key_names, limit)
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
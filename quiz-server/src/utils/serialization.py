@@ -0,0 +1,56 @@
+"""
+    Response serialization fast path
+    Routes that return many rows validate them once with a cached TypeAdapter and encode straight to
+    JSON bytes, instead of building each model by hand and having FastAPI validate and encode the list
+    again for response_model (which stays on the route for the OpenAPI schema)
+    Bulk routes can also negotiate MessagePack (see utils/content_negotiation.py)
+"""
+
+from typing import Any, Dict, Optional
+from functools import lru_cache
+import msgpack
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+
+from src.utils.content_negotiation import preferred_media_type, encoding_stats, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+
+@lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter[Any]:
+    """One TypeAdapter per response type, building its validator and serializer is the expensive part"""
+    return TypeAdapter(response_type)
+
+def serialize(response_type: Any, data: Any) -> bytes:
+    """Validates data (rows as dicts) against the response type once and encodes it as JSON"""
+    adapter = type_adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(data))
+
+def json_response(response_type: Any, data: Any, response: Optional[Response] = None, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+        JSON response FastAPI sends as is (no second response_model pass)
+        response is the route's Response parameter: headers set on it (next cursor, ETag, Cache-Control)
+        are carried over, as FastAPI only merges them into responses it builds itself
+    """
+    return Response(content=serialize(response_type, data), status_code=status_code, media_type=JSON_MEDIA_TYPE, headers=_route_headers(response))
+
+def negotiated_response(response_type: Any, data: Any, request: Request, response: Optional[Response] = None, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+        Like json_response, but sent as MessagePack when the request's Accept prefers application/msgpack
+        MessagePack bodies hold the same values as the JSON ones (datetimes as ISO strings)
+    """
+    adapter = type_adapter(response_type)
+    validated = adapter.validate_python(data)
+    headers = _route_headers(response) or {}
+    # the body now depends on Accept, caches must keep the variants apart
+    headers["Vary"] = "Accept"
+    media_type = preferred_media_type(request.headers.get("accept"))
+    if media_type == MSGPACK_MEDIA_TYPE:
+        encoding_stats.msgpack_responses += 1
+        body = msgpack.packb(adapter.dump_python(validated, mode="json"))
+    else:
+        body = adapter.dump_json(validated)
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+def _route_headers(response: Optional[Response]) -> Optional[Dict[str, str]]:
+    if response is None:
+        return None
+    return {k: v for k, v in response.headers.items() if k != "content-length"}
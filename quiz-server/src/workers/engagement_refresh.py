@@ -0,0 +1,45 @@
+"""
+    Engagement refresh
+    Folds the log events written since the last run into the stored engagement metrics every
+    ENGAGEMENT_REFRESH_SECONDS, in the background, so the engagement routes only read (and can read a replica).
+    Started by the app's lifespan in every process, the engagement tables keep processes from folding an event twice
+"""
+
+from typing import Callable
+import asyncio
+import logging
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import AsyncSessionLocal
+from src.services.ml_service import MLService
+from src.repositories.analysis_repository import AnalysisRepository
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.quiz_repository import QuizRepository
+from src.repositories.engagement_repository import EngagementRepository
+
+logger = logging.getLogger(__name__)
+
+async def refresh_engagement(session_factory: Callable[[], AsyncSession] = AsyncSessionLocal) -> int:
+    """Runs one refresh on its own (primary) session, returns the number of events folded in"""
+    async with session_factory() as db:
+        service = MLService(
+            AnalysisRepository(db), AnswerRepository(db), LogRepository(db),
+            QuestionRepository(db), UserRepository(db), QuizRepository(db),
+            engagement_repo=EngagementRepository(db)
+        )
+        return await service.refresh_engagement()
+
+async def run_engagement_refresh(interval: float, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal) -> None:
+    """Background task started in lifespan, refreshes every interval seconds until cancelled"""
+    while True:
+        try:
+            applied = await refresh_engagement(session_factory)
+            if applied:
+                logger.info(f"Engagement refresh folded in {applied} log events")
+        except Exception:
+            # e.g. the database is briefly unreachable, the next run picks up where this one stopped
+            logger.exception("Engagement refresh failed")
+        await asyncio.sleep(interval)
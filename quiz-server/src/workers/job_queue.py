@@ -0,0 +1,151 @@
+"""
+    In-process background job queue
+    Long-running work (e.g. a whole quiz's analysis) is submitted as a job: persisted in the jobs table, then run
+    by a bounded number of asyncio workers in priority order, each job on its own session, so no request waits on it
+    or holds a connection for it. Clients poll the job's state (GET /ml/jobs/{id}), and jobs still queued or running
+    when the process stopped are picked up again at startup. A job's writes and its completion commit in one
+    transaction. No external broker is needed
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import itertools
+import logging
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.models.answers_model import utc_now
+from src.repositories.job_repository import JobRepository
+from src.repositories.unit_of_work import UnitOfWork
+from src.api.exceptions.custom_exceptions import UnknownJobKindError
+
+logger = logging.getLogger(__name__)
+
+# runs a job on its own session with the job's params, returns its (JSON) result
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[Any]]
+
+class JobQueue:
+    def __init__(self, session_factory: Callable[[], AsyncSession], workers: int = 2, stale_seconds: float = 3600) -> None:
+        """
+            session_factory opens the session each job (and each submission) runs on
+            workers bounds how many jobs run at once
+            stale_seconds is how long a job can run before a starting process takes it to be abandoned
+        """
+        self.session_factory = session_factory
+        self.workers = workers
+        self.stale_seconds = stale_seconds
+        self.handlers: Dict[str, JobHandler] = {}
+        # (-priority, submission order, job id): higher priority first, then first in first out
+        self._queue: asyncio.PriorityQueue[Tuple[int, int, int]] = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._tasks: List[asyncio.Task[None]] = []
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self.handlers[kind] = handler
+
+    async def start(self) -> int:
+        """
+            Puts the queued jobs, and those left running longer than stale_seconds (their process stopped mid-run),
+            on the queue and starts the workers. Jobs another process is running are left to it
+            Return:
+                int: The number of jobs recovered
+        """
+        async with self.session_factory() as db:
+            jobs = JobRepository(db)
+            await jobs.requeue_stale_jobs(utc_now() - timedelta(seconds=self.stale_seconds))
+            queued = await jobs.get_queued_jobs()
+        for job in queued:
+            self._put(job)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        return len(queued)
+
+    async def stop(self) -> None:
+        """Stops the workers, a job cut off mid-run stays running in the table until it is stale, then runs again"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self) -> None:
+        """Waits until every job on the queue has run"""
+        await self._queue.join()
+
+    async def submit(self, kind: str, params: Dict[str, Any], priority: int = 0) -> Optional[Dict[str, Any]]:
+        """
+            Persists a job and queues it
+            Return:
+                Dict[str, Any]: The queued job
+        """
+        if kind not in self.handlers:
+            raise UnknownJobKindError(f"Unknown job kind: {kind}")
+        async with self.session_factory() as db:
+            job = await JobRepository(db).create_job(kind, params, priority)
+        if job is not None:
+            self._put(job)
+        return job
+
+    async def get_job(self, id: int) -> Optional[Dict[str, Any]]:
+        """
+            Return:
+                Dict[str, Any]: The job with its status, and its result or error once it has finished
+                None: Return null if there is no such job
+        """
+        async with self.session_factory() as db:
+            return await JobRepository(db).get_job_by_id(id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    def _put(self, job: Dict[str, Any]) -> None:
+        self._queue.put_nowait((-job["priority"], next(self._order), job["id"]))
+
+    async def _work(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                # the job's state couldn't be stored, it stays queued or running and is picked up at a later start
+                logger.exception(f"Job {job_id} could not be run")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int) -> None:
+        async with self.session_factory() as db:
+            jobs = JobRepository(db)
+            # another worker (or process) may have claimed it first
+            job = await jobs.claim_job(job_id)
+            if job is None:
+                return
+            self.running += 1
+            try:
+                handler = self.handlers.get(job["kind"])
+                if handler is None:
+                    raise UnknownJobKindError(f"Unknown job kind: {job['kind']}")
+                # the job's writes commit with its completion, so a job requeued after a crash never finds half of them
+                async with UnitOfWork(db):
+                    result = await handler(db, job["params"])
+                    await jobs.mark_completed(job_id, result)
+            except Exception as e:
+                logger.exception(f"Job {job_id} ({job['kind']}) failed")
+                await db.rollback()
+                await jobs.mark_failed(job_id, f"{type(e).__name__}: {e}")
+                self.failed += 1
+            else:
+                self.completed += 1
+            finally:
+                self.running -= 1
+
+# shared by every request in the process, started and stopped by the app's lifespan
+job_queue = JobQueue(AsyncSessionLocal, settings.JOB_WORKERS, settings.JOB_STALE_SECONDS)
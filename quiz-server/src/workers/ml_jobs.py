@@ -0,0 +1,30 @@
+"""
+    ML jobs run by the job queue
+"""
+
+from typing import Any, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.ml_service import MLService
+from src.repositories.analysis_repository import AnalysisRepository
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.user_repository import UserRepository
+from src.repositories.quiz_repository import QuizRepository
+from src.workers.job_queue import JobQueue, job_queue
+
+ANALYSE_JOB = "analyse"
+
+async def analyse_quiz(db: AsyncSession, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyses a whole quiz (or one user's answers to it) and stores the analyses, params: quiz_id, user_id"""
+    service = MLService(
+        AnalysisRepository(db), AnswerRepository(db), LogRepository(db),
+        QuestionRepository(db), UserRepository(db), QuizRepository(db)
+    )
+    return await service.store_analyses(params["quiz_id"], user_id=params.get("user_id"))
+
+def register_ml_jobs(queue: JobQueue) -> None:
+    queue.register(ANALYSE_JOB, analyse_quiz)
+
+register_ml_jobs(job_queue)
@@ -0,0 +1,39 @@
+"""
+    Analytics snapshot job
+    Appends the answers and log events written since the last run to the Parquet snapshots, reading from a
+    replica when one is healthy. Schedule it (e.g. nightly with cron), the data science team's notebooks
+    read the snapshots with src.ml_core.snapshots.read_snapshot / read_event_frame
+
+    Run from quiz-server: python -m src.workers.snapshot_job --directory /data/snapshots
+"""
+
+import asyncio
+import argparse
+from typing import Dict
+
+from src.core.config import settings
+from src.core.database import async_engine, replica_engines, replica_router
+from src.ml_core.snapshots import SnapshotWriter
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.services.snapshot_service import SnapshotService
+
+async def run(directory: str) -> Dict[str, int]:
+    try:
+        await replica_router.check_health()
+        async with replica_router.read_session() as db:
+            service = SnapshotService(AnswerRepository(db), LogRepository(db), SnapshotWriter(directory, settings.SNAPSHOT_RESCAN_IDS))
+            return await service.refresh()
+    finally:
+        for engine in [async_engine, *replica_engines]:
+            await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--directory", default=settings.SNAPSHOT_DIR)
+    args = parser.parse_args()
+    for table, rows in asyncio.run(run(args.directory)).items():
+        print(f"{table}: {rows} rows appended")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+    Tests for the single-round-trip write path in BaseRepository
+    Runs every write against SQLite twice: once with native RETURNING and once with RETURNING
+    switched off on the dialect, which is how MySQL behaves
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql
+
+from src.models import answers_model
+from src.models.question_model import Levels, Type
+from src.models.logs_model import Actions
+from src.models.user_model import Type as UserType
+from src.repositories.answer_repository import AnswerRepository
+from src.repositories.log_repository import LogRepository
+from src.repositories.question_repository import QuestionRepository
+from src.repositories.unit_of_work import UnitOfWork
+from src.repositories.user_repository import UserRepository
+from src.services.answer_service import AnswerService
+from src.api.schemas.answer_schema import AnswerCreate, AnswerResponse, AnswerSubmission
+from src.api.schemas.log_schema import LogCreate, LogUpdate
+from src.api.schemas.question_schema import QuestionCreate, QuestionUpdate
+from src.api.schemas.user_schema import UserCreate, UserUpdate
+
+def run_with_session(database, returning: bool, test):
+    """Runs the test coroutine on the database, with RETURNING switched off on its dialect unless returning"""
+    if not returning:
+        # the MySQL dialect reports no RETURNING support for inserts or updates
+        database.engine.sync_engine.dialect.insert_returning = False
+        database.engine.sync_engine.dialect.update_returning = False
+    database.run(lambda session: test(session, database.statements))
+
+def test_mysql_dialect_has_no_returning():
+    assert mysql.dialect().insert_returning is False
+    assert mysql.dialect().update_returning is False
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_create_question_returns_row_in_one_statement(database, returning):
+    async def test(session, statements):
+        repo = QuestionRepository(session)
+        row = await repo.create_question(QuestionCreate(
+            question="2 + 2?", marks=3, level="medium", correctAnswer="4", quiz_id=1, type="mc"
+        ))
+        assert len(statements) == 1
+        assert row == {
+            "id": 1, "quiz_id": 1, "question": "2 + 2?", "marks": 3,
+            "level": Levels.medium, "correctAnswer": "4", "type": Type.mc
+        }
+        assert row == await repo.get_question_by_id(1)
+    run_with_session(database, returning, test)
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_create_answer_and_log(database, returning):
+    async def test(session, statements):
+        answer = await AnswerRepository(session).create_answer(AnswerCreate(question_id=4, user_id=2, quiz_id=1, answer="4"))
+        log = await LogRepository(session).create_log(LogCreate(action=Actions.started, time=datetime(2025, 1, 1, 9), user_id=2, question_id=4))
+        assert len(statements) == 2
+        assert isinstance(answer.pop("created_at"), datetime)
+        assert answer == {"id": 1, "user_id": 2, "question_id": 4, "quiz_id": 1, "answer": "4", "marksAchieved": None}
+        assert log == {"id": 1, "action": Actions.started, "time": datetime(2025, 1, 1, 9), "user_id": 2, "question_id": 4}
+    run_with_session(database, returning, test)
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_update_returns_updated_row(database, returning):
+    async def test(session, statements):
+        repo = QuestionRepository(session)
+        await repo.create_question(QuestionCreate(question="a", marks=1, level="low", correctAnswer="b", quiz_id=1, type="text"))
+        statements.clear()
+        row = await repo.update_question(1, QuestionUpdate(question="c", marks=5, level="high", correctAnswer="d", quiz_id=1, type="tf"))
+        assert len(statements) == (1 if returning else 2)
+        assert row is not None
+        assert (row["question"], row["marks"], row["level"], row["type"]) == ("c", 5, Levels.high, Type.tf)
+    run_with_session(database, returning, test)
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_user_writes_return_the_row_from_the_write(database, returning):
+    async def test(session, statements):
+        repo = UserRepository(session)
+        user = await repo.create_user(UserCreate(email="ada@example.com", password="x", name="Ada", surname="L", type="student"))
+        assert len(statements) == 1
+        assert (user["id"], user["email"], user["type"], user["school_id"]) == (1, "ada@example.com", UserType.student, None)
+        statements.clear()
+        row = await repo.update_user(1, UserUpdate(email="ada@example.com", name="Augusta", surname="L", type="student"))
+        assert len(statements) == (1 if returning else 2)
+        assert (row["name"], row["surname"]) == ("Augusta", "L")
+    run_with_session(database, returning, test)
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_allocate_marks_targets_the_answer_id(database, returning):
+    async def test(session, statements):
+        repo = AnswerRepository(session)
+        for question_id in (1, 2, 3):
+            await repo.create_answer(AnswerCreate(question_id=question_id, user_id=1, quiz_id=1, answer="x"))
+        row = await repo.allocate_marks_to_answer(2, 7)
+        assert row is not None
+        assert (row["id"], row["question_id"], row["marksAchieved"]) == (2, 2, 7)
+        assert await repo.allocate_marks_to_answer(99, 1) is None
+        assert await LogRepository(session).update_log(99, LogUpdate(action=Actions.paused, time=datetime(2025, 1, 1), user_id=1, question_id=1)) is None
+    run_with_session(database, returning, test)
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_answer_submission_commits_once(database, returning):
+    async def test(session, statements):
+        await QuestionRepository(session).create_question(QuestionCreate(question="2 + 2?", marks=3, level="low", correctAnswer="4", quiz_id=1, type="mc"))
+        commits = []
+        event.listen(session.sync_session, "after_commit", lambda s: commits.append(s))
+        statements.clear()
+        uow = UnitOfWork(session)
+        service = AnswerService(AnswerRepository(session), LogRepository(session), uow)
+        answer = await service.create_answer(
+            AnswerCreate(question_id=1, user_id=2, quiz_id=1, answer="4"),
+            LogCreate(action=Actions.completed, time=datetime(2025, 1, 1, 9), user_id=2, question_id=1)
+        )
+        assert len(commits) == 1
+        assert len(statements) == 3 # question lookup, answer insert, log insert
+        assert AnswerResponse.model_validate(answer).model_dump() == {
+            "id": 1, "question_id": 1, "user_id": 2, "quiz_id": 1, "answer": "4",
+            "marks": 3, "marksAchieved": 3, "question": "2 + 2?", "correctAnswer": "4", "type": "mc"
+        }
+
+        # a failure after the answer insert rolls back the answer as well
+        with pytest.raises(RuntimeError):
+            async with uow:
+                await uow.answers.create_answer(AnswerCreate(question_id=1, user_id=3, quiz_id=1, answer="5"))
+                raise RuntimeError("crash before the log is written")
+        assert await AnswerRepository(session).get_answers() == [{k: v for k, v in answer.items() if k in answers_model.answers_table.c}]
+    run_with_session(database, returning, test)
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_batch_submission_uses_multi_row_inserts(database, returning):
+    async def test(session, statements):
+        questions = QuestionRepository(session)
+        for n in range(3):
+            await questions.create_question(QuestionCreate(question=f"q{n}", marks=1, level="low", correctAnswer="a", quiz_id=1, type="tf"))
+        commits = []
+        event.listen(session.sync_session, "after_commit", lambda s: commits.append(s))
+        statements.clear()
+
+        def submission(question_id, log_question_id=None):
+            return AnswerSubmission(
+                answer=AnswerCreate(question_id=question_id, user_id=5, quiz_id=1, answer="a"),
+                log=LogCreate(action=Actions.completed, time=datetime(2025, 1, 1), user_id=5, question_id=log_question_id or question_id)
+            )
+        service = AnswerService(AnswerRepository(session), LogRepository(session), UnitOfWork(session))
+        results = await service.create_answers_batch([submission(1), submission(2), submission(9), submission(3, 1), submission(1), submission(3)])
+
+        assert len(commits) == 1
+        assert len(statements) == (3 if returning else 4)
+        assert [r.get("error") is None for r in results] == [True, True, False, False, False, True]
+        assert [r["answer"]["question_id"] for r in results if "answer" in r] == [1, 2, 3]
+        assert [r["answer"]["marksAchieved"] for r in results if "answer" in r] == [1, 1, 1]
+        assert len(await LogRepository(session).get_logs()) == 3
+        mixed = [submission(1), AnswerSubmission(answer=AnswerCreate(question_id=1, user_id=6, quiz_id=1, answer="a"), log=submission(1).log)]
+        assert await service.create_answers_batch(mixed) is None
+    run_with_session(database, returning, test)
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_regrade_writes_changed_marks_with_one_update_per_value(database, returning):
+    async def test(session, statements):
+        questions = QuestionRepository(session)
+        await questions.create_question(QuestionCreate(question="Pick b", marks=2, level="low", correctAnswer="b", quiz_id=1, type="mc"))
+        await questions.create_question(QuestionCreate(question="True?", marks=1, level="low", correctAnswer="True", quiz_id=1, type="tf"))
+        await questions.create_question(QuestionCreate(question="Explain", marks=5, level="low", correctAnswer="x", quiz_id=1, type="text"))
+        answers = AnswerRepository(session)
+        for user_id, question_id, answer in [(1, 1, "B"), (1, 2, "yes"), (1, 3, "x"), (2, 1, "a"), (2, 2, "false"), (3, 1, " b ")]:
+            await answers.create_answer(AnswerCreate(question_id=question_id, user_id=user_id, quiz_id=1, answer=answer))
+        service = AnswerService(answers, LogRepository(session), UnitOfWork(session))
+
+        async def marks():
+            return {row["id"]: row["marksAchieved"] for row in await answers.get_answers(limit=100)}
+
+        statements.clear()
+        assert await service.regrade_quiz(1) == {"quiz_id": 1, "graded": 5, "updated": 5}
+        # one read, then one UPDATE per marks value (0, 1 and 2)
+        assert len(statements) == 4
+        # the text answer (id 3) is left for marking by hand
+        assert await marks() == {1: 2, 2: 1, 3: None, 4: 0, 5: 0, 6: 2}
+
+        statements.clear()
+        assert await service.regrade_quiz(1) == {"quiz_id": 1, "graded": 5, "updated": 0}
+        assert len(statements) == 1
+
+        await questions.update_question(1, QuestionUpdate(question="Pick a", marks=2, level="low", correctAnswer="a", quiz_id=1, type="mc"))
+        assert await service.regrade_quiz(1) == {"quiz_id": 1, "graded": 5, "updated": 3}
+        assert await marks() == {1: 0, 2: 1, 3: None, 4: 2, 5: 0, 6: 0}
+    run_with_session(database, returning, test)